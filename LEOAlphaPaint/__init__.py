@@ -0,0 +1,40 @@
+# Foundational script by LeoMods (https://github.com/leotorrez) and Blue (https://github.com/SharpCyan)
+# Edits by HummyR (https://github.com/HummyR) (tool developer at https://discord.gg/agmg)
+# Credits to Gradient tool by andyp123 (https://github.com/andyp123/blender_vertex_color_master), Bartosz Styperek, and RylauChelmi, adapted and updated for alpha paint
+
+# Primarily/intended to be used to help make Anime Game mods at https://discord.gg/agmg
+
+# R = Ambient Occlusion (Higher = no occlude, Lower = Ambient Occlusion)
+
+# G = Shadow Smoothing (Higher = Sharper, Lower = Smoother)
+
+# B = Outline z/depth-index (Higher = behind, Lower = in front)
+
+# A = Outline thickness (Higher = thicker, Lower = less width)
+
+# Standard values:
+
+#     R = 1    , lower this to give usually shaded areas ambient occlusion
+#     G = 0.502, soft clothing tend to have smoother values between 0.251 - 0.2
+#     B = 0.502, (raise this value to push outlines back in the Z/depth-axis relative to the model, but usually no need to change)
+#     A = 0.502, generally: exposed hands and feet are 0.4, concave edges have low values, areas with a lot of small details have 0.302-0.106 (for example, a small spike whose outline gets thinner towards the tip), eyes are 0
+
+# Blender only parts are imported in register(), so core/meshops/standin can be imported without bpy
+
+bl_info = {
+    "name": "LEOAlphaPaint",
+    "blender": (3, 5, 1),
+    "author": "LeoMods (https://github.com/leotorrez), Blue, and HummyR (https://github.com/HummyR)",
+    "location": "Vertex Paint",
+    "description": "Paint Vertex colors for Anime Game mods at https://discord.gg/agmg. Credits to Gradient tool by andyp123 (https://github.com/andyp123/blender_vertex_color_master), Bartosz Styperek, and RylauChelmi, adapted and updated for alpha paint. Tested to work on blender version 2.83 and above",
+    "category": "Paint",
+    "tracker_url": "https://github.com/HummyR",
+}
+
+def register():
+    from . import operators
+    operators.register()
+
+def unregister():
+    from . import operators
+    operators.unregister()
@@ -0,0 +1,194 @@
+# Headless batch processing of many .blend files. The driver runs in any Python and starts a
+# pool of background Blender processes, each worker opens one file, runs the job's operations
+# on its meshes with meshops (no operators, GPU or UI involved) and saves it:
+#
+#   python -m LEOAlphaPaint.batch job.json --workers 4 --report report.json
+#
+# job.json:
+#   {
+#     "files": ["dumps/**/*.blend"],
+#     "objects": "*",                   fnmatch pattern on object names
+#     "operations": [
+#       {"op": "quick_optimize", "color": [1, 0.502, 0.502, 0.502], "delete_old_vc": true},
+#       {"op": "fill", "channels": "A", "color": [0, 0, 0, 0.4], "selected": false},
+#       {"op": "validate"}
+#     ],
+#     "save": true,                     false only reports, e.g. for validate
+#     "output_dir": "optimized"         optional, saves copies instead of overwriting
+#   }
+
+import argparse
+import fnmatch
+import glob
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . import core, meshops
+
+channelNames = "RGBA"
+
+def quickOptimize(mesh, params):
+    meshops.quickOptimize(mesh, params.get('color', (1, 0.502, 0.502, 0.502)), params.get('delete_old_vc', True))
+
+def fill(mesh, params):
+    color_data = meshops.getColorLayers(mesh)
+    name = params.get('layer', 'COLOR')
+    if name not in color_data: raise ValueError("%s has no %s layer" % (mesh.name, name))
+    layer = color_data[name]
+
+    if params.get('selected', False):
+        mask = meshops.paintElements(mesh, meshops.layerDomain(layer), use_all=False)
+        if mask is None: return
+    else:
+        mask = np.ones(len(layer.data), dtype=bool)
+    channels = [channelNames.index(c) for c in params.get('channels', 'RGBA').upper()]
+    meshops.writeColors(layer, core.fillChannels(meshops.readColors(layer), mask, channels, params['color']))
+    meshops.updateMesh(mesh)
+
+def validate(mesh, params):
+    return meshops.validateMeshes([mesh], 1)[0]
+
+operations = {
+    'quick_optimize': quickOptimize,
+    'fill': fill,
+    'validate': validate,
+}
+
+def runFile(job):
+    # Worker side, runs inside Blender on the file it was started with
+    import bpy
+
+    pattern = job.get('objects', '*')
+    meshes = {}
+    for obj in bpy.data.objects:
+        if obj.type == 'MESH' and fnmatch.fnmatch(obj.name, pattern):
+            meshes.setdefault(obj.data.as_pointer(), obj.data)
+
+    result = {'meshes': {}}
+    for mesh in meshes.values():
+        entry = result['meshes'][mesh.name] = {'corners': len(mesh.loops), 'seconds': {}}
+        for params in job['operations']:
+            start = time.perf_counter()
+            output = operations[params['op']](mesh, params)
+            entry['seconds'][params['op']] = time.perf_counter() - start
+            if output is not None: entry[params['op']] = output
+
+    if job.get('save', True):
+        path = bpy.data.filepath
+        if job.get('output_dir'):
+            os.makedirs(job['output_dir'], exist_ok=True)
+            path = os.path.join(job['output_dir'], os.path.basename(path))
+        bpy.ops.wm.save_as_mainfile(filepath=path, copy=bool(job.get('output_dir')))
+        result['saved'] = path
+    return result
+
+def worker():
+    # Entry point of the background processes: blender -b file.blend --python-expr ... -- job.json result.json
+    job_path, result_path = sys.argv[sys.argv.index('--') + 1:][:2]
+    with open(job_path) as f:
+        job = json.load(f)
+    start = time.perf_counter()
+    try:
+        result = runFile(job)
+        result['ok'] = True
+    except Exception as e:
+        result = {'ok': False, 'error': "%s: %s" % (type(e).__name__, e)}
+    result['seconds'] = time.perf_counter() - start
+    with open(result_path, 'w') as f:
+        json.dump(result, f)
+
+def workerCommand(blender, path, job_path, result_path):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    bootstrap = "import sys; sys.path.insert(0, %r); from %s import batch; batch.worker()" % (root, __package__)
+    return [blender, '-b', '--factory-startup', path, '--python-exit-code', '1',
+        '--python-expr', bootstrap, '--', job_path, result_path]
+
+def processFile(blender, path, job_path, timeout):
+    fd, result_path = tempfile.mkstemp(suffix='.json')
+    os.close(fd)
+    start = time.perf_counter()
+    try:
+        process = subprocess.run(workerCommand(blender, path, job_path, result_path),
+            stdout=subprocess.PIPE, stderr=subprocess.STDOUT, universal_newlines=True, timeout=timeout)
+        try:
+            with open(result_path) as f:
+                result = json.load(f)
+        except ValueError:
+            # Blender failed before the worker wrote anything, e.g. a file it can't open
+            result = {'ok': False, 'error': "blender exited with %d: %s" % (process.returncode, process.stdout.strip()[-500:])}
+    except subprocess.TimeoutExpired:
+        result = {'ok': False, 'error': "timed out after %ss" % timeout}
+    finally:
+        os.remove(result_path)
+    result['file'] = path
+    result['wall_seconds'] = time.perf_counter() - start
+    return result
+
+def expandFiles(patterns, base):
+    files = []
+    for pattern in patterns:
+        pattern = os.path.join(base, pattern)
+        matches = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        files.extend(path for path in matches if path not in files)
+    return files
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run LEO Alpha Paint operations on many .blend files with background Blender processes")
+    parser.add_argument('job', help="Job spec JSON file")
+    parser.add_argument('--blender', default=os.environ.get('BLENDER', 'blender'), help="Blender executable, defaults to $BLENDER or blender")
+    parser.add_argument('--workers', type=int, default=None, help="Blender processes running at once, defaults to the job's workers or the CPU count")
+    parser.add_argument('--timeout', type=float, default=None, help="Seconds before a file is given up on")
+    parser.add_argument('--report', help="Write the per-file results to this JSON file")
+    args = parser.parse_args(argv)
+
+    job_path = os.path.abspath(args.job)
+    with open(job_path) as f:
+        job = json.load(f)
+    unknown = [params.get('op') for params in job.get('operations', []) if params.get('op') not in operations]
+    if unknown:
+        print("Unknown operations: %s (known: %s)" % (", ".join(map(str, unknown)), ", ".join(operations)))
+        return 2
+    base = os.path.dirname(job_path)
+    if job.get('output_dir'):
+        job['output_dir'] = os.path.join(base, job['output_dir'])
+    files = expandFiles(job.get('files', []), base)
+
+    # Workers read the job with the output path already resolved
+    fd, worker_job = tempfile.mkstemp(suffix='.json')
+    with os.fdopen(fd, 'w') as f:
+        json.dump(job, f)
+
+    workers = args.workers or job.get('workers') or os.cpu_count() or 1
+    start = time.perf_counter()
+    results = []
+    try:
+        # The threads only wait on their Blender process, the work itself runs in parallel processes
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(lambda path: processFile(args.blender, path, worker_job, args.timeout), files):
+                results.append(result)
+                if result['ok']:
+                    print("ok     %-48s %8.2fs  %d meshes" % (result['file'], result['wall_seconds'], len(result['meshes'])))
+                    for name, entry in result['meshes'].items():
+                        for problem in entry.get('validate', {}).get('problems', []):
+                            print("         %s: %s" % (name, problem))
+                else:
+                    print("FAILED %-48s %8.2fs  %s" % (result['file'], result['wall_seconds'], result['error']))
+    finally:
+        os.remove(worker_job)
+
+    failed = [result['file'] for result in results if not result['ok']]
+    print("%d files, %d failed, %.2fs with %d workers" % (len(results), len(failed), time.perf_counter() - start, workers))
+    if args.report:
+        with open(args.report, 'w') as f:
+            json.dump({'job': job, 'workers': workers, 'results': results}, f, indent=1)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
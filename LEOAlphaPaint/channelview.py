@@ -0,0 +1,102 @@
+# Viewport side of the VIEW isolate mode. Instead of copying the isolated channels into a
+# generated color layer, the object gets a material that masks the base layer in the shader,
+# so toggling a channel only changes two node inputs no matter how big the mesh is.
+
+import bpy
+import json
+
+from .meshops import getColorLayers, findActiveColorLayer
+
+materialName = "LEO_Channel_View_"
+# Object custom property holding the material slot setup from before the view was shown
+slotKey = "leo_channel_view"
+
+def channelMasks(isolated):
+    # (rgb mask, alpha mask) of the view shader. An isolated alpha is shown as grey like the alpha view layer
+    channels = [int(x) for x in isolated if x]
+    if 3 in channels: return (0,0,0), (1,1,1)
+    return tuple(float(c in channels) for c in range(3)), (0,0,0)
+
+def viewMaterial(layer_name):
+    mat = bpy.data.materials.get(materialName + layer_name)
+    if mat is not None: return mat
+
+    mat = bpy.data.materials.new(materialName + layer_name)
+    mat.use_nodes = True
+    nodes, links = mat.node_tree.nodes, mat.node_tree.links
+    nodes.clear()
+
+    attribute = nodes.new('ShaderNodeVertexColor')
+    attribute.layer_name = layer_name
+    rgb = nodes.new('ShaderNodeVectorMath')
+    rgb.operation = 'MULTIPLY'
+    rgb.name = "RGB Mask"
+    # The Alpha output is not color managed like Color is, this roughly undoes the sRGB display encoding
+    gamma = nodes.new('ShaderNodeMath')
+    gamma.operation = 'POWER'
+    gamma.inputs[1].default_value = 2.2
+    alpha = nodes.new('ShaderNodeVectorMath')
+    alpha.operation = 'MULTIPLY'
+    alpha.name = "Alpha Mask"
+    add = nodes.new('ShaderNodeVectorMath')
+    add.operation = 'ADD'
+    emission = nodes.new('ShaderNodeEmission')
+    output = nodes.new('ShaderNodeOutputMaterial')
+
+    links.new(attribute.outputs['Color'], rgb.inputs[0])
+    links.new(attribute.outputs['Alpha'], gamma.inputs[0])
+    links.new(gamma.outputs[0], alpha.inputs[0])
+    links.new(rgb.outputs[0], add.inputs[0])
+    links.new(alpha.outputs[0], add.inputs[1])
+    links.new(add.outputs[0], emission.inputs['Color'])
+    links.new(emission.outputs[0], output.inputs['Surface'])
+
+    for i, node in enumerate((attribute, gamma, rgb, alpha, add, emission, output)):
+        node.location = (200*i, 0)
+    return mat
+
+def showChannels(context, obj, isolated):
+    # Show the isolated channels of obj's active color layer, hides the view again for ""
+    if not isolated:
+        hideChannels(context, obj)
+        return
+
+    mesh = obj.data
+    mat = viewMaterial(findActiveColorLayer(getColorLayers(mesh), mesh).name)
+    rgb_mask, alpha_mask = channelMasks(isolated)
+    mat.node_tree.nodes["RGB Mask"].inputs[1].default_value = rgb_mask
+    mat.node_tree.nodes["Alpha Mask"].inputs[1].default_value = alpha_mask
+
+    if slotKey not in obj:
+        # Slots are switched to object links so the mesh's own materials stay untouched
+        obj[slotKey] = json.dumps({
+            'links': [slot.link for slot in obj.material_slots],
+            'materials': [slot.material.name if slot.link == 'OBJECT' and slot.material else "" for slot in obj.material_slots],
+            'added_slot': not obj.material_slots,
+        })
+        if not obj.material_slots: mesh.materials.append(None)
+    for slot in obj.material_slots:
+        slot.link = 'OBJECT'
+        slot.material = mat
+
+    settings = context.scene.paint_alpha_settings
+    space = context.space_data
+    if space is not None and space.type == 'VIEW_3D' and space.shading.type != 'MATERIAL':
+        settings.past_shading_type = space.shading.type
+        space.shading.type = 'MATERIAL'
+
+def hideChannels(context, obj):
+    if obj is not None and slotKey in obj:
+        saved = json.loads(obj[slotKey])
+        for slot, link, name in zip(obj.material_slots, saved['links'], saved['materials']):
+            slot.link = 'OBJECT'
+            slot.material = bpy.data.materials.get(name) if name else None
+            slot.link = link
+        if saved['added_slot']: obj.data.materials.pop()
+        del obj[slotKey]
+
+    settings = context.scene.paint_alpha_settings
+    space = context.space_data
+    if settings.past_shading_type and space is not None and space.type == 'VIEW_3D':
+        space.shading.type = settings.past_shading_type
+    settings.past_shading_type = ""
@@ -0,0 +1,841 @@
+# Array-only color logic for LEO Alpha Paint. Nothing in here imports bpy, so it can be
+# tested and profiled outside of Blender. Colors are (N,4) float32 arrays, one row per
+# face corner (loop), with the matching loop->vertex and loop->face index arrays.
+
+import numpy as np
+
+blending_modes = [
+
+            ('', 'Normal', ''), #---------------------------------------------
+            
+            ('MIX', "Mix", "S"),
+            ('PAINTMIX', "Paint Mix", "sqrt(S^2+D^2)"),
+            ('ALPHAOVER','Alpha Over', 'S*(sA): basically Mix with source alpha layer factor'),
+            
+            ('','Light',''), #------------------------------------------------
+            
+            ('ADD', "Add", "S+D"),
+            ('LIGHTEN', "Lighten","max(S,D)"),
+            ('COLORDODGE','Color Dodge','D/(1-S)'),
+            ('SCREEN','Screen','1-(1-S)*(1-D)'),
+            
+            ('','Dark',''), #-------------------------------------------------
+            
+            ('DARKEN', "Darken", "min(S,D)"), 
+            ('MUL', "Multiply", "S*D"),
+            ('LINEARBURN', 'Linear Burn','S+D-1'), 
+            ('COLORBURN', 'Color Burn','1-(1-D)/S'),
+            
+            ('','Cancel',''), #-----------------------------------------------
+            
+            ('SUB', "Subtract", "D-S"),
+            ('DIV', "Divide", "D/S"),
+
+            ('','Contrast',''), #---------------------------------------------
+
+            ('OVERLAY','Overlay','Multiply(dark) + Screen(light), depending on Source Layer value'),
+            ('HARDLIGHT','Hard Light','Multiply(dark) + Screen(light), depending on Active Layer value'),
+            ('SOFTLIGHT','Soft Light','(1-2D)S^2+2D*S'),
+
+            ('','Component',''), #-------------------------------------------
+            
+            ('HUE', "Hue", "S.h"),
+            ('SATURATION', "Saturation", "S.s"),
+            ('COLOR', "Color", "S.sh"),
+            ('VALUE', "Value", "S.v"),
+        ]
+
+def safeDivide(a, b, fill):
+    out = np.full_like(a, fill)
+    np.divide(a, b, out=out, where=b!=0)
+    return out
+
+def colorValue(colors):
+    # Same as mathutils.Color(rgb).v
+    return colors[:,:3].max(axis=1)
+
+# Same math as mathutils.Color (BLI rgb_to_hsv/hsv_to_rgb) so component blends match the old Color() path
+def rgbToHsv(rgb):
+    r, g, b = rgb[:,0], rgb[:,1], rgb[:,2]
+    swap = g < b
+    g, b = np.where(swap, b, g), np.where(swap, g, b)
+    k = np.where(swap, np.float32(-1), np.float32(0))
+    min_gb = b
+    swap = r < g
+    r, g = np.where(swap, g, r), np.where(swap, r, g)
+    k = np.where(swap, np.float32(-2/6) - k, k)
+    min_gb = np.where(swap, np.minimum(g, b), min_gb)
+    chroma = r - min_gb
+    h = np.abs(k + (g - b) / (6*chroma + np.float32(1e-20)))
+    s = chroma / (r + np.float32(1e-20))
+    return np.stack((h, s, r), axis=1)
+
+def hsvToRgb(hsv):
+    h, s, v = hsv[:,0], hsv[:,1], hsv[:,2]
+    nr = np.clip(np.abs(h*6 - 3) - 1, 0, 1)
+    ng = np.clip(2 - np.abs(h*6 - 2), 0, 1)
+    nb = np.clip(2 - np.abs(h*6 - 4), 0, 1)
+    return np.stack((((nr-1)*s+1)*v, ((ng-1)*s+1)*v, ((nb-1)*s+1)*v), axis=1)
+
+def setHsvComponent(dst_rgb, ref_rgb, component):
+    hsv = rgbToHsv(dst_rgb)
+    hsv[:,component] = rgbToHsv(ref_rgb)[:,component]
+    return hsvToRgb(hsv)
+
+def sourceReference(src, src_ch, channels, mono):
+    # Channels of the source layer that get blended onto the destination channels
+    ref = src.copy()
+    if mono:
+        value = np.zeros(len(src), dtype=np.float32)
+        for c in src_ch:
+            value += src[:,c]/len(src_ch)
+        ref[:,channels] = value[:,None]
+    return ref
+
+def blendArrays(blend_mode, ref, dst, channels):
+    # ref/dst are (N,4) float32 corner colors, result is written into a copy of ref
+    ref = ref.copy()
+    r = ref[:,channels]
+    d = dst[:,channels]
+
+    if blend_mode == 'MIX':
+        return ref
+    elif blend_mode == 'ALPHAOVER':
+        a = ref[:,3:4]
+        r = r*a + (1-a)*d
+    elif blend_mode == 'PAINTMIX':
+        d0, d1, d2 = dst[:,:3].T
+        r0, r1, r2 = ref[:,:3].T.copy()
+        ref[:,0] = np.clip(np.clip(d0*(1-.25*r2)*(1-.25*r1), 0, 1) + np.clip(r0*(1-.25*d2)*(1-.25*d1), 0, 1), 0, 1)
+        ref[:,1] = np.clip(np.clip(d1*(1-.7*r0), 0, 1) + np.clip(r1*(1-.3*d0), 0, 1), 0, 1)
+        ref[:,2] = np.clip(np.clip(d2*(1-.3*r1), 0, 1) + np.clip(r2*(1-.7*d1), 0, 1), 0, 1)
+        return ref
+
+    elif blend_mode == 'ADD':
+        r = np.clip(d+r, 0, 1)
+    elif blend_mode == 'LIGHTEN':
+        r = np.maximum(d, r)
+    elif blend_mode == 'COLORDODGE':
+        r = np.clip(safeDivide(d, 1-r, 1), 0, 1)
+    elif blend_mode == 'SCREEN':
+        r = np.clip(1-(1-r)*(1-d), 0, 1)
+
+    elif blend_mode == 'DARKEN':
+        r = np.minimum(r, d)
+    elif blend_mode == 'MUL':
+        r = r*d
+    elif blend_mode == 'LINEARBURN':
+        r = np.clip(r+d-1, 0, 1)
+    elif blend_mode == 'COLORBURN':
+        r = np.clip(1-safeDivide(1-d, r, 1), 0, 1)
+
+    elif blend_mode == 'SUB':
+        r = np.clip(d-r, 0, 1)
+    elif blend_mode == 'DIV':
+        r = np.clip(safeDivide(d, r, 1), 0, 1)
+
+    elif blend_mode == 'OVERLAY':
+        r = np.where(r < 0.5, np.clip(d*2*r, 0, 1), np.clip(1-2*(1-r)*(1-d), 0, 1))
+    elif blend_mode == 'HARDLIGHT':
+        r = np.where(d < 0.5, np.clip(d*2*r, 0, 1), np.clip(1-2*(1-r)*(1-d), 0, 1))
+    elif blend_mode == 'SOFTLIGHT':
+        r = np.clip((1-2*d)*r**2 + 2*d*r, 0, 1)
+
+    elif blend_mode == 'HUE':
+        ref[:,:3] = setHsvComponent(dst[:,:3], ref[:,:3], 0)
+        return ref
+    elif blend_mode == 'SATURATION':
+        ref[:,:3] = setHsvComponent(dst[:,:3], ref[:,:3], 1)
+        return ref
+    elif blend_mode == 'COLOR':
+        # Color.h then Color.s were set one after another, so hue is lost on grey destinations like before
+        ref[:,:3] = setHsvComponent(setHsvComponent(dst[:,:3], ref[:,:3], 0), ref[:,:3], 1)
+        return ref
+    elif blend_mode == 'VALUE':
+        ref[:,:3] = setHsvComponent(dst[:,:3], ref[:,:3], 2)
+        return ref
+
+    ref[:,channels] = r
+    return ref
+
+# Per channel modes that cost more than a table lookup. In 8-bit mode their result for every pair
+# of byte values is computed once, a blend is then one gather per channel
+BYTE_LUT_MODES = ('COLORDODGE', 'COLORBURN', 'DIV', 'OVERLAY', 'HARDLIGHT', 'SOFTLIGHT')
+blend_luts = {}
+
+def toBytes(colors):
+    # What a BYTE_COLOR layer stores for colors, rounded like Blender's unit_float_to_uchar_clamp
+    return np.clip(np.floor(colors*np.float32(255) + np.float32(0.5)), 0, 255).astype(np.uint8)
+
+def quantize(colors):
+    # colors as read back from a BYTE_COLOR layer
+    return toBytes(colors).astype(np.float32)/np.float32(255)
+
+def byteMargin(steps):
+    # Select margin matching colors at most steps 1/255 steps away from a quantized target
+    return (steps + 0.5)/255
+
+def blendLut(blend_mode):
+    # (65536,) float32 results indexed by source byte << 8 | destination byte
+    if blend_mode not in blend_luts:
+        levels = np.arange(256, dtype=np.float32)/np.float32(255)
+        ref = np.zeros((65536, 4), dtype=np.float32)
+        dst = np.zeros((65536, 4), dtype=np.float32)
+        ref[:,0] = np.repeat(levels, 256)
+        dst[:,0] = np.tile(levels, 256)
+        blend_luts[blend_mode] = np.ascontiguousarray(blendArrays(blend_mode, ref, dst, [0])[:,0])
+    return blend_luts[blend_mode]
+
+def byteBlend(blend_mode, ref, dst, channels):
+    # blendArrays on the 1/255 grid: ref and dst are quantized first, the costly per channel
+    # modes are looked up instead of computed
+    if blend_mode not in BYTE_LUT_MODES:
+        return blendArrays(blend_mode, quantize(ref), quantize(dst), channels)
+    lut = blendLut(blend_mode)
+    ref = ref.copy()
+    for c in channels:
+        index = toBytes(ref[:,c]).astype(np.uint16)
+        index <<= 8
+        index |= toBytes(dst[:,c])
+        ref[:,c] = lut.take(index)
+    return ref
+
+def mixChannels(dst, ref, channels, factor):
+    # factor is a scalar or an (N,len(channels)) array
+    dst[:,channels] = ref[:,channels]*factor + (1-factor)*dst[:,channels]
+    return dst
+
+def cornerMask(loop_vert, loop_face, vert_select=None, face_select=None):
+    # Corners affected by vertex/face paint masking, None means that mask is off
+    mask = np.ones(len(loop_vert), dtype=bool)
+    if vert_select is not None: mask &= vert_select[loop_vert]
+    if face_select is not None: mask &= face_select[loop_face]
+    return mask
+
+def fillChannels(colors, mask, channels, color):
+    # mask: boolean corner mask or corner indices. Writing each channel through the indices is
+    # faster than one np.ix_ block write, and a full mask writes whole columns
+    corners = np.flatnonzero(mask) if mask.dtype == bool else mask
+    color = np.asarray(color, dtype=np.float32)
+    for c in channels:
+        if len(corners) == len(colors): colors[:,c] = color[c]
+        else: colors[corners,c] = color[c]
+    return colors
+
+def averageColor(colors, mask):
+    # mask: boolean mask or indices
+    colors = colors[mask,:3]
+    if not len(colors): return None
+    return colors.mean(axis=0, dtype=np.float64)
+
+def pointMask(corner_mask, loop_vert, vertex_count):
+    # Vertices with at least one corner under corner_mask
+    return np.bincount(loop_vert[corner_mask], minlength=vertex_count) > 0
+
+def uniformPoints(colors, loop_vert, vertex_count):
+    # Per vertex: all of its corners have the same color
+    first = np.empty((vertex_count, colors.shape[1]), dtype=colors.dtype)
+    first[loop_vert[::-1]] = colors[::-1]
+    differs = (colors != first[loop_vert]).any(axis=1)
+    return np.bincount(loop_vert[differs], minlength=vertex_count) == 0
+
+def pointColors(colors, loop_vert, vertex_count):
+    # Average color of each vertex's corners, vertices without corners get white
+    counts = np.bincount(loop_vert, minlength=vertex_count)
+    points = np.ones((vertex_count, colors.shape[1]), dtype=np.float32)
+    used = counts > 0
+    for c in range(colors.shape[1]):
+        points[used,c] = np.bincount(loop_vert, colors[:,c], minlength=vertex_count)[used]/counts[used]
+    return points
+
+def byteKeys(rgb):
+    # rgb quantized to 8 bits per channel and packed into one int per color
+    q = np.clip(np.floor(rgb*np.float32(255) + np.float32(0.5)), 0, 255).astype(np.int32)
+    return (q[:,0] << 16) | (q[:,1] << 8) | q[:,2]
+
+def keyColors(keys):
+    return np.stack(((keys >> 16) & 255, (keys >> 8) & 255, keys & 255), axis=1).astype(np.float32)/np.float32(255)
+
+def uniqueColors(colors, mask):
+    # (rgb, corner count) of every color under the mask, quantized to the 8 bits byte layers store
+    keys, counts = np.unique(byteKeys(colors[mask,:3]), return_counts=True)
+    return keyColors(keys), counts
+
+def distinctColors(rgb):
+    # (unique rows of rgb, index of every row among them), from one lexsort instead of the slow
+    # row-wise unique
+    order = np.lexsort(rgb.T[::-1])
+    ordered = rgb[order]
+    new = np.ones(len(rgb), dtype=bool)
+    new[1:] = (ordered[1:] != ordered[:-1]).any(axis=1)
+    labels = np.empty(len(rgb), dtype=np.int64)
+    labels[order] = np.cumsum(new) - 1
+    return ordered[new], labels
+
+def weightedCenters(colors, counts, labels, k):
+    weights = np.bincount(labels, counts, minlength=k)
+    sums = np.stack([np.bincount(labels, counts*colors[:,c], minlength=k) for c in range(3)], axis=1)
+    return sums/np.maximum(weights, 1)[:,None], weights
+
+def nearestCenter(colors, centers, chunk=16384):
+    labels = np.empty(len(colors), dtype=np.intp)
+    center_norm = (centers**2).sum(axis=1)
+    for i in range(0, len(colors), chunk):
+        part = colors[i:i+chunk]
+        labels[i:i+chunk] = np.argmin(center_norm - 2*part @ centers.T, axis=1)
+    return labels
+
+def medianCut(colors, counts, n):
+    # Split the box with the widest channel at its usage-weighted median until there are n boxes,
+    # returns the label of every color
+    boxes = [np.arange(len(colors))]
+    spans = [np.ptp(colors, axis=0) if len(colors) else np.zeros(3)]
+    while len(boxes) < n:
+        widest = max(range(len(boxes)), key=lambda i: spans[i].max())
+        box = boxes[widest]
+        if len(box) < 2 or spans[widest].max() <= 0: break
+        axis = int(np.argmax(spans[widest]))
+        box = box[np.argsort(colors[box,axis], kind='stable')]
+        weight = np.cumsum(counts[box])
+        split = int(np.clip(np.searchsorted(weight, weight[-1]/2) + 1, 1, len(box) - 1))
+        boxes[widest:widest+1] = [box[:split], box[split:]]
+        spans[widest:widest+1] = [np.ptp(colors[box[:split]], axis=0), np.ptp(colors[box[split:]], axis=0)]
+    labels = np.empty(len(colors), dtype=np.intp)
+    for i, box in enumerate(boxes):
+        labels[box] = i
+    return labels
+
+def reduceColors(colors, counts, n, method='MEDIAN_CUT', iterations=10):
+    # Reduce a weighted palette to at most n colors, ranked by how many corners they stand for.
+    # KMEANS refines the median cut boxes with a few usage-weighted Lloyd iterations
+    colors = colors.astype(np.float64)
+    labels = medianCut(colors, counts, n)
+    centers, weights = weightedCenters(colors, counts, labels, labels.max() + 1)
+    if method == 'KMEANS':
+        for _ in range(iterations):
+            labels = nearestCenter(colors, centers)
+            centers, weights = weightedCenters(colors, counts, labels, len(centers))
+            centers, weights = centers[weights > 0], weights[weights > 0]
+    order = np.argsort(-weights, kind='stable')
+    return centers[order].astype(np.float32), weights[order].astype(np.int64)
+
+# Below this many colors, plain box tests over all corners are cheaper than hashing them
+GRID_MIN_TARGETS = 4
+# Cells per axis of the palette grid at most, cells get wider than error_margin to keep the table small
+GRID_SIDE = 64
+NEIGHBOR_CELLS = np.stack(np.meshgrid([-1, 0, 1], [-1, 0, 1], [-1, 0, 1], indexing='ij'), axis=-1).reshape(-1, 3)
+
+def colorCells(rgb, cell, dim):
+    # Integer grid coordinates, out of range colors are clamped to the border cells, which
+    # keeps neighboring cells neighbors
+    return np.clip(np.floor(rgb/cell), -1, dim).astype(np.int32) + 1
+
+def colorCellKeys(cells, dim):
+    side = dim + 3
+    return (cells[...,0]*side + cells[...,1])*side + cells[...,2]
+
+def colorGrid(targets, margin):
+    # Uniform grid over rgb with cells at least margin wide: a color within margin of a target
+    # is always in the target's cell or one of the 26 around it, so every target is listed
+    # under those 27 cells. Returns (cell, dim, first and end entry of each cell, target per entry)
+    cell = max(float(margin), 1/GRID_SIDE)*1.001
+    dim = int(1/cell) + 1
+    cells = colorCells(targets, cell, dim)
+    keys = colorCellKeys(np.clip(cells[:,None,:] + NEIGHBOR_CELLS, 0, dim + 1), dim).ravel()
+    owner = np.repeat(np.arange(len(targets)), len(NEIGHBOR_CELLS))
+    count = np.bincount(keys, minlength=(dim + 3)**3)
+    last = np.cumsum(count)
+    return cell, dim, last - count, last, owner[np.argsort(keys, kind='stable')]
+
+def boxBounds(targets, margin, dtype):
+    # Per channel (lo, hi) bounds in the colors' own precision, rounded inwards so comparing
+    # against them accepts exactly the same colors as comparing against the float64 bounds
+    lo, hi = (targets - margin).T, (targets + margin).T
+    lo_t, hi_t = lo.astype(dtype), hi.astype(dtype)
+    lo_t = np.where(lo_t < lo, np.nextafter(lo_t, dtype.type(np.inf)), lo_t)
+    hi_t = np.where(hi_t > hi, np.nextafter(hi_t, dtype.type(-np.inf)), hi_t)
+    return np.ascontiguousarray(lo_t), np.ascontiguousarray(hi_t)
+
+def matchColors(colors, targets, margin):
+    # Corners whose rgb lies inside the +-margin box of any target color. Each corner is only
+    # tested against the targets listed under its grid cell, one batch per list position, so
+    # a large palette costs about as much as a small one
+    targets = np.unique(np.asarray(targets, dtype=np.float64).reshape(-1, 3), axis=0)
+    match = np.zeros(len(colors), dtype=bool)
+    lo, hi = boxBounds(targets, margin, colors.dtype)
+    if len(targets) <= GRID_MIN_TARGETS:
+        for t in range(len(targets)):
+            match |= np.all((colors[:,:3] >= lo[:,t]) & (colors[:,:3] <= hi[:,t]), axis=1)
+        return match
+
+    cell, dim, first, last, owner = colorGrid(targets, margin)
+    corner_keys = colorCellKeys(colorCells(colors[:,:3], cell, dim), dim)
+    start, end = first[corner_keys], last[corner_keys]
+    pending = np.flatnonzero(end > start)
+    start, end = start[pending], end[pending]
+    while len(pending):
+        t = owner[start]
+        hit = np.ones(len(pending), dtype=bool)
+        for c in range(3):
+            value = colors[pending, c]
+            hit &= (value >= lo[c][t]) & (value <= hi[c][t])
+        match[pending[hit]] = True
+        start += 1
+        left = ~hit & (start < end)
+        pending, start, end = pending[left], start[left], end[left]
+    return match
+
+def selectVertices(match, loop_vert, vert_select, restrict_loops=False):
+    # Select vertices with a matching corner. restrict_loops deselects any vertex with a corner that doesn't match
+    select = vert_select.copy()
+    select[loop_vert[match]] = True
+    if restrict_loops:
+        select[loop_vert[~match]] = False
+    return select
+
+def vertexAdjacency(edges, vertex_count):
+    # CSR adjacency from (E,2) edge vertex pairs: the neighbors of vertex v are
+    # neighbors[offsets[v]:offsets[v+1]]
+    edges = np.asarray(edges, dtype=np.int32).reshape(-1, 2)
+    source = np.concatenate((edges[:,0], edges[:,1]))
+    target = np.concatenate((edges[:,1], edges[:,0]))
+    offsets = np.zeros(vertex_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(source, minlength=vertex_count), out=offsets[1:])
+    return offsets, target[np.argsort(source, kind='stable')]
+
+def vertexCorners(loop_vert, vertex_count):
+    # CSR arrays of the corners of every vertex: its corners are corners[offsets[v]:offsets[v+1]]
+    offsets = np.zeros(vertex_count + 1, dtype=np.int64)
+    np.cumsum(np.bincount(loop_vert, minlength=vertex_count), out=offsets[1:])
+    return offsets, np.argsort(loop_vert, kind='stable')
+
+def growColorRegions(colors, vertex_rows, offsets, neighbors, seeds, margin, restrict_loops=False, quantized=False):
+    # Vertices connected to a seed vertex through vertices with a color within margin of that seed's
+    # color (all of their colors with restrict_loops), every distinct seed color grows on its own.
+    # vertex_rows: vertexCorners CSR arrays of the color rows of every vertex, None when the rows are
+    # vertices. One breadth first search from all seeds at once, every frontier vertex carries the
+    # label of the seed color it grows with, and only the colors of the vertices it reaches are read
+    def rowsOf(verts):
+        # (color rows of verts, position in verts of every row)
+        if vertex_rows is None: return verts, np.arange(len(verts))
+        row_offsets, rows = vertex_rows
+        counts = row_offsets[verts + 1] - row_offsets[verts]
+        return rows[expandRanges(row_offsets[verts], counts)], np.repeat(np.arange(len(verts)), counts)
+
+    seed_verts = np.flatnonzero(seeds)
+    rows, pair = rowsOf(seed_verts)
+    targets, labels = distinctColors(colors[rows,:3])
+    if quantized: targets = quantize(targets)
+    lo, hi = boxBounds(targets, margin, colors.dtype)
+    lo, hi = np.ascontiguousarray(lo.T), np.ascontiguousarray(hi.T)
+
+    # Visited (vertex, label) states: the first label of a vertex, the others as packed keys
+    label_count = max(len(targets), 1)
+    first = np.full(len(seeds), -1, dtype=np.int64)
+    others = np.empty(0, dtype=np.int64)
+    keys = np.unique(seed_verts[pair]*label_count + labels)
+    while len(keys):
+        verts, labels = keys//label_count, keys % label_count
+        unseen = first[verts] == -1
+        first[verts[unseen]] = labels[unseen]
+        extra = (first[verts] != labels) & ~np.isin(keys, others)
+        others = np.union1d(others, keys[extra])
+        verts, labels = verts[unseen | extra], labels[unseen | extra]
+
+        reach = offsets[verts + 1] - offsets[verts]
+        reached = neighbors[expandRanges(offsets[verts], reach)].astype(np.int64)
+        labels = np.repeat(labels, reach)
+        keep = first[reached] != labels
+        reached, labels = reached[keep], labels[keep]
+        # A reached vertex is entered when one of its colors, all of them with restrict_loops, lies
+        # inside the box of the label it is reached with
+        rows, pair = rowsOf(reached)
+        rgb = colors[rows,:3]
+        inside = np.all((rgb >= lo[labels[pair]]) & (rgb <= hi[labels[pair]]), axis=1)
+        hits = np.bincount(pair[inside], minlength=len(reached))
+        allowed = hits == np.bincount(pair, minlength=len(reached)) if restrict_loops else hits > 0
+        keys = np.unique(reached[allowed]*label_count + labels[allowed])
+        keys = keys[~np.isin(keys, others)]
+
+    region = seeds.copy()
+    region[first >= 0] = True
+    return region
+
+def growRegion(offsets, neighbors, seeds, allowed):
+    # Vertices connected to the seed mask through allowed vertices, one breadth first level per step
+    region = seeds.copy()
+    frontier = np.flatnonzero(seeds)
+    while len(frontier):
+        starts = offsets[frontier]
+        reached = neighbors[expandRanges(starts, offsets[frontier + 1] - starts)]
+        reached = reached[allowed[reached] & ~region[reached]]
+        region[reached] = True
+        frontier = np.unique(reached)
+    return region
+
+def denseRanks(keys):
+    # (position of every key among the distinct keys, distinct key count), np.unique's inverse
+    # from one argsort
+    order = np.argsort(keys, kind='stable')
+    ordered = keys[order]
+    new = np.ones(len(keys), dtype=bool)
+    new[1:] = ordered[1:] != ordered[:-1]
+    ranks = np.empty(len(keys), dtype=np.int64)
+    ranks[order] = np.cumsum(new) - 1
+    return ranks, int(new.sum())
+
+def cornerWedges(loop_vert, keys):
+    # (wedge of every corner, wedge count): corners of a vertex with the same key share a wedge
+    ranks, count = denseRanks(keys)
+    return denseRanks(loop_vert.astype(np.int64)*max(count, 1) + ranks)
+
+def wedgeAdjacency(wedge, loop_next, wedge_count):
+    # vertexAdjacency of the wedges connected by a face side
+    start, end = wedge.astype(np.int64), wedge[loop_next].astype(np.int64)
+    keys = np.sort(np.minimum(start, end)*wedge_count + np.maximum(start, end))
+    keys = keys[np.r_[True, keys[1:] != keys[:-1]]] if len(keys) else keys
+    return vertexAdjacency(np.stack((keys // wedge_count, keys % wedge_count), axis=1), wedge_count)
+
+def smoothValues(values, offsets, neighbors, movable, iterations, factor=0.5):
+    # Laplacian smoothing of the rows of values (N,C): every iteration moves the movable rows factor of
+    # the way to the mean of their neighbors from the iteration before, the other rows stay as they are.
+    # Rows are renumbered with the movable ones first, most neighbors first, so the k-th neighbors of
+    # all rows that have one are one gather and every sum and update runs over a leading slice
+    values = np.array(values, dtype=np.float32)
+    counts = np.diff(offsets)
+    nodes = np.flatnonzero(movable & (counts > 0))
+    nodes = nodes[np.argsort(-counts[nodes], kind='stable')]
+    counts = counts[nodes]
+    fixed = np.ones(len(values), dtype=bool)
+    fixed[nodes] = False
+    order = np.concatenate((nodes, np.flatnonzero(fixed)))
+    rank = np.empty(len(values), dtype=np.intp)
+    rank[order] = np.arange(len(values))
+    sizes = np.searchsorted(-counts, -np.arange(counts.max() if len(counts) else 0), 'left')
+    slots = [rank[neighbors[offsets[nodes[:size]] + k]] for k, size in enumerate(sizes)]
+
+    n = len(nodes)
+    keep = np.float32(1 - factor)
+    weight = (np.float32(factor)/counts).astype(np.float32)
+    total = np.empty(n, dtype=np.float32)
+    part = np.empty(n, dtype=np.float32)
+    for c in range(values.shape[1]):
+        column = values[order,c]
+        for i in range(iterations if n else 0):
+            column.take(slots[0], out=total)
+            for slot in slots[1:]:
+                column.take(slot, out=part[:len(slot)])
+                total[:len(slot)] += part[:len(slot)]
+            total *= weight
+            column[:n] *= keep
+            column[:n] += total
+        values[order,c] = column
+    return values
+
+def colorStats(colors):
+    # Checks of (N,4) colors before exporting: the fraction with alpha 1, and how many have a channel
+    # between two 1/255 steps or outside 0-1, NaN counts as both
+    if not len(colors): return {'alpha_one': 0.0, 'off_grid': 0, 'out_of_range': 0}
+    steps = colors*np.float32(255)
+    steps -= np.rint(steps)
+    # The 4 bools of a row viewed as one int32 are nonzero when any channel is, faster than any(axis=1).
+    # Comparisons with NaN are False, so the bools come from the negated test
+    off_grid = ~(np.abs(steps, out=steps) <= np.float32(1e-3))
+    out_of_range = ~(np.abs(colors - np.float32(0.5), out=steps) <= np.float32(0.5))
+    off_grid, out_of_range = off_grid.view(np.int32), out_of_range.view(np.int32)
+    return {'alpha_one': float(np.count_nonzero(colors[:,3] >= 1))/len(colors),
+        'off_grid': int(np.count_nonzero(off_grid)), 'out_of_range': int(np.count_nonzero(out_of_range))}
+
+def isolatedView(colors, channels):
+    view = np.zeros_like(colors)
+    view[:,3] = 1
+    view[:,channels] = colors[:,channels]
+    return view
+
+def alphaView(values):
+    view = np.ones((len(values), 4), dtype=np.float32)
+    view[:,:3] = values[:,None]
+    return view
+
+def regionPositions(co, matrix, region_size):
+    # Batched view3d_utils.location_3d_to_region_2d, matrix is perspective_matrix @ matrix_world.
+    # Points behind the view (w <= 0) have no region position, visible is False for them
+    co = np.asarray(co, dtype=np.float64)
+    prj = co @ matrix[:,:3].T + matrix[:,3]
+    visible = prj[:,3] > 0
+    half = np.asarray(region_size, dtype=np.float64)/2
+    xy = half + half*prj[:,:2]/np.where(visible, prj[:,3], 1)[:,None]
+    return xy, visible
+
+def gradientFactor(xy, start_point, end_point, circular=False):
+    # Position of every point along the gradient line, clamped to 0-1. Linear gradients project
+    # onto the line, circular ones use the distance from the start relative to the line length
+    start = np.asarray(start_point, dtype=np.float64)
+    line = np.asarray(end_point, dtype=np.float64) - start
+    offset = xy - start
+    if circular:
+        t = np.hypot(offset[:,0], offset[:,1]) / (np.hypot(*line) or 1)
+    else:
+        t = (offset @ line) / ((line @ line) or 1)
+    return np.clip(t, 0, 1)
+
+def gradientColors(t, start_color, end_color, use_hue_blend=False):
+    # rgb at every t, either a straight blend or through the hue circle along the shorter way
+    start = np.asarray(start_color[:3], dtype=np.float32)
+    end = np.asarray(end_color[:3], dtype=np.float32)
+    t = t[:,None].astype(np.float32)
+    if not use_hue_blend:
+        return start + (end - start)*t
+
+    start_hsv, end_hsv = rgbToHsv(np.stack((start, end)))
+    separation = end_hsv - start_hsv
+    if separation[0] > 0.5: separation[0] -= 1
+    elif separation[0] < -0.5: separation[0] += 1
+    hsv = start_hsv + separation*t
+    hsv[:,0] = np.fmod(1 + hsv[:,0], 1)
+    return hsvToRgb(hsv)
+
+# Most points in a leaf of nearestPoints' octree
+NEAREST_LEAF_POINTS = 16
+
+def cornerPoints(co, loop_vert, loop_face, inset=0.05):
+    # A position per corner: its vertex moved slightly towards the face center, so the corners
+    # of a vertex on a color seam stay apart when corners are matched between meshes
+    co = np.asarray(co, dtype=np.float64)
+    counts = np.bincount(loop_face)
+    centers = np.stack([np.bincount(loop_face, co[loop_vert,c], minlength=len(counts)) for c in range(3)], axis=1)
+    centers /= np.maximum(counts, 1)[:,None]
+    points = co[loop_vert]
+    return points + (centers[loop_face] - points)*inset
+
+def transformPoints(co, matrix):
+    matrix = np.asarray(matrix, dtype=np.float64)
+    return np.asarray(co, dtype=np.float64) @ matrix[:3,:3].T + matrix[:3,3]
+
+def expandRanges(starts, counts):
+    # Concatenation of the ranges starts[i]:starts[i]+counts[i]
+    total = counts.sum()
+    return np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(total)
+
+def spreadBits(values):
+    # The low 21 bits of every value moved to every third bit
+    x = values.astype(np.uint64) & np.uint64(0x1fffff)
+    for shift, mask in ((32, 0x1f00000000ffff), (16, 0x1f0000ff0000ff), (8, 0x100f00f00f00f00f),
+            (4, 0x10c30c30c30c30c3), (2, 0x1249249249249249)):
+        x = (x | (x << np.uint64(shift))) & np.uint64(mask)
+    return x
+
+def mortonCodes(points, lo, size):
+    # Position of every point along a Z-order curve through the cube at lo with edges size long.
+    # The same scale on every axis keeps a flat axis from splitting up neighbors
+    cells = np.clip((points - lo)/size*(2**21 - 1), 0, 2**21 - 1)
+    return (spreadBits(cells[:,0]) << np.uint64(2)) | (spreadBits(cells[:,1]) << np.uint64(1)) | spreadBits(cells[:,2])
+
+def pointTree(points):
+    # Octree over the points sorted along a Z-order curve, the points of every node are consecutive.
+    # A node with at most NEAREST_LEAF_POINTS points is a leaf, the others are split into the octants
+    # that hold points. Returns (curve cube lo and size, sorted codes, point order, sorted points,
+    # one (first point, end point, box lo, box hi, first child, child count) tuple per level from
+    # the root down), leaves have no children. Points and boxes are (3, N) arrays
+    origin = points.min(axis=0)
+    size = max((points.max(axis=0) - origin).max(), 1e-30)
+    codes = mortonCodes(points, origin, size)
+    order = np.argsort(codes, kind='stable')
+    codes, ordered = codes[order], np.ascontiguousarray(points[order].T)
+
+    # The nodes level by level, every inner node splits at the next three bits of the codes
+    nodes = []
+    starts, ends = np.zeros(1, dtype=np.int64), np.full(1, len(points), dtype=np.int64)
+    shift = 63
+    while len(starts):
+        inner = np.flatnonzero((ends - starts > NEAREST_LEAF_POINTS) & (shift > 0))
+        shift -= 3
+        rows = expandRanges(starts[inner], ends[inner] - starts[inner])
+        prefix = codes[rows] >> np.uint64(shift)
+        new = np.ones(len(rows), dtype=bool)
+        new[1:] = (prefix[1:] != prefix[:-1]) | (rows[1:] != rows[:-1] + 1)
+        first = np.flatnonzero(new)
+        child_count = np.zeros(len(starts), dtype=np.int64)
+        child_count[inner] = np.bincount(np.repeat(np.arange(len(inner)), ends[inner] - starts[inner])[first], minlength=len(inner))
+        nodes.append((starts, ends, np.cumsum(child_count) - child_count, child_count))
+        starts = rows[first]
+        ends = rows[np.r_[first[1:], len(rows)] - 1] + 1 if len(rows) else rows
+
+    # Boxes from the bottom up: a leaf's from its points, an inner node's from its children's
+    # reduceat needs an index past the last point
+    padded = np.concatenate((ordered, np.zeros((3, 1))), axis=1)
+    levels = []
+    below = None
+    for starts, ends, first_child, child_count in nodes[::-1]:
+        lo, hi = np.empty((3, len(starts))), np.empty((3, len(starts)))
+        leaf = np.flatnonzero(child_count == 0)
+        inner = np.flatnonzero(child_count)
+        for axis in range(3):
+            if len(leaf):
+                bounds = np.stack((starts[leaf], ends[leaf]), axis=1).ravel()
+                lo[axis][leaf] = np.minimum.reduceat(padded[axis], bounds)[::2]
+                hi[axis][leaf] = np.maximum.reduceat(padded[axis], bounds)[::2]
+            if len(inner):
+                lo[axis][inner] = np.minimum.reduceat(below[0][axis], first_child[inner])
+                hi[axis][inner] = np.maximum.reduceat(below[1][axis], first_child[inner])
+        below = (lo, hi)
+        levels.append((starts, ends, lo, hi, first_child, child_count))
+    return (origin, size), codes, order, ordered, levels[::-1]
+
+def boxDistances(lo, hi, nodes, queries, owner):
+    # Squared distance from every query owner to the box of its node, 0 inside. One axis at a time
+    # keeps the temporaries small
+    distance = np.zeros(len(nodes))
+    for axis in range(3):
+        point = queries[axis].take(owner)
+        gap = lo[axis].take(nodes)
+        gap -= point
+        np.maximum(gap, np.subtract(point, hi[axis].take(nodes), out=point), out=gap)
+        np.maximum(gap, 0, out=gap)
+        gap *= gap
+        distance += gap
+    return distance
+
+def closerPoints(ordered, queries, owner, starts, ends, best, nearest):
+    # Checks the points starts[i]:ends[i] against query owner[i], updates best and nearest. owner is
+    # sorted, so every query's distances are one run
+    counts = ends - starts
+    points = expandRanges(starts, counts)
+    owner = np.repeat(owner, counts)
+    distance = np.zeros(len(points))
+    for axis in range(3):
+        gap = ordered[axis].take(points)
+        gap -= queries[axis].take(owner)
+        gap *= gap
+        distance += gap
+    if not len(points): return
+    runs = np.flatnonzero(np.r_[True, owner[1:] != owner[:-1]])
+    best[owner[runs]] = np.minimum(best[owner[runs]], np.minimum.reduceat(distance, runs))
+    hit = distance == best.take(owner)
+    nearest[owner[hit]] = points[hit]
+
+def nearestPoints(points, queries, chunk=1 << 15):
+    # Index of the nearest of points for every query. A first distance comes from the points next
+    # to the query on the Z-order curve, the octree is then searched from the root, entering only
+    # the nodes whose box is closer than the best distance so far. Empty space costs nothing, so
+    # flat meshes and queries far from the points are about as fast as overlapping meshes. chunk
+    # queries are searched at once
+    points = np.asarray(points, dtype=np.float64)
+    queries = np.asarray(queries, dtype=np.float64)
+    if not len(points) or not len(queries): return np.zeros(len(queries), dtype=np.int64)
+    curve, codes, order, ordered, levels = pointTree(points)
+    # Queries in curve order, the queries of a chunk are close to each other and to their nodes.
+    # A query outside the points' bounds goes where it lands when moved onto them
+    query_codes = mortonCodes(np.clip(queries, points.min(axis=0), points.max(axis=0)), *curve)
+    query_order = np.argsort(query_codes, kind='stable')
+    query_codes, queries = query_codes[query_order], np.ascontiguousarray(queries[query_order].T)
+    window = np.clip(np.searchsorted(codes, query_codes) - NEAREST_LEAF_POINTS//2, 0, max(len(points) - NEAREST_LEAF_POINTS, 0))
+
+    best = np.full(len(query_order), np.inf)
+    nearest = np.zeros(len(query_order), dtype=np.int64)
+    for start in range(0, len(query_order), chunk):
+        part = np.arange(start, min(start + chunk, len(query_order)))
+        closerPoints(ordered, queries, part, window[part], np.minimum(window[part] + NEAREST_LEAF_POINTS, len(points)), best, nearest)
+        owner, nodes = part, np.zeros(len(part), dtype=np.int64)
+        for starts, ends, lo, hi, first_child, child_count in levels:
+            keep = boxDistances(lo, hi, nodes, queries, owner) < best.take(owner)
+            owner, nodes = owner[keep], nodes[keep]
+            counts = child_count.take(nodes)
+            leaf = counts == 0
+            closerPoints(ordered, queries, owner[leaf], starts.take(nodes[leaf]), ends.take(nodes[leaf]), best, nearest)
+            owner, nodes, counts = owner[~leaf], nodes[~leaf], counts[~leaf]
+            if not len(nodes): break
+            owner = np.repeat(owner, counts)
+            nodes = expandRanges(first_child.take(nodes), counts)
+    result = np.empty(len(query_order), dtype=np.int64)
+    result[query_order] = order[nearest]
+    return result
+
+def nextCorners(loop_start, loop_total, corner_count):
+    # Corner following every corner around its face
+    following = np.arange(1, corner_count + 1, dtype=np.int32)
+    following[loop_start + loop_total - 1] = loop_start
+    return following
+
+def fanTriangles(loop_start, loop_total):
+    # (T,3) corners of the faces split into triangle fans around their first corner
+    count = np.maximum(loop_total - 2, 0)
+    second = expandRanges(loop_start + 1, count)
+    return np.stack((np.repeat(loop_start, count), second, second + 1), axis=1)
+
+def faceNormals(co, loop_vert, loop_next, loop_face, face_count, normalize=True):
+    # Newell normals of the faces, twice the face area long unless normalized
+    co = np.asarray(co, dtype=np.float64)
+    cross = np.cross(co[loop_vert], co[loop_vert[loop_next]])
+    normals = np.stack([np.bincount(loop_face, cross[:,i], face_count) for i in range(3)], axis=1)
+    if not normalize: return normals
+    length = np.sqrt((normals**2).sum(axis=1))
+    return (normals/np.where(length > 0, length, 1)[:,None]).astype(np.float32)
+
+def vertexNormals(co, loop_vert, loop_next, loop_face, face_count):
+    # Area weighted vertex normals: the normals of the faces of a vertex summed by their area
+    faces = faceNormals(co, loop_vert, loop_next, loop_face, face_count, False)[loop_face]
+    normals = np.stack([np.bincount(loop_vert, faces[:,i], len(co)) for i in range(3)], axis=1)
+    length = np.sqrt((normals**2).sum(axis=1))
+    return (normals/np.where(length > 0, length, 1)[:,None]).astype(np.float32)
+
+def concaveAngles(co, loop_vert, loop_next, loop_face, face_normals):
+    # Largest dihedral angle (radians) of the concave edges at every vertex, 0 where all are convex.
+    # Corners along the same edge are found by sorting the edge keys of the face sides
+    start, end = loop_vert, loop_vert[loop_next]
+    keys = np.minimum(start, end).astype(np.int64)*len(co) + np.maximum(start, end)
+    order = np.argsort(keys, kind='stable')
+    pair = np.flatnonzero(keys[order[1:]] == keys[order[:-1]])
+    first, second = order[pair], order[pair + 1]
+    normal = face_normals[loop_face[first]]
+    angle = np.arccos(np.clip((normal*face_normals[loop_face[second]]).sum(axis=1), -1, 1))
+    # The second face bends to the front of the first one along a concave edge
+    probe = co[loop_vert[loop_next[loop_next[second]]]] - co[start[second]]
+    concave = (probe*normal).sum(axis=1) > 0
+    angles = np.zeros(len(co), dtype=np.float32)
+    np.maximum.at(angles, start[first][concave], angle[concave])
+    np.maximum.at(angles, end[first][concave], angle[concave])
+    return angles
+
+def cavity(co, normals, offsets, neighbors, verts):
+    # Mean elevation of the neighbors of verts above their tangent plane, -1 to 1: positive in
+    # creases and cavities, negative on ridges
+    starts = offsets[verts]
+    counts = offsets[verts + 1] - starts
+    owner = np.repeat(verts, counts)
+    other = neighbors[expandRanges(starts, counts)]
+    dot = np.zeros(len(owner), dtype=np.float32)
+    square = np.zeros(len(owner), dtype=np.float32)
+    for axis in range(3):
+        position = np.ascontiguousarray(co[:,axis])
+        edge = position[other] - position[owner]
+        dot += edge*np.ascontiguousarray(normals[:,axis])[owner]
+        square += edge*edge
+    sine = np.append(dot/np.sqrt(np.where(square > 0, square, 1)), np.float32(0))
+    # reduceat takes the first value of empty groups, vertices without neighbors get 0
+    total = np.add.reduceat(sine, np.minimum(np.cumsum(counts) - counts, len(owner)))
+    mean = np.where(counts > 0, total, 0)/np.maximum(counts, 1)
+    return (np.arcsin(np.clip(mean, -1, 1))/(np.pi/2)).astype(np.float32)
+
+def hemisphereDirections(samples):
+    # Cosine weighted directions around +z spread with a Fibonacci spiral, the fraction of them that
+    # hits something is the ambient occlusion
+    i = np.arange(samples) + 0.5
+    radius = np.sqrt(i/samples)
+    angle = i*np.pi*(3 - np.sqrt(5))
+    return np.stack((radius*np.cos(angle), radius*np.sin(angle), np.sqrt(1 - radius**2)), axis=1)
+
+def hemisphereRays(normals, directions, verts):
+    # (V,S,3) directions turned from +z onto every normal. Each vertex also spins them by an angle
+    # of its own against banding, taken from its index so the result doesn't depend on chunking
+    n = normals.astype(np.float64)
+    sign = np.where(n[:,2] >= 0, 1.0, -1.0)
+    a = -1/(sign + n[:,2])
+    b = n[:,0]*n[:,1]*a
+    tangent = np.stack((1 + sign*n[:,0]**2*a, sign*b, -sign*n[:,0]), axis=1)
+    bitangent = np.stack((b, sign + n[:,1]**2*a, -n[:,1]), axis=1)
+    spin = (verts*0.6180339887498949 % 1)*2*np.pi
+    cos, sin = np.cos(spin)[:,None], np.sin(spin)[:,None]
+    x = cos*directions[:,0] - sin*directions[:,1]
+    y = sin*directions[:,0] + cos*directions[:,1]
+    return x[...,None]*tangent[:,None] + y[...,None]*bitangent[:,None] + directions[:,2][None,:,None]*n[:,None]
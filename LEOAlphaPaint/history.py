@@ -0,0 +1,127 @@
+# Add-on level color history. A step keeps, for every color layer written while it was open, only
+# the corners that changed with their colors before and after, zlib compressed, so its memory grows
+# with the edit instead of the mesh. Byte layers keep their colors as the bytes they store, a quarter
+# of the float size. meshops.writeColors records into the open step, the
+# undo/redo operators replay the deltas with meshops.applyHistory.
+
+import contextlib
+import zlib
+
+import numpy as np
+
+from . import core, meshcache
+
+undoSteps = []
+redoSteps = []
+# Bytes held by undoSteps and redoSteps
+total = 0
+# Step being recorded: {'label', 'layers': {(mesh key, layer name): [mesh, layer name, old, new, byte]},
+# 'created': {(mesh key, layer name)}}
+pending = None
+
+def recording():
+    return pending is not None
+
+def record(mesh, name, old, new, byte=False):
+    # old/new are whole (N,4) layers, the arrays must not be modified afterwards. Only the first
+    # old and the last new of a layer are kept, the delta is computed once when the step ends.
+    # byte: the layer stores 8-bit colors
+    key = (meshcache.meshKey(mesh), name)
+    if key in pending['created']: return
+    entry = pending['layers'].setdefault(key, [mesh, name, old, None, byte])
+    entry[3] = new
+
+def created(mesh, name):
+    # Layers added while the step is open are not recorded, replaying colors into a layer that
+    # didn't exist before the step (e.g. a new isolation view) would write stale colors into it
+    key = (meshcache.meshKey(mesh), name)
+    pending['layers'].pop(key, None)
+    pending['created'].add(key)
+
+def pack(array):
+    return zlib.compress(np.ascontiguousarray(array).tobytes(), 1)
+
+def unpack(data, dtype, shape):
+    return np.frombuffer(zlib.decompress(data), dtype=dtype).reshape(shape)
+
+def packDelta(mesh, name, old, new, byte=False):
+    # Byte layers compare and keep what they store, writes that round to the same bytes are no change
+    if byte: old, new = core.toBytes(old), core.toBytes(new)
+    corners = np.flatnonzero((old != new).any(axis=1))
+    if not len(corners): return None
+    dtype = np.uint8 if byte else np.float32
+    # Sorted corners compress far better as gaps
+    delta = {'mesh': mesh, 'layer': name, 'corners_total': len(new), 'count': len(corners), 'byte': byte,
+        'corners': pack(np.diff(corners, prepend=0).astype(np.int32)),
+        'old': pack(old[corners].astype(dtype)), 'new': pack(new[corners].astype(dtype))}
+    delta['size'] = len(delta['corners']) + len(delta['old']) + len(delta['new'])
+    return delta
+
+def unpackDelta(delta, side):
+    corners = np.cumsum(unpack(delta['corners'], np.int32, -1))
+    if delta['byte']: return corners, unpack(delta[side], np.uint8, (-1, 4)).astype(np.float32)/np.float32(255)
+    return corners, unpack(delta[side], np.float32, (-1, 4))
+
+def stepSize(step):
+    return sum(delta['size'] for delta in step['deltas'])
+
+def size():
+    return total
+
+def trim(limit):
+    # Evicts the oldest steps first, redo steps go before any undo step. The newest step is kept
+    # even when it alone is over the limit
+    global total
+    while redoSteps and total > limit:
+        total -= stepSize(redoSteps.pop(0))
+    while len(undoSteps) > 1 and total > limit:
+        total -= stepSize(undoSteps.pop(0))
+
+def begin(label):
+    global pending
+    pending = {'label': label, 'layers': {}, 'created': set()}
+
+def end(limit):
+    # Returns the new step, None when nothing changed
+    global pending, total
+    step, pending = pending, None
+    deltas = []
+    for mesh, name, old, new, byte in step['layers'].values():
+        if new is None or len(old) != len(new): continue
+        delta = packDelta(mesh, name, old, new, byte)
+        if delta is not None: deltas.append(delta)
+    if not deltas: return None
+
+    undoSteps.append({'label': step['label'], 'deltas': deltas})
+    total += stepSize(undoSteps[-1]) - sum(map(stepSize, redoSteps))
+    redoSteps.clear()
+    trim(limit)
+    return undoSteps[-1]
+
+@contextlib.contextmanager
+def step(label, limit):
+    # limit None records nothing. Nested in an open step the writes go to that step
+    if limit is None or recording():
+        yield
+        return
+    begin(label)
+    try: yield
+    finally: end(limit)
+
+def undo():
+    # Returns (step, 'old') to replay, None when there is nothing to undo
+    if not undoSteps: return None
+    redoSteps.append(undoSteps.pop())
+    return redoSteps[-1], 'old'
+
+def redo():
+    if not redoSteps: return None
+    undoSteps.append(redoSteps.pop())
+    return undoSteps[-1], 'new'
+
+def clear():
+    global pending, total
+    undoSteps.clear()
+    redoSteps.clear()
+    pending = None
+    total = 0
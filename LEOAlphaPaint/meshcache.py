@@ -0,0 +1,60 @@
+# Per-mesh cache of the arrays the operators read: color layers, the loop->vertex/face maps and
+# the selection masks. Entries are shared by all operators, dropped when Blender reports the mesh
+# as changed (see the depsgraph handler in operators.py) and cleared on undo, redo and file load.
+# Cached arrays are read-only, readers that modify colors get a copy. Entries that are no arrays,
+# like meshops' color layer registry, must not be modified either.
+
+import weakref
+
+from . import profiling
+
+caches = {}
+# Meshes written by the add-on itself since the last depsgraph update, their cache is already current
+ownWrites = set()
+
+def meshKey(mesh):
+    try: return mesh.as_pointer()
+    except AttributeError: return id(mesh)
+
+def meshCache(mesh):
+    key = meshKey(mesh)
+    counts = (len(mesh.vertices), len(mesh.loops), len(mesh.polygons))
+    entry = caches.get(key)
+    if entry is None or entry['counts'] != counts or (entry['owner'] is not None and entry['owner']() is not mesh):
+        try:
+            owner = weakref.ref(mesh)
+            # Drop the arrays with the mesh, so its id can't hand them to a new one
+            weakref.finalize(mesh, caches.pop, key, None)
+        except TypeError:
+            # bpy structs can't be weakly referenced, as_pointer() plus the counts identify them
+            owner = None
+        entry = caches[key] = {'counts': counts, 'owner': owner}
+    return entry
+
+def cached(mesh, name, read):
+    entry = meshCache(mesh)
+    array = entry.get(name)
+    if array is None:
+        with profiling.phase('read'):
+            array = entry[name] = read()
+        try: array.flags.writeable = False
+        except AttributeError: pass
+    return array
+
+def store(mesh, name, array):
+    # Record an array the add-on just wrote, the caller hands it over and must not modify it anymore
+    array.flags.writeable = False
+    meshCache(mesh)[name] = array
+    ownWrites.add(meshKey(mesh))
+
+def discard(mesh, name):
+    meshCache(mesh).pop(name, None)
+    ownWrites.add(meshKey(mesh))
+
+def meshUpdated(key):
+    if key not in ownWrites:
+        caches.pop(key, None)
+
+def clear():
+    caches.clear()
+    ownWrites.clear()
@@ -0,0 +1,863 @@
+# Mesh level operations behind the add-on's operators. These only use the bpy.types.Mesh
+# interface (foreach_get/foreach_set and the color layer collection), never bpy itself, so
+# they run the same on a real mesh and on standin.StandInMesh.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from . import core, history, meshcache, profiling
+
+# Blender's KD-tree for matching elements between meshes, core's octree search without Blender.
+# Ray traced occlusion needs its BVH tree
+try: from mathutils import bvhtree, kdtree
+except ImportError: bvhtree = kdtree = None
+
+keyName = "_viewLayer_generated_"
+# Color layer collection of the running Blender, 'vertex_colors' or 'color_attributes' once
+# operators.register() resolved it. None probes every mesh, e.g. for stand-in meshes
+colorLayerApi = None
+# 8-bit working mode: layers the add-on creates or converts are BYTE_COLOR and colors are kept on
+# the 1/255 grid, so what is painted, blended and selected is exactly what the layer stores
+byteMode = False
+
+def resolveColorLayerApi(mesh_type, srgb_values):
+    # color_attributes also hold float and per vertex (POINT) layers. They are used when their values
+    # can be accessed as stored sRGB (color_srgb, like vertex_colors' color), their color is linear
+    global colorLayerApi
+    if 'color_attributes' in mesh_type.bl_rna.properties and (srgb_values or 'vertex_colors' not in mesh_type.bl_rna.properties):
+        colorLayerApi = 'color_attributes'
+    else:
+        colorLayerApi = 'vertex_colors'
+
+def colorValues(layer):
+    # foreach_get/foreach_set attribute of a layer's colors
+    return "color_srgb" if colorLayerApi == 'color_attributes' else "color"
+
+def layerDomain(layer):
+    # 'CORNER' or 'POINT', vertex_colors layers are always per corner
+    return getattr(layer, 'domain', 'CORNER')
+
+def getColorLayers(mesh):
+    if colorLayerApi is not None: return getattr(mesh, colorLayerApi)
+    try: return mesh.vertex_colors
+    except: return mesh.color_attributes
+
+def layerNames(mesh):
+    # Registry of the mesh's color layer names, kept until the add-on adds or removes a layer or
+    # Blender reports the mesh as changed
+    return meshcache.cached(mesh, "layer_names", lambda: tuple(getColorLayers(mesh).keys()))
+
+def layerItems(mesh, none_item=False):
+    # EnumProperty items of the color layers, optionally led by a 'NONE' item
+    def read():
+        items = [('NONE','None','')] if none_item else []
+        items.extend((name, name, "") for name in layerNames(mesh))
+        return items
+    return meshcache.cached(mesh, "layer_items:none" if none_item else "layer_items", read)
+
+def discardLayerNames(mesh):
+    for key in ("layer_names", "layer_items", "layer_items:none"):
+        meshcache.discard(mesh, key)
+
+def activeLayerName(obj):
+    if colorLayerApi != 'color_attributes':
+        try: return obj.vertex_colors.active.name
+        except: pass
+    try: return obj.attributes.active_color.name
+    except: return None
+
+def findActiveColorLayer(color_data, obj):
+    name = activeLayerName(obj)
+    if name is not None and name in layerNames(obj): return color_data[name]
+    return color_data.active
+
+def trySetActiveVC(obj, basename):
+    if colorLayerApi != 'color_attributes':
+        try:
+            obj.vertex_colors.active = obj.vertex_colors[basename]
+            return
+        except: pass
+    try: obj.attributes.active_color = obj.attributes[basename]
+    except: pass
+
+def workingDataType(layer):
+    # Data type of a layer recreated from layer, e.g. in another domain
+    return 'BYTE_COLOR' if byteMode else getattr(layer, 'data_type', 'BYTE_COLOR')
+
+def newColorLayer(mesh, name, domain='CORNER', data_type='BYTE_COLOR'):
+    meshcache.discard(mesh, "color:" + name)
+    discardLayerNames(mesh)
+    if history.recording(): history.created(mesh, name)
+    if colorLayerApi != 'color_attributes' and domain == 'CORNER' and data_type == 'BYTE_COLOR':
+        try: return mesh.vertex_colors.new(name=name)
+        except: pass
+    return mesh.color_attributes.new(name, data_type, domain)
+
+def removeColorLayer(mesh, name):
+    meshcache.discard(mesh, "color:" + name)
+    discardLayerNames(mesh)
+    color_data = getColorLayers(mesh)
+    color_data.remove(color_data[name])
+
+def readColors(layer, writable=True):
+    # writable=False returns the cached array itself, for callers that only read
+    def read():
+        colors = np.empty(len(layer.data)*4, dtype=np.float32)
+        layer.data.foreach_get(colorValues(layer), colors)
+        return colors.reshape(-1, 4)
+    colors = meshcache.cached(layer.id_data, "color:" + layer.name, read)
+    return colors.copy() if writable else colors
+
+def writeColors(layer, colors):
+    byte = getattr(layer, 'data_type', 'BYTE_COLOR') != 'FLOAT_COLOR'
+    if history.recording():
+        history.record(layer.id_data, layer.name, readColors(layer, False), colors.reshape(-1, 4), byte)
+    with profiling.phase('write'):
+        layer.data.foreach_set(colorValues(layer), colors.ravel())
+    # Byte layers round what they store, those are read back instead of guessing the rounding
+    if not byte:
+        meshcache.store(layer.id_data, "color:" + layer.name, colors.reshape(-1, 4))
+    else:
+        meshcache.discard(layer.id_data, "color:" + layer.name)
+
+def updateMesh(mesh):
+    with profiling.phase('update'):
+        mesh.update()
+
+def loopVertexIndex(mesh):
+    def read():
+        loop_vert = np.empty(len(mesh.loops), dtype=np.int32)
+        mesh.loops.foreach_get("vertex_index", loop_vert)
+        return loop_vert
+    return meshcache.cached(mesh, "loop_vert", read)
+
+def faceLoops(mesh):
+    # (loop_start, loop_total) of every face
+    def read():
+        starts = np.empty(len(mesh.polygons), dtype=np.int32)
+        totals = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", starts)
+        mesh.polygons.foreach_get("loop_total", totals)
+        return starts, totals
+    return meshcache.cached(mesh, "face_loops", read)
+
+def loopFaceIndex(mesh):
+    def read():
+        starts, totals = faceLoops(mesh)
+        offsets = np.repeat(starts - (np.cumsum(totals) - totals), totals)
+        loop_face = np.empty(len(mesh.loops), dtype=np.int32)
+        loop_face[offsets + np.arange(len(offsets))] = np.repeat(np.arange(len(totals), dtype=np.int32), totals)
+        return loop_face
+    return meshcache.cached(mesh, "loop_face", read)
+
+def vertexPositions(mesh):
+    def read():
+        co = np.empty(len(mesh.vertices)*3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        return co.reshape(-1, 3)
+    return meshcache.cached(mesh, "co", read)
+
+def loopNextIndex(mesh):
+    def read():
+        starts, totals = faceLoops(mesh)
+        return core.nextCorners(starts, totals, len(mesh.loops))
+    return meshcache.cached(mesh, "loop_next", read)
+
+def vertexNormals(mesh):
+    def read():
+        with profiling.phase('compute'):
+            return core.vertexNormals(vertexPositions(mesh), loopVertexIndex(mesh), loopNextIndex(mesh),
+                loopFaceIndex(mesh), len(mesh.polygons))
+    return meshcache.cached(mesh, "vertex_normals", read)
+
+def faceNormals(mesh):
+    def read():
+        with profiling.phase('compute'):
+            return core.faceNormals(vertexPositions(mesh), loopVertexIndex(mesh), loopNextIndex(mesh),
+                loopFaceIndex(mesh), len(mesh.polygons))
+    return meshcache.cached(mesh, "face_normals", read)
+
+def concaveAngles(mesh):
+    def read():
+        with profiling.phase('compute'):
+            return core.concaveAngles(vertexPositions(mesh), loopVertexIndex(mesh), loopNextIndex(mesh),
+                loopFaceIndex(mesh), faceNormals(mesh))
+    return meshcache.cached(mesh, "concave_angles", read)
+
+def bvhTree(mesh):
+    # mathutils BVH tree of the mesh's faces split into triangles
+    def read():
+        triangles = loopVertexIndex(mesh)[core.fanTriangles(*faceLoops(mesh))]
+        with profiling.phase('compute'):
+            return bvhtree.BVHTree.FromPolygons(vertexPositions(mesh).tolist(), triangles.tolist(), all_triangles=True)
+    return meshcache.cached(mesh, "bvh", read)
+
+def vertexSelection(mesh):
+    def read():
+        select = np.empty(len(mesh.vertices), dtype=bool)
+        mesh.vertices.foreach_get("select", select)
+        return select
+    return meshcache.cached(mesh, "vert_select", read)
+
+def vertexAdjacency(mesh):
+    # (offsets, neighbors) CSR arrays of the vertices connected by an edge
+    def read():
+        edges = np.empty(len(mesh.edges)*2, dtype=np.int32)
+        mesh.edges.foreach_get("vertices", edges)
+        with profiling.phase('compute'):
+            return core.vertexAdjacency(edges, len(mesh.vertices))
+    return meshcache.cached(mesh, "adjacency", read)
+
+def vertexCorners(mesh):
+    # (offsets, corners) CSR arrays of the corners of every vertex
+    def read():
+        with profiling.phase('compute'):
+            return core.vertexCorners(loopVertexIndex(mesh), len(mesh.vertices))
+    return meshcache.cached(mesh, "vertex_corners", read)
+
+def uvKeys(mesh):
+    # The active UV map's coordinates of every corner packed into one int, None without a UV map
+    try: uv_layer = mesh.uv_layers.active
+    except AttributeError: return None
+    if uv_layer is None: return None
+    def read():
+        uv = np.empty(len(mesh.loops)*2, dtype=np.float32)
+        uv_layer.data.foreach_get("uv", uv)
+        return uv.view(np.uint64)
+    # Switching the active map is no depsgraph update, each map has its own entry
+    return meshcache.cached(mesh, "uv_keys:" + uv_layer.name, read)
+
+def faceSelection(mesh):
+    def read():
+        select = np.empty(len(mesh.polygons), dtype=bool)
+        mesh.polygons.foreach_get("select", select)
+        return select
+    return meshcache.cached(mesh, "face_select", read)
+
+def paintMask(mesh, use_all=True):
+    # Corners touched by the fill/sample tools, None if nothing may be painted
+    if not mesh.use_paint_mask_vertex and not use_all: return None
+    return core.cornerMask(loopVertexIndex(mesh), loopFaceIndex(mesh),
+        vertexSelection(mesh) if mesh.use_paint_mask_vertex else None,
+        faceSelection(mesh) if mesh.use_paint_mask else None)
+
+def paintCorners(mesh, use_all=True):
+    # paintMask as corner indices, cached so repeated fills on the same selection skip rebuilding it
+    if not mesh.use_paint_mask_vertex and not use_all: return None
+    key = "paint_corners:%d%d" % (mesh.use_paint_mask_vertex, mesh.use_paint_mask)
+    def read():
+        with profiling.phase('compute'):
+            return np.flatnonzero(paintMask(mesh, use_all))
+    return meshcache.cached(mesh, key, read)
+
+def paintElements(mesh, domain, use_all=True):
+    # paintCorners for a layer of the given domain, POINT layers paint every vertex with an allowed corner
+    corners = paintCorners(mesh, use_all)
+    if corners is None or domain == 'CORNER': return corners
+    key = "paint_points:%d%d" % (mesh.use_paint_mask_vertex, mesh.use_paint_mask)
+    def read():
+        with profiling.phase('compute'):
+            return np.flatnonzero(core.pointMask(corners, loopVertexIndex(mesh), len(mesh.vertices)))
+    return meshcache.cached(mesh, key, read)
+
+def discardPaintCorners(mesh):
+    for prefix in ("paint_corners:", "paint_points:"):
+        for flags in ("00", "01", "10", "11"):
+            meshcache.discard(mesh, prefix + flags)
+
+def readColorsAs(mesh, layer, domain):
+    # Colors of layer in the given domain: per vertex layers are spread to their corners, corner
+    # layers are averaged per vertex. Arrays in the layer's own domain are the cached read-only ones
+    colors = readColors(layer, False)
+    if layerDomain(layer) == domain: return colors
+    if domain == 'CORNER': return colors[loopVertexIndex(mesh)]
+    return core.pointColors(colors, loopVertexIndex(mesh), len(mesh.vertices))
+
+def pointUniform(mesh, layer):
+    # Fraction of vertices whose corners all have the same color in a corner layer
+    if layerDomain(layer) == 'POINT' or not len(mesh.vertices): return 1.0
+    return float(core.uniformPoints(readColors(layer, False), loopVertexIndex(mesh), len(mesh.vertices)).mean())
+
+def convertDomain(mesh, name, domain):
+    # Stores layer name per vertex ('POINT', corners of a vertex are averaged) or per corner ('CORNER'),
+    # keeping its name, data type (BYTE_COLOR in 8-bit mode) and whether it is active. Returns the new layer
+    layer = getColorLayers(mesh)[name]
+    data_type = workingDataType(layer)
+    if layerDomain(layer) == domain and getattr(layer, 'data_type', 'BYTE_COLOR') == data_type: return layer
+    colors = readColorsAs(mesh, layer, domain)
+    if data_type == 'BYTE_COLOR': colors = core.quantize(colors)
+    active = activeLayerName(mesh) == name
+    removeColorLayer(mesh, name)
+    layer = newColorLayer(mesh, name, domain, data_type)
+    writeColors(layer, colors)
+    updateMesh(mesh)
+    if active: trySetActiveVC(mesh, name)
+    return getColorLayers(mesh)[name]
+
+def isolatedChannels(isolated):
+    channels = [int(x) for x in isolated if x]
+    if not channels or 3 in channels: channels = [0,1,2]
+    return channels
+
+def baseChannels(isolated, color):
+    # (channels, rgba) the fill tools write into the base layer when the isolation is only a
+    # viewport view. An isolated alpha takes the brush value, like painting the alpha view layer grey
+    if '3' in isolated: return [3], (0, 0, 0, max(color[:3]))
+    return isolatedChannels(isolated), tuple(color[:3]) + (1,)
+
+def toggleIsolated(isolated, ch, mono):
+    # Channel string after clicking channel ch, same rules as isolateChannel's view layer names
+    channel = str(ch)
+    if channel in isolated: return isolated.replace(channel, "")
+    return channel if mono else isolated + channel
+
+def channelView(colors, isolated):
+    # What the LAYER isolate mode's view layer would hold for the isolated channels of colors
+    channels = [int(x) for x in isolated if x]
+    if 3 in channels: return core.alphaView(colors[:,3])
+    if channels: return core.isolatedView(colors, channels)
+    return colors
+
+def mergeView(colors, view, isolated):
+    # Writes the isolated channels of a channelView back into colors, like un-isolating does
+    channels = [int(x) for x in isolated if x]
+    if 3 in channels: colors[:,3] = core.colorValue(view)
+    elif channels: colors[:,channels] = view[:,channels]
+    return colors
+
+def blendChannels(mesh, src_name, dst_name, blend_mode, src_ch, factor_name='NONE', factor_slider=1.0, source=None,
+        isolated="", base_view=False):
+    # Returns the isolated channel string of dst, or None for an unsupported channel combination.
+    # source: colors to blend in dst's domain instead of layer src_name, e.g. from another mesh.
+    # base_view: dst is the base layer with the channels isolated by the viewport material, the
+    # blend works on their channelView and only writes those channels back
+    color_data = getColorLayers(mesh)
+
+    src_ch = [i for i, x in enumerate(src_ch) if x]
+    if not src_ch: src_ch = [0,1,2]
+
+    base_view = base_view and bool(isolated)
+    if not base_view: isolated = dst_name.split(keyName)[1] if keyName in dst_name else ""
+    isolated_channels = [int(x) for x in isolated if x]
+    alpha_mode = bool(3 in isolated_channels)
+    if not isolated_channels or alpha_mode: isolated_channels = [0,1,2]
+
+    if blend_mode == 'ALPHAOVER':
+        src_ch = [x for x in src_ch if x!=3]
+        isolated_channels = [x for x in isolated_channels if x!=3]
+
+    mono = len(src_ch) == 1 or len(isolated_channels) == 1 or alpha_mode
+    if not mono and set(src_ch) != set(isolated_channels):
+        return None
+
+    # Source and factor are read in the destination's domain
+    domain = layerDomain(color_data[dst_name])
+    dst = readColors(color_data[dst_name])
+    base = dst if base_view else None
+    if base_view: dst = channelView(base, isolated)
+    if source is None: source = readColorsAs(mesh, color_data[src_name], domain)
+    ref = core.sourceReference(source, src_ch, isolated_channels, mono)
+    if byteMode: ref = core.byteBlend(blend_mode, ref, dst, isolated_channels)
+    else: ref = core.blendArrays(blend_mode, ref, dst, isolated_channels)
+
+    if factor_name != 'NONE':
+        factor = readColorsAs(mesh, color_data[factor_name], domain)[:,isolated_channels]*factor_slider
+    else:
+        factor = factor_slider
+    core.mixChannels(dst, ref, isolated_channels, factor)
+    if base_view: dst = mergeView(base, dst, isolated)
+    # Byte layers round on their own
+    if byteMode and getattr(color_data[dst_name], 'data_type', 'BYTE_COLOR') == 'FLOAT_COLOR': dst = core.quantize(dst)
+
+    writeColors(color_data[dst_name], dst)
+    updateMesh(mesh)
+    trySetActiveVC(mesh, dst_name)
+    return isolated
+
+def elementPositions(mesh, domain):
+    # Vertex positions, or corner positions pulled slightly into their face for CORNER
+    if domain == 'POINT': return vertexPositions(mesh)
+    def read():
+        with profiling.phase('compute'):
+            return core.cornerPoints(vertexPositions(mesh), loopVertexIndex(mesh), loopFaceIndex(mesh))
+    return meshcache.cached(mesh, "corner_points", read)
+
+def nearestElements(points, queries):
+    if kdtree is None: return core.nearestPoints(points, queries)
+    tree = kdtree.KDTree(len(points))
+    for i, co in enumerate(points.tolist()):
+        tree.insert(co, i)
+    tree.balance()
+    return np.fromiter((tree.find(co)[1] for co in queries.tolist()), dtype=np.int64, count=len(queries))
+
+def transferMap(mesh, src_mesh, matrix, src_domain, domain):
+    # Nearest src_mesh element (src_domain) of every mesh element (domain), matrix maps mesh's local
+    # space into src_mesh's (the source object's matrix_world inverted @ the object's). Kept in mesh's
+    # cache per source mesh and domains until either mesh or the matrix changes
+    key = "transfer:%d:%s:%s" % (meshcache.meshKey(src_mesh), src_domain, domain)
+    matrix = np.asarray(matrix, dtype=np.float64)
+    source = elementPositions(src_mesh, src_domain)
+    entry = meshcache.meshCache(mesh).get(key)
+    if entry is not None and np.array_equal(entry['matrix'], matrix) and \
+            (entry['source'] is source or np.array_equal(entry['source'], source)):
+        return entry['map']
+    with profiling.phase('compute'):
+        mapping = nearestElements(source, core.transformPoints(elementPositions(mesh, domain), matrix))
+    mapping.flags.writeable = False
+    meshcache.meshCache(mesh)[key] = {'source': source, 'matrix': matrix, 'map': mapping}
+    return mapping
+
+def transferChannels(mesh, src_mesh, matrix, src_name, dst_name, blend_mode, src_ch, factor_name='NONE', factor_slider=1.0,
+        isolated="", base_view=False):
+    # blendChannels with layer src_name of another mesh, every element takes the color of the
+    # nearest source element. Returns what blendChannels returns
+    src_layer = getColorLayers(src_mesh)[src_name]
+    domain = layerDomain(getColorLayers(mesh)[dst_name])
+    mapping = transferMap(mesh, src_mesh, matrix, layerDomain(src_layer), domain)
+    return blendChannels(mesh, src_name, dst_name, blend_mode, src_ch, factor_name, factor_slider,
+        source=readColors(src_layer, False)[mapping], isolated=isolated, base_view=base_view)
+
+def paintChannel(mesh, color, isolated, use_all=True, base_view=False):
+    # Returns False when nothing may be painted (no vertex mask and ALL is off). base_view: the
+    # channels are isolated by the viewport material, the active layer is the base layer itself
+    color_layer = findActiveColorLayer(getColorLayers(mesh), mesh)
+    elements = paintElements(mesh, layerDomain(color_layer), use_all)
+    if elements is None: return False
+
+    channels, color = baseChannels(isolated, color) if base_view else (isolatedChannels(isolated), color[:3])
+    if byteMode: color = core.quantize(np.asarray(color, dtype=np.float32))
+    colors = core.fillChannels(readColors(color_layer), elements, channels, color)
+    writeColors(color_layer, colors)
+    updateMesh(mesh)
+    return True
+
+def channelTarget(mesh, ch):
+    # (layer, columns) that show channel ch of the active layer: the isolated view layer when it
+    # shows ch (an alpha view as grey), the base layer's channel otherwise
+    color_data = getColorLayers(mesh)
+    layer = findActiveColorLayer(color_data, mesh)
+    if keyName not in layer.name: return layer, [ch]
+    basename, isolated = layer.name.split(keyName)[:2]
+    if '3' in isolated and ch == 3: return layer, [0,1,2]
+    if '3' not in isolated and str(ch) in isolated: return layer, [ch]
+    if basename in layerNames(mesh): return color_data[basename], [ch]
+    return None, None
+
+def generateChannel(mesh, ch, generate, use_all=True):
+    # Writes generate(verts), one value per vertex of the sorted vertex indices verts, into channel
+    # ch of the painted elements. Returns False when nothing may be painted
+    layer, columns = channelTarget(mesh, ch)
+    if layer is None: return False
+    domain = layerDomain(layer)
+    elements = paintElements(mesh, domain, use_all)
+    if elements is None: return False
+    if not len(elements): return True
+    loop_vert = loopVertexIndex(mesh)
+    if domain == 'POINT': verts, element_vert = elements, np.arange(len(elements))
+    else:
+        element_vert = loop_vert[elements]
+        used = np.zeros(len(mesh.vertices), dtype=bool)
+        used[element_vert] = True
+        verts = np.flatnonzero(used)
+        element_vert = (np.cumsum(used) - 1)[element_vert]
+    values = generate(verts)[element_vert].astype(np.float32)
+    if byteMode: values = core.quantize(values)
+    colors = readColors(layer)
+    colors[elements[:,None], columns] = values[:,None]
+    writeColors(layer, colors)
+    updateMesh(mesh)
+    return True
+
+def meshSize(mesh):
+    # Length of the diagonal of the mesh's bounding box
+    co = vertexPositions(mesh)
+    return float(np.sqrt(((co.max(axis=0) - co.min(axis=0))**2).sum())) if len(co) else 0.0
+
+# Rays ambientOcclusion casts at most, each is a call into mathutils from Python
+RAY_BUDGET = 1 << 22
+
+def raySamples(count, samples, budget=RAY_BUDGET):
+    # Rays per vertex for count vertices, fewer than samples when all of them would be over budget
+    return int(min(samples, max(1, budget//max(count, 1))))
+
+def rayOcclusion(mesh, verts, samples, distance, chunk=1 << 16):
+    # Fraction of samples hemisphere rays from every vertex of verts hitting the mesh within distance
+    # times the mesh's size. mathutils holds the GIL, so the rays are cast one chunk of about chunk
+    # rays after the other instead of from threads
+    tree = bvhTree(mesh)
+    co = vertexPositions(mesh)
+    normals = vertexNormals(mesh)
+    size = meshSize(mesh)
+    distance, bias = distance*size, 1e-4*size
+    directions = core.hemisphereDirections(samples)
+    occlusion = np.empty(len(verts), dtype=np.float32)
+    step = max(1, chunk//samples)
+    for i in range(0, len(verts), step):
+        part = verts[i:i+step]
+        origins = np.repeat(co[part] + normals[part]*bias, samples, axis=0).tolist()
+        rays = core.hemisphereRays(normals[part], directions, part).reshape(-1, 3).tolist()
+        hits = np.fromiter((tree.ray_cast(o, d, distance)[0] is not None for o, d in zip(origins, rays)),
+            dtype=bool, count=len(rays))
+        occlusion[i:i+step] = hits.reshape(-1, samples).mean(axis=1)
+    return occlusion
+
+def ambientOcclusion(mesh, mode='RAYS', samples=16, distance=0.1, strength=1.0, use_all=True, ray_budget=RAY_BUDGET):
+    # Writes 1 - strength*occlusion into R of the painted elements. 'RAYS' casts samples rays up to
+    # distance (relative to the mesh's size) from every vertex, fewer when that would be more than
+    # ray_budget rays in total. 'CAVITY' only looks at the angles to the neighboring vertices, all
+    # in NumPy. Returns False when nothing may be painted, otherwise the rays cast per vertex
+    # (samples for 'CAVITY')
+    if mode == 'RAYS' and bvhtree is None: raise ValueError("Ray traced occlusion needs Blender's mathutils")
+    used = [samples]
+    def generate(verts):
+        with profiling.phase('compute'):
+            if mode == 'CAVITY':
+                offsets, neighbors = vertexAdjacency(mesh)
+                occlusion = np.maximum(core.cavity(vertexPositions(mesh), vertexNormals(mesh), offsets, neighbors, verts), 0)
+            else:
+                used[0] = raySamples(len(verts), samples, ray_budget)
+                occlusion = rayOcclusion(mesh, verts, used[0], distance)
+            return np.clip(1 - strength*occlusion, 0, 1)
+    return generateChannel(mesh, 0, generate, use_all) and used[0]
+
+def rayThickness(mesh, verts, distance):
+    # Distance to the opposite side of the mesh behind every vertex of verts, from one ray against
+    # the normal. Relative to the mesh's size like distance, which is the result when nothing is hit
+    tree = bvhTree(mesh)
+    co = vertexPositions(mesh)
+    normals = vertexNormals(mesh)[verts]
+    size = meshSize(mesh)
+    origins = (co[verts] - normals*(1e-4*size)).tolist()
+    ray_cast = tree.ray_cast
+    hits = (ray_cast(o, d, distance*size)[3] for o, d in zip(origins, (-normals).tolist()))
+    return np.fromiter((distance*size if hit is None else hit for hit in hits), dtype=np.float32, count=len(verts))/np.float32(size or 1)
+
+def outlineThickness(mesh, thickness=0.02, concave_angle=np.pi/3, curve=None, alpha_range=(0.106, 0.502), use_all=True):
+    # Writes an outline thickness estimated from the local feature size into A of the painted elements.
+    # Parts thinner than thickness (relative to the mesh's size, 0 skips the rays) and vertices on
+    # edges that are concave up to concave_angle go down to alpha_range[0], the rest stays at
+    # alpha_range[1]. curve: values at evenly spaced steps from 0 (thin or concave) to 1 that
+    # reshape the estimate, None keeps it linear. Returns False when nothing may be painted
+    if thickness > 0 and bvhtree is None: raise ValueError("Thickness from rays needs Blender's mathutils")
+    def generate(verts):
+        with profiling.phase('compute'):
+            feature = 1 - np.clip(concaveAngles(mesh)[verts]/concave_angle, 0, 1)
+            if thickness > 0: feature *= np.clip(rayThickness(mesh, verts, thickness)/thickness, 0, 1)
+            if curve is not None: feature = np.interp(feature, np.linspace(0, 1, len(curve)), curve)
+            return alpha_range[0] + (alpha_range[1] - alpha_range[0])*np.clip(feature, 0, 1)
+    return generateChannel(mesh, 3, generate, use_all)
+
+def smoothChannels(mesh, isolated, iterations=10, factor=0.5, seams='NONE', use_all=True, base_view=False):
+    # Laplacian smoothing of the isolated channels of the painted elements, masked out elements
+    # hold their colors. seams: 'NONE' smooths per vertex across every edge, 'COLOR' and 'UV' smooth
+    # the corners of a vertex with different colors or UV coordinates separately, so hard seams stay
+    # ('UV' keeps color seams on meshes without a UV map). Returns False when nothing may be painted
+    color_layer = findActiveColorLayer(getColorLayers(mesh), mesh)
+    domain = layerDomain(color_layer)
+    elements = paintElements(mesh, domain, use_all)
+    if elements is None: return False
+    if not len(elements): return True
+
+    channels = baseChannels(isolated, (0, 0, 0))[0] if base_view else isolatedChannels(isolated)
+    colors = readColors(color_layer)
+    loop_vert = loopVertexIndex(mesh)
+    with profiling.phase('compute'):
+        if domain == 'POINT':
+            offsets, neighbors = vertexAdjacency(mesh)
+            node, values = np.arange(len(colors)), colors[:,channels]
+        elif seams == 'NONE':
+            offsets, neighbors = vertexAdjacency(mesh)
+            node, values = loop_vert, core.pointColors(colors[:,channels], loop_vert, len(mesh.vertices))
+        else:
+            keys = uvKeys(mesh) if seams == 'UV' else None
+            if keys is None: keys = core.toBytes(colors).view(np.uint32).ravel()
+            node, count = core.cornerWedges(loop_vert, keys)
+            offsets, neighbors = core.wedgeAdjacency(node, loopNextIndex(mesh), count)
+            values = core.pointColors(colors[:,channels], node, count)
+        movable = np.zeros(len(values), dtype=bool)
+        movable[node[elements]] = True
+        values = core.smoothValues(values, offsets, neighbors, movable, iterations, factor)
+        colors[elements[:,None], channels] = values[node[elements]]
+        if byteMode: colors = core.quantize(colors)
+    writeColors(color_layer, colors)
+    updateMesh(mesh)
+    return True
+
+def gradientPreview(mesh):
+    # Corners (vertices of POINT layers) the gradient tool paints, the vertex each takes its color from
+    # and the colors from before the drag, kept for every preview update
+    loop_vert = loopVertexIndex(mesh)
+    corners = paintCorners(mesh)
+    verts, corner_vert = np.unique(loop_vert[corners], return_inverse=True)
+    color_layer = findActiveColorLayer(getColorLayers(mesh), mesh)
+    if layerDomain(color_layer) == 'POINT':
+        elements, element_vert = verts, np.arange(len(verts))
+    else:
+        elements, element_vert = corners, corner_vert.ravel()
+    return {'layer': color_layer.name, 'base': readColors(color_layer, False), 'elements': elements,
+        'verts': verts, 'element_vert': element_vert, 'matrix': None, 'region_size': None}
+
+def projectPreview(mesh, preview, matrix, region_size):
+    # matrix is the view's perspective_matrix @ the object's matrix_world, region_size its (width, height).
+    # The projection is only redone when the view changed
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if preview['matrix'] is not None and np.array_equal(preview['matrix'], matrix) and preview['region_size'] == tuple(region_size):
+        return
+    xy, visible = core.regionPositions(vertexPositions(mesh)[preview['verts']], matrix, region_size)
+    preview.update(matrix=matrix, region_size=tuple(region_size), xy=xy, visible=visible)
+
+def applyGradient(mesh, preview, start_point, end_point, start_color, end_color, circular_gradient=False, use_hue_blend=False):
+    # Corners of vertices behind the view are left alone, alpha is kept
+    t = core.gradientFactor(preview['xy'], start_point, end_point, circular_gradient)
+    vert_colors = core.gradientColors(t, start_color, end_color, use_hue_blend)
+    visible = preview['visible'][preview['element_vert']]
+    colors = preview['base'].copy()
+    colors[preview['elements'][visible],:3] = vert_colors[preview['element_vert'][visible]]
+    writeColors(getColorLayers(mesh)[preview['layer']], colors)
+    updateMesh(mesh)
+
+def restoreGradient(mesh, preview):
+    writeColors(getColorLayers(mesh)[preview['layer']], preview['base'])
+    updateMesh(mesh)
+
+def paintGradient(mesh, matrix, region_size, start_point, end_point, start_color, end_color,
+        circular_gradient=False, use_hue_blend=False):
+    preview = gradientPreview(mesh)
+    projectPreview(mesh, preview, matrix, region_size)
+    applyGradient(mesh, preview, start_point, end_point, start_color, end_color, circular_gradient, use_hue_blend)
+
+def applyHistory(step, side):
+    # Replays a history step's 'old' (undo) or 'new' (redo) colors, returns the number of deltas
+    # skipped because their layer was removed or the mesh changed size since
+    skipped = 0
+    for delta in step['deltas']:
+        color_data = getColorLayers(delta['mesh'])
+        if delta['layer'] not in layerNames(delta['mesh']) or len(color_data[delta['layer']].data) != delta['corners_total']:
+            skipped += 1
+            continue
+        layer = color_data[delta['layer']]
+        corners, values = history.unpackDelta(delta, side)
+        colors = readColors(layer)
+        colors[corners] = values
+        writeColors(layer, colors)
+        updateMesh(delta['mesh'])
+    return skipped
+
+def shownColors(color_layer, isolated="", base_view=False):
+    # Colors of the active layer as the isolation shows them, base_view like in selectByColors
+    colors = readColors(color_layer, False)
+    return channelView(colors, isolated) if base_view else colors
+
+def sampleAverage(mesh, use_all=True, isolated="", base_view=False):
+    color_layer = findActiveColorLayer(getColorLayers(mesh), mesh)
+    elements = paintElements(mesh, layerDomain(color_layer), use_all)
+    if elements is None: return None
+    return core.averageColor(shownColors(color_layer, isolated, base_view), elements)
+
+def selectByColors(mesh, targets, margin, restrict_loops=False, isolated="", base_view=False):
+    # In 8-bit mode the targets are quantized like the colors they are compared with. base_view:
+    # the channels are isolated by the viewport material, the colors are compared as the LAYER
+    # mode's view layer holds them
+    if byteMode: targets = core.quantize(np.asarray(targets, dtype=np.float32))
+    color_layer = findActiveColorLayer(getColorLayers(mesh), mesh)
+    match = core.matchColors(shownColors(color_layer, isolated, base_view), targets, margin)
+    if layerDomain(color_layer) == 'POINT': match = match[loopVertexIndex(mesh)]
+    return writeVertexSelection(mesh, core.selectVertices(match, loopVertexIndex(mesh), vertexSelection(mesh), restrict_loops))
+
+def selectRegion(mesh, margin, restrict_loops=False, isolated="", base_view=False):
+    # Grows the vertex selection through edges into vertices within margin of the color of the
+    # selected vertex they are reached from, restrict_loops only enters vertices whose corners all
+    # match. None when nothing is selected, base_view like in selectByColors
+    seeds = vertexSelection(mesh)
+    if not seeds.any(): return None
+    color_layer = findActiveColorLayer(getColorLayers(mesh), mesh)
+    vertex_rows = None if layerDomain(color_layer) == 'POINT' else vertexCorners(mesh)
+    offsets, neighbors = vertexAdjacency(mesh)
+    return writeVertexSelection(mesh, core.growColorRegions(shownColors(color_layer, isolated, base_view), vertex_rows,
+        offsets, neighbors, seeds, margin, restrict_loops, byteMode))
+
+def writeVertexSelection(mesh, select):
+    mesh.use_paint_mask_vertex = True
+    with profiling.phase('write'):
+        mesh.vertices.foreach_set("select", select)
+    meshcache.store(mesh, "vert_select", select)
+    discardPaintCorners(mesh)
+    updateMesh(mesh)
+    return select
+
+def paletteColors(mesh, max_colors=0, method='MEDIAN_CUT'):
+    # (rgb, corner count) of the masked colors, reduced to max_colors with method if there are more.
+    # POINT layers count vertices
+    mask = core.cornerMask(loopVertexIndex(mesh), loopFaceIndex(mesh),
+        vertexSelection(mesh) if mesh.use_paint_mask_vertex else None,
+        faceSelection(mesh) if mesh.use_paint_mask else None)
+    color_layer = findActiveColorLayer(getColorLayers(mesh), mesh)
+    if layerDomain(color_layer) == 'POINT': mask = core.pointMask(mask, loopVertexIndex(mesh), len(mesh.vertices))
+    colors, counts = core.uniqueColors(readColors(color_layer, False), mask)
+    if max_colors and len(colors) > max_colors:
+        colors, counts = core.reduceColors(colors, counts, max_colors, method)
+    return colors, counts
+
+def quickOptimize(mesh, color, delete_old_vc=True, fill=None):
+    # fill: optional (N,4) buffer of color with N >= the mesh's corners, shared by quickOptimizeMeshes
+    color_data = getColorLayers(mesh)
+    has_color = 'COLOR' in layerNames(mesh)
+
+    if delete_old_vc:
+        for layer in [x for x in layerNames(mesh) if x != 'COLOR']:
+            removeColorLayer(mesh, layer)
+
+    if not (delete_old_vc and has_color):
+        # Without deleting, an existing COLOR is kept around as a copy (COLOR.001)
+        domain = layerDomain(color_data['COLOR']) if has_color else 'CORNER'
+        backup = readColors(color_data['COLOR'], False) if has_color else None
+        new_layer = newColorLayer(mesh, 'COLOR', domain)
+        if backup is not None: writeColors(new_layer, backup)
+
+    # Exports take per corner colors, in 8-bit mode stored as bytes
+    convertDomain(mesh, 'COLOR', 'CORNER')
+
+    color_layer = getColorLayers(mesh)['COLOR']
+    if fill is None or len(fill) < len(color_layer.data):
+        fill = np.tile(np.asarray(color, dtype=np.float32), (len(color_layer.data), 1))
+    writeColors(color_layer, fill[:len(color_layer.data)])
+    updateMesh(mesh)
+    trySetActiveVC(mesh, 'COLOR')
+
+def objectMeshes(objects):
+    # The meshes of the mesh objects outside edit mode, a mesh shared by several objects only once
+    meshes = {}
+    for obj in objects:
+        if obj is not None and obj.type == 'MESH' and obj.mode != 'EDIT':
+            meshes.setdefault(meshcache.meshKey(obj.data), obj.data)
+    return list(meshes.values())
+
+def quickOptimizeMeshes(meshes, color, delete_old_vc=True):
+    # Every mesh is filled from slices of one tiled buffer
+    fill = np.tile(np.asarray(color, dtype=np.float32), (max([len(mesh.loops) for mesh in meshes] + [0]), 1))
+    for mesh in meshes:
+        quickOptimize(mesh, color, delete_old_vc, fill)
+
+def colorProblems(mesh, stats):
+    # Messages about what would break COLOR in game, stats: core.colorStats of COLOR or None without it
+    names = layerNames(mesh)
+    leftovers = [name for name in names if keyName in name]
+    others = [name for name in names if name != 'COLOR' and keyName not in name]
+    problems = []
+    if 'COLOR' not in names: problems.append("no COLOR layer")
+    if others: problems.append("%d other color layers: %s" % (len(others), ", ".join(others)))
+    if leftovers: problems.append("isolation layers left over: %s" % ", ".join(leftovers))
+    if stats is None: return problems
+    if layerDomain(getColorLayers(mesh)['COLOR']) == 'POINT': problems.append("COLOR is stored per vertex, exports take it per corner")
+    if stats['alpha_one']: problems.append("%.1f%% of COLOR has alpha 1, streaks of the Blender brush?" % (stats['alpha_one']*100))
+    if stats['off_grid']: problems.append("%d colors are between 8-bit steps" % stats['off_grid'])
+    if stats['out_of_range']: problems.append("%d colors are outside 0-1 or not a number" % stats['out_of_range'])
+    return problems
+
+def validateMeshes(meshes, workers=None):
+    # Checks the COLOR layer exports take on every mesh, returns a dict per mesh with its 'layers',
+    # 'corners', the core.colorStats of COLOR and the 'problems' found. Blender's arrays are read one
+    # mesh after the other, the checks run on a thread pool, NumPy releases the GIL while it counts
+    colors = [readColors(getColorLayers(mesh)['COLOR'], False) if 'COLOR' in layerNames(mesh) else None for mesh in meshes]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        stats = list(pool.map(lambda array: None if array is None else core.colorStats(array), colors))
+    results = []
+    for mesh, mesh_stats in zip(meshes, stats):
+        result = {'layers': list(layerNames(mesh)), 'corners': len(mesh.loops)}
+        result.update(mesh_stats or {})
+        result['problems'] = colorProblems(mesh, mesh_stats)
+        results.append(result)
+    return results
+
+def resetView(mesh):
+    color_data = getColorLayers(mesh)
+    color_layer_name = findActiveColorLayer(color_data, mesh).name
+
+    if keyName in color_layer_name:
+        removeColorLayer(mesh, color_layer_name)
+
+    updateMesh(mesh)
+    trySetActiveVC(mesh, color_layer_name.split(keyName)[0])
+
+def isolateChannel(mesh, ch, mono):
+    # Toggle channel ch (0-3) of the active layer's generated view layer, returns the new isolated channel string
+    channel = str(ch)
+    color_data = getColorLayers(mesh)
+    activename = findActiveColorLayer(color_data, mesh).name
+
+    if keyName in activename:
+        basename, isolated = activename.split(keyName)[:2]
+        viewname = activename
+    else:
+        basename = activename
+        viewname = next((x for x in layerNames(mesh) if basename+keyName in x), None)
+        isolated = viewname.split(keyName)[1] if viewname else ""
+    view_active = viewname == activename
+    former_ch = [int(x) for x in isolated if x]
+
+    view = readColors(color_data[viewname], False) if viewname else None
+    base_exists = basename in layerNames(mesh)
+    # View layers are stored in the base layer's domain
+    domain = layerDomain(color_data[basename] if base_exists else color_data[viewname])
+    base = readColors(color_data[basename]) if base_exists else view.copy()
+    base_changed = not base_exists
+    new_view = None
+
+    if ch in former_ch:
+        isolated = isolated.replace(channel, "")
+        isolated_channels = [int(x) for x in isolated]
+
+        if 3 in isolated_channels and ch != 3:
+            new_view = core.alphaView(core.colorValue(view))
+        elif ch == 3 and not isolated_channels:
+            if view_active:
+                base[:,3] = core.colorValue(view)
+                base_changed = True
+        elif ch == 3:
+            base[:,3] = core.colorValue(view if view_active else base)
+            base_changed = True
+            new_view = core.isolatedView(base, isolated_channels)
+        elif isolated_channels:
+            if view_active:
+                base[:,former_ch] = view[:,former_ch]
+                base_changed = True
+            new_view = core.isolatedView(base, isolated_channels)
+        elif view_active:
+            base[:,ch] = view[:,ch]
+            base_changed = True
+
+    else:
+        if mono: isolated = channel
+        old_channels = [int(x) for x in isolated if int(x) != ch]
+        if channel not in isolated: isolated += channel
+        isolated_channels = [int(x) for x in isolated]
+
+        if ch == 3:
+            new_view = core.alphaView(base[:,3])
+        elif 3 in isolated_channels:
+            new_view = core.alphaView(core.colorValue(view))
+        else:
+            if 3 in former_ch and view_active:
+                rgb_ch = [x for x in former_ch if x!=3]
+                base[:,rgb_ch] = view[:,rgb_ch]
+                base[:,3] = core.colorValue(view)
+                base_changed = True
+            new_view = core.isolatedView(view if viewname else base, old_channels)
+            new_view[:,ch] = base[:,ch]
+
+    # Layers are looked up by name again after every add/remove, older references may be invalid
+    if viewname: removeColorLayer(mesh, viewname)
+    if not base_exists: newColorLayer(mesh, basename, domain)
+    if base_changed: writeColors(getColorLayers(mesh)[basename], base)
+
+    if new_view is not None:
+        new_active_name = basename+keyName+isolated
+        writeColors(newColorLayer(mesh, new_active_name, domain), new_view)
+    else:
+        isolated = ""
+        new_active_name = basename
+
+    updateMesh(mesh)
+    trySetActiveVC(mesh, new_active_name)
+    return isolated
@@ -0,0 +1,116 @@
+# COLOR straight to and from 3DMigoto vertex buffers. A .fmt file describes the buffer: its stride
+# (bytes per vertex) and the elements in it, each at an AlignedByteOffset. COLOR is R8G8B8A8_UNORM,
+# four bytes per vertex, which are written into or read from their column of a memory mapped .buf
+# or dumped .vb, so the other elements of an existing buffer stay untouched.
+#
+#   stride: 20
+#   element[0]:
+#     SemanticName: COLOR
+#     SemanticIndex: 0
+#     Format: R8G8B8A8_UNORM
+#     InputSlot: 0
+#     AlignedByteOffset: 0
+
+import os
+
+import numpy as np
+
+from . import core, meshops
+
+COLOR_FORMATS = ('R8G8B8A8_UNORM',)
+
+def readFormat(path):
+    # {'strides': {slot: stride}, 'elements': [{'SemanticName': ..., ...}]}, "stride" is slot 0's and
+    # "vb1 stride" slot 1's in files of multi-buffer draws
+    strides = {}
+    elements = []
+    with open(path) as f:
+        for line in f:
+            key, _, value = line.strip().partition(':')
+            key, value = key.strip(), value.strip()
+            if key.startswith('element['):
+                elements.append({})
+            elif key.endswith('stride'):
+                slot = key.split()[0][2:] if key != 'stride' else '0'
+                strides[int(slot)] = int(value)
+            elif elements and value:
+                elements[-1][key] = value
+    return {'strides': strides, 'elements': elements}
+
+def colorLayout(fmt, semantic_index=0):
+    # (stride, offset) of the COLOR element semantic_index
+    for element in fmt['elements']:
+        if element.get('SemanticName', '').upper() != 'COLOR' or int(element.get('SemanticIndex', 0)) != semantic_index: continue
+        data_format = element.get('Format', '').replace('DXGI_FORMAT_', '')
+        if data_format not in COLOR_FORMATS:
+            raise ValueError("COLOR is stored as %s, only %s is supported" % (data_format, ", ".join(COLOR_FORMATS)))
+        slot = int(element.get('InputSlot', 0))
+        if slot not in fmt['strides']: raise ValueError("The format has no stride for buffer %d" % slot)
+        return fmt['strides'][slot], int(element.get('AlignedByteOffset', 0))
+    raise ValueError("The format has no COLOR%s element" % (semantic_index or ""))
+
+def writeFormat(path, stride=4, offset=0):
+    with open(path, 'w') as f:
+        f.write("stride: %d\ntopology: trianglelist\nelement[0]:\n  SemanticName: COLOR\n  SemanticIndex: 0\n"
+            "  Format: R8G8B8A8_UNORM\n  InputSlot: 0\n  AlignedByteOffset: %d\n  InputSlotClass: per-vertex\n"
+            "  InstanceDataStepRate: 0\n" % (stride, offset))
+
+def bufferColumns(path, stride, offset, rows=None):
+    # (N, 4) uint8 view of the COLOR bytes of a memory mapped buffer, writable when the buffer is
+    # expected to hold rows vertices
+    if rows is not None and not os.path.exists(path):
+        raise ValueError("%s doesn't exist, COLOR can only be written into a buffer with the other elements" % os.path.basename(path))
+    data = np.memmap(path, dtype=np.uint8, mode='r+' if rows is not None else 'r')
+    if rows is not None and len(data) != rows*stride:
+        raise ValueError("%s has %d bytes instead of %d for %d vertices of %d bytes" %
+            (os.path.basename(path), len(data), rows*stride, rows, stride))
+    if len(data) % stride:
+        raise ValueError("%s has %d bytes, no whole number of %d byte vertices" % (os.path.basename(path), len(data), stride))
+    return data.reshape(-1, stride)[:,offset:offset + 4]
+
+def exportColors(mesh, layer_name, buf_path, fmt_path=None, domain='POINT'):
+    # Writes layer layer_name into buf_path, one vertex per mesh vertex ('POINT', corners are averaged,
+    # the order of a mesh imported from the buffer) or per face corner ('CORNER'). With an existing
+    # fmt_path the colors go into its COLOR column of the buffer, without one a COLOR only buffer and
+    # its .fmt are written. An existing buffer of another size is never replaced without its .fmt,
+    # it may hold other elements. Returns the number of vertices written
+    layer = meshops.getColorLayers(mesh)[layer_name]
+    colors = core.toBytes(meshops.readColorsAs(mesh, layer, domain))
+    if fmt_path is not None and os.path.exists(fmt_path):
+        stride, offset = colorLayout(readFormat(fmt_path))
+    else:
+        if os.path.exists(buf_path) and os.path.getsize(buf_path) != colors.nbytes:
+            raise ValueError("%s has %d bytes, not the %d of a COLOR only buffer of %d vertices. Pick its .fmt to write COLOR into it" %
+                (os.path.basename(buf_path), os.path.getsize(buf_path), colors.nbytes, len(colors)))
+        stride, offset = 4, 0
+        if fmt_path is not None: writeFormat(fmt_path)
+    if stride == 4:
+        # Nothing but COLOR in the buffer, it is written as a whole
+        colors.tofile(buf_path)
+        return len(colors)
+    columns = bufferColumns(buf_path, stride, offset, len(colors))
+    columns[:] = colors
+    columns.base.flush()
+    return len(colors)
+
+def importColors(mesh, buf_path, fmt_path=None, layer_name='COLOR'):
+    # Reads the COLOR column of a buffer (a COLOR only one without fmt_path) into layer layer_name,
+    # which is created when missing. The buffer holds either one vertex per mesh vertex or per face
+    # corner. Returns the layer
+    stride, offset = colorLayout(readFormat(fmt_path)) if fmt_path is not None else (4, 0)
+    columns = bufferColumns(buf_path, stride, offset)
+    loop_vert = meshops.loopVertexIndex(mesh)
+    if len(columns) not in (len(mesh.vertices), len(loop_vert)):
+        raise ValueError("%s has %d vertices, the mesh has %d vertices and %d face corners" %
+            (os.path.basename(buf_path), len(columns), len(mesh.vertices), len(loop_vert)))
+    per_vertex = len(columns) == len(mesh.vertices)
+    colors = columns.astype(np.float32)/np.float32(255)
+
+    if layer_name not in meshops.layerNames(mesh): meshops.newColorLayer(mesh, layer_name)
+    layer = meshops.getColorLayers(mesh)[layer_name]
+    if meshops.layerDomain(layer) == 'POINT' and not per_vertex: colors = core.pointColors(colors, loop_vert, len(mesh.vertices))
+    elif meshops.layerDomain(layer) == 'CORNER' and per_vertex: colors = colors[loop_vert]
+    meshops.writeColors(layer, colors)
+    meshops.updateMesh(mesh)
+    meshops.trySetActiveVC(mesh, layer_name)
+    return layer
@@ -0,0 +1,1882 @@
+# Operators, settings and the panel of LEO Alpha Paint. The color logic itself lives in
+# meshops.py/core.py, the classes here only read settings from the context and call into it.
+
+import bpy
+from mathutils import Color, Vector
+import gpu
+from gpu_extras.batch import batch_for_shader
+from bpy.app.handlers import persistent
+import math
+import os
+import time
+
+from . import channelview, core, history, meshcache, meshops, migoto, profiling, snapshots
+from .core import blending_modes
+from .meshops import getColorLayers, findActiveColorLayer
+
+channel_list = ['R','G','B','A']
+
+def updateIsolateMode(self, context):
+    # Drop whatever the other mode was showing
+    obj = context.active_object
+    if obj is not None and obj.type == 'MESH':
+        meshops.resetView(obj.data)
+        channelview.hideChannels(context, obj)
+    self.isolated_Channel = ""
+
+def updateProfiling(self, context):
+    profiling.enabled = self.enable_profiling
+
+def updateByteMode(self, context):
+    meshops.byteMode = self.byte_mode
+
+def selectMargin(self, context):
+    # Error margin of the select operators, whole 1/255 steps in 8-bit mode
+    if context.scene.paint_alpha_settings.byte_mode: return core.byteMargin(self.tolerance_steps)
+    return self.error_margin
+
+def drawSelect(self, context):
+    layout = self.layout
+    if context.scene.paint_alpha_settings.byte_mode: layout.prop(self, "tolerance_steps")
+    else: layout.prop(self, "error_margin")
+    layout.prop(self, "restrict_loops")
+
+def historyLimit(context):
+    # None while Blender's undo is used, nothing is recorded then
+    settings = context.scene.paint_alpha_settings
+    if settings.color_undo != 'HISTORY': return None
+    return settings.history_limit*1024*1024
+
+def colorsChanged(context):
+    # Result of an operator that changed colors. Blender pushes an undo step, a copy of the whole
+    # mesh, only for operators that finish, with the color history they end as cancelled instead
+    if historyLimit(context) is not None: return {'CANCELLED'}
+    return {'FINISHED'}
+
+# Blender only keeps pointers into the lists enum callbacks return, the last ones are held here
+layer_items = {}
+
+def colorLayerItems(self, context):
+    obj = context.active_object
+    items = meshops.layerItems(obj.data) if obj is not None and obj.type == 'MESH' else []
+    layer_items['layers'] = items
+    return items
+
+def colorLayerItemsFactor(self, context):
+    obj = context.active_object
+    items = meshops.layerItems(obj.data, True) if obj is not None and obj.type == 'MESH' else [('NONE','None','')]
+    layer_items['factor'] = items
+    return items
+
+def sourceObjectLayerItems(self, context):
+    obj = context.scene.paint_alpha_settings.src_object
+    items = meshops.layerItems(obj.data) if obj is not None and obj.type == 'MESH' else []
+    layer_items['source_object'] = items
+    return items
+
+def isMeshObject(self, obj):
+    return obj.type == 'MESH'
+
+def snapshotItems(self, context):
+    obj = context.active_object
+    names = snapshots.names(obj.data) if obj is not None and obj.type == 'MESH' else []
+    items = [(name, name, "") for name in names] or [('NONE', 'None', '')]
+    layer_items['snapshots'] = items
+    return items
+
+class PaintAlphaPropertyGroup(bpy.types.PropertyGroup):
+
+    one_layer_isolate : bpy.props.BoolProperty(
+        name='Isolate one layer',
+        description='Only isolate one layer at a time. \nRight click to assign shortcut',
+        default=True
+    )
+
+    enable_transfer_tools : bpy.props.BoolProperty(
+        name="Enable Transfer Tools",
+        default=False,
+        description="Show/hide tools for transfering/blending data between vertex color layers/channels. \nRight click to assign shortcut"
+    )
+
+    enable_indiscriminate_fill : bpy.props.BoolProperty(
+        name="allow use ALL vertices",
+        description="WARNING: this will allow you to paint all verticies at the click of one button. \nRight click to assign shortcut. Can be undone with Control + Z",
+        default=True
+    ) 
+
+    isolated_Channel : bpy.props.StringProperty(
+        name="isolated_Channel",
+        default=""
+    )
+
+    isolate_mode : bpy.props.EnumProperty(
+        name='Isolate mode',
+        items=[
+            ('LAYER', 'Layer', 'Copy the isolated channels into a generated color layer that can be painted with any brush'),
+            ('VIEW', 'View', 'Only show the isolated channels through a viewport material, toggling is instant on any mesh size. '
+                'The add-on\'s fill tools write into the isolated channels of the base layer, Blender\'s brushes paint all of them')
+        ],
+        default='LAYER',
+        update=updateIsolateMode
+    )
+
+    blend_mode : bpy.props.EnumProperty(
+        name='Blend type',
+        items=blending_modes,
+        default="MIX",
+    )
+
+    src_vcol: bpy.props.EnumProperty(
+        name="Source",
+        items=colorLayerItems,
+        description="Source vertex color layer",
+    )
+
+    src_object: bpy.props.PointerProperty(
+        name="Object",
+        type=bpy.types.Object,
+        poll=isMeshObject,
+        description="Take the source layer from another object, every corner gets the color of the nearest corner of that object",
+    )
+
+    src_object_vcol: bpy.props.EnumProperty(
+        name="Source",
+        items=sourceObjectLayerItems,
+        description="Source vertex color layer of the source object",
+    )
+
+    factor_vcol: bpy.props.EnumProperty(
+        name="Factor",
+        description="Factor color channel. 0-1 RGBA channels corresponds to how much the blend mode will be applied",
+        items=colorLayerItemsFactor,
+    )
+
+    factor_slider : bpy.props.FloatProperty(
+        name="Mix",
+        description="Factor amount",
+        default=1,
+        max=1,
+        min=0,
+    )
+
+    src_ch: bpy.props.BoolVectorProperty(
+        name="Source Channel",
+        description="Source color channel. Click and drag to enable/disable multiple simultaneously",
+        size=4,
+        default=(False,False,False,False),
+    )
+
+    past_shading : bpy.props.StringProperty(default = 'UnInitialized')
+    past_shading_type : bpy.props.StringProperty(default = '')
+    space_shader_storage : bpy.props.StringProperty(default = 'VERTEX')
+
+    select_color_mode : bpy.props.EnumProperty(
+        name='Select mode',
+        items=[
+            ('BRUSH', 'Brush', 'Primary brush color'),
+            ('PALETTE', 'Palette', 'All colors in active palette'),
+            ('REGION', 'Region', 'Grow the vertex selection into connected vertices of a selected color')
+        ],
+        default='BRUSH'
+    )
+
+    color_undo : bpy.props.EnumProperty(
+        name='Color undo',
+        items=[
+            ('BLENDER', 'Blender Undo', 'Paint, gradient and blend push regular undo steps, each keeps a copy of the whole mesh'),
+            ('HISTORY', 'Color History', 'Paint, gradient and blend are only undone with Undo Color/Redo Color, which keep just the changed corners. '
+                'Blender\'s undo clears the color history')
+        ],
+        default='BLENDER',
+    )
+
+    history_limit : bpy.props.IntProperty(
+        name="History MB",
+        description="Memory the color history may use, the oldest steps are dropped first",
+        default=256,
+        min=1,
+    )
+
+    enable_profiling : bpy.props.BoolProperty(
+        name="Record timings",
+        description="Time every add-on operator, split into reading the mesh, computing, writing back and updating the mesh",
+        default=False,
+        update=updateProfiling
+    )
+
+    byte_mode : bpy.props.BoolProperty(
+        name="8-bit",
+        description="Work in 8-bit colors: layers the add-on creates or converts are stored as bytes, paint, blend and select use exact 1/255 steps. \nRight click to assign shortcut",
+        default=False,
+        update=updateByteMode
+    )
+
+    snapshot_name : bpy.props.StringProperty(
+        name="Snapshot",
+        description="Name of the next snapshot, an existing snapshot with this name is replaced",
+        default="A"
+    )
+
+    snapshot_a : bpy.props.EnumProperty(
+        name="A",
+        description="First snapshot of the A/B toggle",
+        items=snapshotItems,
+    )
+
+    snapshot_b : bpy.props.EnumProperty(
+        name="B",
+        description="Second snapshot of the A/B toggle",
+        items=snapshotItems,
+    )
+
+def baseView(settings):
+    # Keyword arguments of the meshops functions that work on the channels the VIEW isolate mode shows
+    return {'isolated': settings.isolated_Channel, 'base_view': settings.isolate_mode == 'VIEW'}
+
+def blendChannels(self, context, settings, mesh):
+    with history.step(self.bl_label, historyLimit(context)), profiling.measure(self.bl_label, mesh):
+        isolated = meshops.blendChannels(mesh, self.src_vcol, self.dst_vcol, self.blend_mode, self.src_ch,
+            self.factor_vcol, self.factor_slider, **baseView(settings))
+    if isolated is None:
+        self.report({'ERROR'},'Plugin does not support multi-to-multi-different-channel transfer')
+    elif settings.isolate_mode != 'VIEW':
+        settings.isolated_Channel = isolated
+
+class BlendChannels(bpy.types.Operator):
+    bl_idname = "paint.blendchannels"
+    bl_label = "Blend Transfer Channels"
+    bl_description = "Transfer vertex colors from another layer to the active isolated layer with specified blend mode. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    blend_mode : bpy.props.EnumProperty(
+        name='Blend type',
+        items=blending_modes,
+    )
+
+    src_vcol: bpy.props.EnumProperty(
+        name="Source",
+        items=colorLayerItems,
+        description="Source vertex color layer",
+    )
+
+    dst_vcol: bpy.props.EnumProperty(
+        name="Destination",
+        items=colorLayerItems,
+        description="Destination vertex color layer",
+    )
+
+    factor_vcol: bpy.props.EnumProperty(
+        name="Factor",
+        description="Factor color channel. 0-1 RGBA channels corresponds to how much the blend mode will be applied",
+        items=colorLayerItemsFactor,
+    )
+
+    factor_slider : bpy.props.FloatProperty(
+        name="Mix",
+        description="Factor amount",
+        max=1,
+        min=0,
+    )
+
+    src_ch: bpy.props.BoolVectorProperty(
+        name="Source Channel",
+        description="Source color channel. Click and drag to enable/disable multiple simultaneously",
+        size=4,
+        subtype='XYZ',
+    )
+
+    def invoke(self, context, event):
+        sett = context.scene.paint_alpha_settings
+        obj = context.active_object.data
+        self.blend_mode = sett.blend_mode
+        self.src_ch = sett.src_ch
+        self.src_vcol = sett.src_vcol
+        self.factor_slider = sett.factor_slider
+        self.factor_vcol = sett.factor_vcol
+        self.dst_vcol = findActiveColorLayer(getColorLayers(obj), obj).name
+
+        blendChannels(self, context, sett, obj)
+        return colorsChanged(context)
+    
+    def execute(self,context):
+        sett = context.scene.paint_alpha_settings
+        obj = context.active_object.data
+
+        blendChannels(self, context, sett, obj)
+        return colorsChanged(context)
+
+class TransferChannels(bpy.types.Operator):
+    bl_idname = "paint.transfer_channels"
+    bl_label = "Transfer From Object"
+    bl_description = "Transfer vertex colors from a layer of the source object to the active isolated layer with specified blend mode, "\
+        "matching every corner to the nearest corner of the source object. Repeated transfers between the same objects reuse the matching. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    blend_mode : bpy.props.EnumProperty(
+        name='Blend type',
+        items=blending_modes,
+    )
+
+    src_vcol: bpy.props.EnumProperty(
+        name="Source",
+        items=sourceObjectLayerItems,
+        description="Source vertex color layer of the source object",
+    )
+
+    dst_vcol: bpy.props.EnumProperty(
+        name="Destination",
+        items=colorLayerItems,
+        description="Destination vertex color layer",
+    )
+
+    factor_vcol: bpy.props.EnumProperty(
+        name="Factor",
+        description="Factor color channel. 0-1 RGBA channels corresponds to how much the blend mode will be applied",
+        items=colorLayerItemsFactor,
+    )
+
+    factor_slider : bpy.props.FloatProperty(
+        name="Mix",
+        description="Factor amount",
+        max=1,
+        min=0,
+    )
+
+    src_ch: bpy.props.BoolVectorProperty(
+        name="Source Channel",
+        description="Source color channel. Click and drag to enable/disable multiple simultaneously",
+        size=4,
+        subtype='XYZ',
+    )
+
+    def invoke(self, context, event):
+        sett = context.scene.paint_alpha_settings
+        obj = context.active_object.data
+        self.blend_mode = sett.blend_mode
+        self.src_ch = sett.src_ch
+        self.src_vcol = sett.src_object_vcol
+        self.factor_slider = sett.factor_slider
+        self.factor_vcol = sett.factor_vcol
+        self.dst_vcol = findActiveColorLayer(getColorLayers(obj), obj).name
+        return self.execute(context)
+
+    def execute(self, context):
+        sett = context.scene.paint_alpha_settings
+        obj = context.active_object
+        source = sett.src_object
+        if source is None or source.type != 'MESH' or not self.src_vcol:
+            self.report({'ERROR'}, "Pick a source object with a color layer first")
+            return {'CANCELLED'}
+        matrix = source.matrix_world.inverted() @ obj.matrix_world
+
+        with history.step(self.bl_label, historyLimit(context)), profiling.measure(self.bl_label, [obj.data, source.data]):
+            isolated = meshops.transferChannels(obj.data, source.data, matrix, self.src_vcol, self.dst_vcol, self.blend_mode,
+                self.src_ch, self.factor_vcol, self.factor_slider, **baseView(sett))
+        if isolated is None:
+            self.report({'ERROR'},'Plugin does not support multi-to-multi-different-channel transfer')
+        elif sett.isolate_mode != 'VIEW':
+            sett.isolated_Channel = isolated
+        return colorsChanged(context)
+
+class SampleAverageVertex(bpy.types.Operator):
+    bl_idname = "paint.sample_vertex"
+    bl_label = "Sample average vertex"
+    bl_description = "Sample a selected vertex or group of vertices for their average color. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'UNDO'}
+
+    def execute(self, context):
+        settings = context.scene.paint_alpha_settings
+        obj = context.active_object.data
+
+        with profiling.measure(self.bl_label, obj):
+            average = meshops.sampleAverage(obj, settings.enable_indiscriminate_fill, **baseView(settings))
+        if average is None:
+            self.report({'ERROR'}, "No vertices to sample.")
+            return {'CANCELLED'}
+        flg = tuple(average.tolist())
+
+        flgc = Color(flg)
+        context.tool_settings.vertex_paint.brush.color = flgc
+
+        srgb502 = 128/255
+        srgb251 = 64/255
+
+        pal = bpy.data.palettes.get("LEO_Alpha_Palette")
+        if not pal:
+            pal = bpy.data.palettes.new("LEO_Alpha_Palette")
+            # add a color to that palette
+            default = pal.colors.new()
+            default.color = (1, srgb502, srgb502)
+            pal.colors.new().color = (0, srgb502, srgb502)
+            pal.colors.new().color = (1, srgb251, srgb502)
+            pal.colors.new().color = (srgb502, srgb502, srgb502)
+            # make default active
+            pal.colors.active = default
+            bpy.context.tool_settings.vertex_paint.palette = pal
+        
+        setColors = set()
+        for col in pal.colors:
+            setColors.add(tuple(col.color))
+        if flg not in setColors:
+            flc = pal.colors.new()
+            flc.color = flgc
+            pal.colors.active = flc
+
+        return {'FINISHED'}
+
+class FlatShading(bpy.types.Operator):
+    bl_idname = "paint.flat_shading"
+    bl_label = "ToggleVertexShading"
+    bl_description = "Set 3d view to flat shading to accurately view vertex colors. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER','UNDO'}
+
+    def execute(self, context):
+        settings = context.scene.paint_alpha_settings
+        current_shading = context.space_data.shading.light
+        space_shader_current = context.space_data.shading.color_type
+        
+        if current_shading != 'FLAT' or space_shader_current != 'VERTEX':   
+            settings.past_shading = context.space_data.shading.light
+            context.space_data.shading.light = 'FLAT'
+            settings.space_shader_storage = context.space_data.shading.color_type
+            context.space_data.shading.color_type = 'VERTEX'     
+        elif settings.past_shading != 'UnInitialized':
+            context.space_data.shading.light = settings.past_shading
+            context.space_data.shading.color_type = settings.space_shader_storage
+            settings.past_shading = 'FLAT'
+        return {'FINISHED'}
+
+def paintChannel(self, context):
+    settings = context.scene.paint_alpha_settings
+    brushcolor1 = context.tool_settings.vertex_paint.brush.color
+    obj = context.active_object.data
+
+    with history.step(self.bl_label, historyLimit(context)), profiling.measure(self.bl_label, obj):
+        painted = meshops.paintChannel(obj, brushcolor1, settings.isolated_Channel, settings.enable_indiscriminate_fill,
+            base_view=settings.isolate_mode == 'VIEW')
+    if not painted:
+        self.report({'ERROR'}, "Cannot paint when no vertices are selected and ALL option is off.")
+
+    return {'FINISHED'}
+
+class PaintAlphaOperator(bpy.types.Operator):
+    bl_idname = "paint.paint_alpha_operator"
+    bl_label = "Paint Color"
+    bl_description = "Paint color for the selected vertices in vertex paint mode. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER','UNDO'}
+
+    def execute(self, context):
+        
+        paintChannel(self, context)
+
+        return colorsChanged(context)
+
+class SmoothChannels(bpy.types.Operator):
+    bl_idname = "paint.smooth_channels"
+    bl_label = "Smooth Channels"
+    bl_description = "Blur the isolated channels of the selected vertices by averaging them with their neighbors, "\
+        "e.g. to soften G shadow smoothing or A outline transitions. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER','UNDO'}
+
+    iterations : bpy.props.IntProperty(
+        name="Iterations",
+        description="Smoothing steps, more spread the colors further",
+        default=10,
+        min=1,
+        soft_max=200,
+    )
+
+    factor : bpy.props.FloatProperty(
+        name="Factor",
+        description="How far every step moves a vertex towards the average of its neighbors",
+        default=0.5,
+        min=0,
+        max=1,
+    )
+
+    seams : bpy.props.EnumProperty(
+        name='Seams',
+        items=[
+            ('NONE', 'Smooth Seams', 'Smooth across every edge, the corners of a vertex end up with one color'),
+            ('COLOR', 'Keep Color Seams', 'Corners of a vertex with different colors are smoothed separately, hard color edges between faces stay'),
+            ('UV', 'Keep UV Seams', 'Every UV island of the active UV map is smoothed on its own'),
+        ],
+        default='NONE'
+    )
+
+    def execute(self, context):
+        settings = context.scene.paint_alpha_settings
+        obj = context.active_object.data
+
+        with history.step(self.bl_label, historyLimit(context)), profiling.measure(self.bl_label, obj):
+            painted = meshops.smoothChannels(obj, settings.isolated_Channel, self.iterations, self.factor, self.seams,
+                settings.enable_indiscriminate_fill, base_view=settings.isolate_mode == 'VIEW')
+        if not painted:
+            self.report({'ERROR'}, "Cannot paint when no vertices are selected and ALL option is off.")
+            return {'CANCELLED'}
+        return colorsChanged(context)
+
+def isolateChannel(self, context, ch):
+    settings = context.scene.paint_alpha_settings
+    obj = context.active_object
+    if settings.isolate_mode == 'VIEW':
+        with profiling.measure(self.bl_label, obj.data):
+            settings.isolated_Channel = meshops.toggleIsolated(settings.isolated_Channel, ch, settings.one_layer_isolate)
+            channelview.showChannels(context, obj, settings.isolated_Channel)
+    else:
+        # Not a color history step, the view layers it adds and removes are left to Blender's undo
+        with profiling.measure(self.bl_label, obj.data):
+            settings.isolated_Channel = meshops.isolateChannel(obj.data, ch, settings.one_layer_isolate)
+
+class IsolateVertexAlpha(bpy.types.Operator):
+    bl_idname = "paint.isolate_vertex_alpha"
+    bl_label = "A"
+    bl_description = "Isolate the vertex color alpha channel. \nOutline thickness (Higher = thicker, Lower = less width). \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'UNDO'}
+    def execute(self, context):
+        isolateChannel(self, context, 3)
+        return {'FINISHED'}
+
+class IsolateVertexRed(bpy.types.Operator):
+    bl_idname = "paint.isolate_vertex_red"
+    bl_label = "R"
+    bl_description = "Isolate the vertex color red channel. \nAmbient Occlusion (Higher = no occlude, Lower = Ambient Occlusion). \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'UNDO'}
+    def execute(self, context):
+        isolateChannel(self, context, 0)
+        return {'FINISHED'}
+
+class IsolateVertexGreen(bpy.types.Operator):
+    bl_idname = "paint.isolate_vertex_green"
+    bl_label = "G"
+    bl_description = "Isolate the vertex color green channel. \nShadow Smoothing (Higher = Sharper, Lower = Smoother). \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'UNDO'}
+    def execute(self, context):
+        isolateChannel(self, context, 1)
+        return {'FINISHED'}
+
+class IsolateVertexBlue(bpy.types.Operator):
+    bl_idname = "paint.isolate_vertex_blue"
+    bl_label = "B"
+    bl_description = "Isolate the vertex color blue channel. \nOutline z/depth-index (Higher = behind, Lower = in front). \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'UNDO'}
+    def execute(self, context):
+        isolateChannel(self, context, 2)
+        return {'FINISHED'}
+
+# Gradient tool by andyp123 adapted for leo alpha paint; github at: https://github.com/andyp123/blender_vertex_color_master
+gradient_shaders = {}
+
+def gradientShader(name):
+    # Built on first use, background Blender (blender -b) has no GPU context to build them at import
+    if name not in gradient_shaders:
+        gradient_shaders[name] = gpu.shader.from_builtin(name)
+    return gradient_shaders[name]
+
+def draw_gradient_callback(self, context, line_params, line_shader, circle_shader):
+    # Batches are only rebuilt when the line moved, the circle is one cached unit circle moved and scaled in place
+    coords = tuple(tuple(point) for point in line_params["coords"])
+    if line_params.get("batch_coords") != coords:
+        line_params["line_batch"] = batch_for_shader(line_shader, 'LINES', {
+            "pos": line_params["coords"],
+            "color": line_params["colors"]})
+        line_params["batch_coords"] = coords
+    line_shader.bind()
+    line_params["line_batch"].draw(line_shader)
+
+    if circle_shader is not None:
+        if "circle_batch" not in line_params:
+            steps = 50
+            circle_points = [(math.cos(2.0 * math.pi * i / steps), math.sin(2.0 * math.pi * i / steps)) for i in range(steps)]
+            line_params["circle_batch"] = batch_for_shader(circle_shader, 'LINE_LOOP', {"pos": circle_points})
+        a = line_params["coords"][0]
+        b = line_params["coords"][1]
+        gpu.matrix.push()
+        gpu.matrix.translate(a[:2])
+        gpu.matrix.scale_uniform((b - a).length)
+        circle_shader.bind()
+        circle_shader.uniform_float("color", line_params["colors"][1])
+        line_params["circle_batch"].draw(circle_shader)
+        gpu.matrix.pop()
+
+class SelectByIsolatedVertexColor(bpy.types.Operator):
+    bl_idname = "paint.selectbyisolatedvertexcolor"
+    bl_label = "Select Color"
+    bl_description = "Select by isolated vertex color. \nRight click to assign shortcut"
+    bl_options = {'REGISTER','UNDO'}
+
+    error_margin : bpy.props.FloatProperty(
+        name="Error margin",
+        description="precision of color select value",
+        default=0.001,
+        min=0
+    )
+
+    tolerance_steps : bpy.props.IntProperty(
+        name="Tolerance",
+        description="Select colors at most this many 1/255 steps away from the color in every channel (8-bit mode)",
+        default=0,
+        min=0,
+        max=255
+    )
+
+    restrict_loops : bpy.props.BoolProperty(
+        name="Exclude Loops",
+        description="Exclude vertices that have a loop which does not match the primary color",
+        default=False
+    )
+
+    draw = drawSelect
+
+    def execute(self, context):
+        obj = context.active_object.data
+        brush = bpy.context.tool_settings.vertex_paint.brush
+
+        with profiling.measure(self.bl_label, obj):
+            meshops.selectByColors(obj, [brush.color[:3]], selectMargin(self, context), self.restrict_loops,
+                **baseView(context.scene.paint_alpha_settings))
+
+        return {'FINISHED'}
+
+class SelectByPaletteColor(bpy.types.Operator):
+    bl_idname = "paint.selectbypalettecolor"
+    bl_label = "Select Palette"
+    bl_description = "Select by colors in the active palette. Large palettes are fine, each vertex color is only compared with the palette colors close to it \nRight click to assign shortcut"
+    bl_options = {'REGISTER','UNDO'}
+
+    error_margin : bpy.props.FloatProperty(
+        name="Error margin",
+        description="precision of color select value",
+        default=0.001,
+        min=0
+    )
+
+    tolerance_steps : bpy.props.IntProperty(
+        name="Tolerance",
+        description="Select colors at most this many 1/255 steps away from the color in every channel (8-bit mode)",
+        default=0,
+        min=0,
+        max=255
+    )
+
+    restrict_loops : bpy.props.BoolProperty(
+        name="Exclude Loops",
+        description="Exclude vertices that have a loop which does not match the primary color",
+        default=False
+    )
+
+    draw = drawSelect
+
+    def execute(self, context):
+        obj = context.active_object.data
+        palette = context.tool_settings.vertex_paint.palette.colors
+
+        with profiling.measure(self.bl_label, obj):
+            meshops.selectByColors(obj, [x.color[:3] for x in palette], selectMargin(self, context), self.restrict_loops,
+                **baseView(context.scene.paint_alpha_settings))
+
+        return {'FINISHED'}
+
+class SelectColorRegion(bpy.types.Operator):
+    bl_idname = "paint.select_color_region"
+    bl_label = "Select Region"
+    bl_description = "Grow the vertex selection through connected vertices with the colors of the selected vertices, like a flood fill. \nRight click to assign shortcut"
+    bl_options = {'REGISTER','UNDO'}
+
+    error_margin : bpy.props.FloatProperty(
+        name="Error margin",
+        description="precision of color select value",
+        default=0.001,
+        min=0
+    )
+
+    tolerance_steps : bpy.props.IntProperty(
+        name="Tolerance",
+        description="Select colors at most this many 1/255 steps away from the color in every channel (8-bit mode)",
+        default=0,
+        min=0,
+        max=255
+    )
+
+    restrict_loops : bpy.props.BoolProperty(
+        name="Exclude Loops",
+        description="Only grow into vertices whose loops all match a selected color",
+        default=False
+    )
+
+    draw = drawSelect
+
+    def execute(self, context):
+        obj = context.active_object.data
+
+        with profiling.measure(self.bl_label, obj):
+            select = meshops.selectRegion(obj, selectMargin(self, context), self.restrict_loops,
+                **baseView(context.scene.paint_alpha_settings))
+        if select is None:
+            self.report({'WARNING'}, "Select the vertices to grow from first")
+            return {'CANCELLED'}
+
+        return {'FINISHED'}
+
+class PaintGradient(bpy.types.Operator):
+    """Draw a line with the mouse to paint a vertex color gradient"""
+    bl_idname = "paint.gradienttool"
+    bl_label = "Gradient Tool"
+    bl_description = "Paint vertex color gradient. \nRight click to assign shortcut"
+    bl_options = {"REGISTER", "UNDO"}
+
+    _handle = None
+
+    start_color: bpy.props.FloatVectorProperty(
+        name="Start Color",
+        subtype='COLOR_GAMMA',
+        default=[1.0,0.0,0.0],
+        description="Start color of the gradient",
+        min=0.0,
+        max=1.0,
+    )
+
+    end_color: bpy.props.FloatVectorProperty(
+        name="End Color",
+        subtype='COLOR_GAMMA',
+        default=[0.0,1.0,0.0],
+        description="End color of the gradient",
+        min=0.0,
+        max=1.0,
+    )
+
+    circular_gradient: bpy.props.BoolProperty(
+        name="Circular Gradient",
+        description="Paint a circular gradient",
+        default=False
+    )
+
+    use_hue_blend: bpy.props.BoolProperty(
+        name="Use Hue Blend",
+        description="Gradually blend start and end colors using full hue range instead of simple blend",
+        default=False
+    )
+
+    # The view the gradient was drawn in, so redo from the panel doesn't depend on the region under the mouse
+    start_point: bpy.props.FloatVectorProperty(size=2, options={'HIDDEN'})
+    end_point: bpy.props.FloatVectorProperty(size=2, options={'HIDDEN'})
+    view_matrix: bpy.props.FloatVectorProperty(size=16, options={'HIDDEN'})
+    region_size: bpy.props.IntVectorProperty(size=2, options={'HIDDEN'})
+
+    # Seconds between preview updates at most, slower updates on big meshes space themselves out further
+    preview_interval = 1/60
+
+    @classmethod
+    def poll(cls, context):
+        obj = context.active_object
+        return bpy.context.object.mode == 'VERTEX_PAINT' and obj is not None and obj.type == 'MESH'
+
+    def storedViewMatrix(self):
+        return [self.view_matrix[i:i+4] for i in range(0, 16, 4)]
+
+    def updatePreview(self, context):
+        start = time.perf_counter()
+        matrix = context.region_data.perspective_matrix @ context.active_object.matrix_world
+        self.view_matrix = [x for row in matrix for x in row]
+        self.region_size = (context.region.width, context.region.height)
+        meshops.projectPreview(context.active_object.data, self._preview, self.storedViewMatrix(), self.region_size[:])
+        line_params = self.line_params
+        meshops.applyGradient(context.active_object.data, self._preview, line_params["coords"][0][:2], line_params["coords"][1][:2],
+            self.start_color, self.end_color, self.circular_gradient, self.use_hue_blend)
+        self._preview_time = time.perf_counter()
+        self._preview_cost = self._preview_time - start
+        self._preview_dirty = False
+
+    def endDrag(self, context):
+        bpy.types.SpaceView3D.draw_handler_remove(self._handle, 'WINDOW')
+        self._handle = None
+        context.window_manager.event_timer_remove(self._timer)
+        self._timer = None
+
+    def axis_snap(self, start, end, delta):
+        if start.x - delta < end.x < start.x + delta:
+            return Vector((start.x, end.y))
+        if start.y - delta < end.y < start.y + delta:
+            return Vector((end.x, start.y))
+        return end
+
+    def modal(self, context, event):
+        context.area.tag_redraw()
+
+        # Begin gradient line, draw handler and preview
+        if self._handle is None:
+            if event.type == 'LEFTMOUSE':
+                # Store the foreground and background color for redo
+                brush = context.tool_settings.vertex_paint.brush
+                self.start_color = brush.color
+                self.end_color = brush.secondary_color
+
+                # Create arguments to pass to the draw handler callback
+                mouse_position = Vector((event.mouse_region_x, event.mouse_region_y))
+                self.line_params = {
+                    "coords": [mouse_position, mouse_position],
+                    "colors": [brush.color[:] + (1.0,),
+                               brush.secondary_color[:] + (1.0,)],
+                    "width": 1, # currently does nothing
+                }
+                args = (self, context, self.line_params, gradientShader('2D_SMOOTH_COLOR'),
+                    (gradientShader('2D_UNIFORM_COLOR') if self.circular_gradient else None))
+                self._handle = bpy.types.SpaceView3D.draw_handler_add(draw_gradient_callback, args, 'WINDOW', 'POST_PIXEL')
+
+                self._preview = meshops.gradientPreview(context.active_object.data)
+                # The previews and the final colors are one history step, from the colors before the drag
+                if historyLimit(context) is not None: history.begin(self.bl_label)
+                self._preview_time = self._preview_cost = 0
+                self._preview_dirty = False
+                self._timer = context.window_manager.event_timer_add(self.preview_interval, window=context.window)
+        else:
+            # Update or confirm gradient end point
+            if event.type in {'MOUSEMOVE', 'LEFTMOUSE'}:
+                line_params = self.line_params
+                delta = 20
+
+                # Update and constrain end point
+                start_point = line_params["coords"][0]
+                end_point = Vector((event.mouse_region_x, event.mouse_region_y))
+                if event.shift:
+                    end_point = self.axis_snap(start_point, end_point, delta)
+                line_params["coords"] = [start_point, end_point]
+                self._preview_dirty = end_point != start_point
+
+                if event.type == 'LEFTMOUSE' and end_point != start_point: # Finish the line and paint the final gradient
+                    self.endDrag(context)
+                    self.start_point = start_point[:2]
+                    self.end_point = end_point[:2]
+                    # Only the final colors are timed, the previews before them would flood the records
+                    with profiling.measure(self.bl_label, context.active_object.data):
+                        self.updatePreview(context)
+                    if history.recording(): history.end(historyLimit(context))
+                    self._preview = None
+                    return colorsChanged(context)
+
+            # Recolor the mesh for the latest end point, at most once per preview_interval and never
+            # more often than the last update took
+            elif event.type == 'TIMER' and self._preview_dirty:
+                if time.perf_counter() - self._preview_time >= max(self.preview_interval, self._preview_cost):
+                    self.updatePreview(context)
+
+        # Allow camera navigation
+        if event.type in {'MIDDLEMOUSE', 'WHEELUPMOUSE', 'WHEELDOWNMOUSE'}:
+            return {'PASS_THROUGH'}
+
+        if event.type in {'RIGHTMOUSE', 'ESC'}:
+            if self._handle is not None:
+                self.endDrag(context)
+                meshops.restoreGradient(context.active_object.data, self._preview)
+                if history.recording(): history.end(historyLimit(context))
+                self._preview = None
+            return {'CANCELLED'}
+
+        # Keep running until completed or cancelled
+        return {'RUNNING_MODAL'}
+
+    def execute(self, context):
+        # Redo from the panel, in the view the gradient was drawn in
+        with history.step(self.bl_label, historyLimit(context)), profiling.measure(self.bl_label, context.active_object.data):
+            meshops.paintGradient(context.active_object.data, self.storedViewMatrix(), self.region_size[:],
+                self.start_point[:], self.end_point[:], self.start_color, self.end_color, self.circular_gradient, self.use_hue_blend)
+        return colorsChanged(context)
+
+    def invoke(self, context, event):
+        if context.area.type == 'VIEW_3D':
+            self._handle = None
+            context.window_manager.modal_handler_add(self)
+            return {'RUNNING_MODAL'}
+        else:
+            self.report({'WARNING'}, "View3D not found, cannot run operator")
+            return {'CANCELLED'}
+
+class CustomNewColorPalette(bpy.types.Operator):
+    bl_idname = "paint.custom_new_color_palette"
+    bl_label = "New palette"
+    bl_description = "Add new color palette. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER','UNDO'}
+
+    def execute(self, context):
+        newpal = bpy.data.palettes.new(context.active_object.name)
+        context.tool_settings.vertex_paint.palette = newpal
+
+        return {'FINISHED'}
+
+def findPaletteIndex(palettes, searchname):
+    for i, x in enumerate(palettes):
+            if x.name == searchname:
+                return i
+
+class CustomRemoveColorPalette(bpy.types.Operator):
+    bl_idname = "paint.custom_remove_color_palette"
+    bl_label = "Delete palette"
+    bl_description = "Delete the active color palette. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER','UNDO'}
+
+    def execute(self, context):
+        active = context.tool_settings.vertex_paint.palette
+        index = findPaletteIndex(bpy.data.palettes, active.name)
+        bpy.data.palettes.remove(context.tool_settings.vertex_paint.palette)
+        try: context.tool_settings.vertex_paint.palette = bpy.data.palettes[index-1]
+        except: pass
+
+        return {'FINISHED'}
+
+class PaletteVertexColors(bpy.types.Operator):
+    bl_idname = "paint.palettevertexcolors"
+    bl_label = "Palette vertex colors"
+    bl_description = "Create a color palette from the active/selected vertex colors. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER','UNDO'}
+
+    reduce_mode : bpy.props.EnumProperty(
+        name="Reduce",
+        description="Merge similar colors when there are more than Max Colors, the palette is then ordered by how many corners use each color",
+        items=[
+            ('NONE', 'None', 'Add every color'),
+            ('MEDIAN_CUT', 'Median Cut', 'Repeatedly split the color range in half by usage'),
+            ('KMEANS', 'K-Means', 'Median cut refined by k-means, slower but closer to the mesh colors'),
+        ],
+        default='NONE'
+    )
+
+    max_colors : bpy.props.IntProperty(
+        name="Max Colors",
+        description="Number of palette colors when reducing",
+        default=32,
+        min=1,
+        soft_max=256
+    )
+
+    def execute(self, context):
+        obj = context.active_object.data
+        color_layer = findActiveColorLayer(getColorLayers(obj), obj)
+
+        with profiling.measure(self.bl_label, obj):
+            if self.reduce_mode == 'NONE':
+                colors, counts = meshops.paletteColors(obj)
+            else:
+                colors, counts = meshops.paletteColors(obj, self.max_colors, self.reduce_mode)
+
+        pal = bpy.data.palettes.new(color_layer.name)
+        context.tool_settings.vertex_paint.palette = pal
+
+        for loopcolor in colors.tolist():
+            pal.colors.new().color = loopcolor
+
+        if self.reduce_mode == 'NONE':
+            bpy.ops.palette.sort()
+            if len(colors) > 1000:
+                self.report({'WARNING'}, "%d colors, use Reduce for a smaller palette" % len(colors))
+        return {'FINISHED'}
+
+class QuickExportVertexColors(bpy.types.Operator):
+    bl_idname="paint.quickexportvertexcolors"
+    bl_label = "Quick Optimize COLOR"
+    bl_description = "Quickly prepare optimal vertex colors for export. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER','UNDO'}
+
+    default_4COLOR : bpy.props.FloatVectorProperty(
+        name='COLOR',
+        subtype='COLOR_GAMMA',
+        size=4,
+        default=[1.0,0.502,0.502,0.502],
+        description="RGBA color of vertex colors. Default value is optimal",
+        min=0.0,
+        max=1.0,
+    )
+
+    delete_old_vc : bpy.props.BoolProperty(
+        name="Delete old COLOR",
+        description="Delete other vertex color layers",
+        default=True,
+    )
+
+    target : bpy.props.EnumProperty(
+        name="Objects",
+        items=[
+            ('ACTIVE', 'Active', 'Only the active object'),
+            ('SELECTED', 'Selected', 'All selected mesh objects'),
+            ('COLLECTION', 'Collection', 'All mesh objects in the active collection and its children'),
+        ],
+        default='ACTIVE',
+    )
+
+    def execute(self, context):
+        if self.target == 'SELECTED':
+            objects = context.selected_objects
+        elif self.target == 'COLLECTION':
+            objects = context.collection.all_objects
+        else:
+            objects = [context.active_object]
+
+        # Objects sharing a mesh only need it optimized once
+        meshes = meshops.objectMeshes(objects)
+        if not meshes:
+            self.report({'ERROR'}, "No mesh objects to optimize.")
+            return {'CANCELLED'}
+
+        start = time.perf_counter()
+        with profiling.measure(self.bl_label, meshes):
+            meshops.quickOptimizeMeshes(meshes, self.default_4COLOR, self.delete_old_vc)
+
+        if self.target != 'ACTIVE':
+            self.report({'INFO'}, "Optimized COLOR of %d meshes, %d corners, in %.3fs" %
+                (len(meshes), sum(len(mesh.loops) for mesh in meshes), time.perf_counter() - start))
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        return context.window_manager.invoke_props_dialog(self, width=300)
+
+def bufferFormatPath(buf_path, fmt_path):
+    # The chosen .fmt, or the one named like the buffer
+    if fmt_path: return bpy.path.abspath(fmt_path)
+    return os.path.splitext(buf_path)[0] + ".fmt"
+
+class ExportColorBuffer(bpy.types.Operator):
+    bl_idname = "paint.export_color_buffer"
+    bl_label = "Export COLOR Buffer"
+    bl_description = "Write COLOR (or the active layer) into a 3DMigoto vertex buffer as R8G8B8A8_UNORM. "\
+        "With the buffer's .fmt next to it only its COLOR bytes are replaced, otherwise a COLOR only buffer and .fmt are written. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+
+    filepath : bpy.props.StringProperty(subtype='FILE_PATH')
+    filter_glob : bpy.props.StringProperty(default="*.buf;*.vb", options={'HIDDEN'})
+
+    fmt_path : bpy.props.StringProperty(
+        name="Format",
+        description="The buffer's .fmt file, empty uses the .fmt with the buffer's name",
+        subtype='FILE_PATH',
+    )
+
+    domain : bpy.props.EnumProperty(
+        name="Vertices",
+        items=[
+            ('POINT', 'Per Vertex', 'One buffer vertex per mesh vertex, in the order of a mesh imported from the buffer'),
+            ('CORNER', 'Per Corner', 'One buffer vertex per face corner'),
+        ],
+        default='POINT'
+    )
+
+    def execute(self, context):
+        mesh = context.active_object.data
+        layer_name = 'COLOR' if 'COLOR' in meshops.layerNames(mesh) else findActiveColorLayer(getColorLayers(mesh), mesh).name
+        path = bpy.path.abspath(self.filepath)
+        try:
+            with profiling.measure(self.bl_label, mesh):
+                count = migoto.exportColors(mesh, layer_name, path, bufferFormatPath(path, self.fmt_path), self.domain)
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        self.report({'INFO'}, "Wrote %s of %d vertices to %s" % (layer_name, count, path))
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if not self.filepath: self.filepath = bpy.path.clean_name(context.active_object.name) + ".buf"
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+class ImportColorBuffer(bpy.types.Operator):
+    bl_idname = "paint.import_color_buffer"
+    bl_label = "Import COLOR Buffer"
+    bl_description = "Read the COLOR of a 3DMigoto vertex buffer (.buf or dumped .vb) into a color layer. "\
+        "The buffer needs one vertex per mesh vertex or face corner. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    filepath : bpy.props.StringProperty(subtype='FILE_PATH')
+    filter_glob : bpy.props.StringProperty(default="*.buf;*.vb", options={'HIDDEN'})
+
+    fmt_path : bpy.props.StringProperty(
+        name="Format",
+        description="The buffer's .fmt file, empty uses the .fmt with the buffer's name or reads a COLOR only buffer without one",
+        subtype='FILE_PATH',
+    )
+
+    layer_name : bpy.props.StringProperty(
+        name="Layer",
+        description="Color layer to read into, created when missing",
+        default="COLOR",
+    )
+
+    def execute(self, context):
+        mesh = context.active_object.data
+        path = bpy.path.abspath(self.filepath)
+        fmt_path = bufferFormatPath(path, self.fmt_path)
+        try:
+            with history.step(self.bl_label, historyLimit(context)), profiling.measure(self.bl_label, mesh):
+                migoto.importColors(mesh, path, fmt_path if os.path.exists(fmt_path) else None, self.layer_name)
+        except (OSError, ValueError) as e:
+            self.report({'ERROR'}, str(e))
+            return {'CANCELLED'}
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+# (object name, problems) of the last scene validation, listed in the Validate panel
+validation_results = []
+
+class ValidateColors(bpy.types.Operator):
+    bl_idname = "paint.validate_colors"
+    bl_label = "Validate Scene COLOR"
+    bl_description = "Check the COLOR layer of every mesh in the scene before exporting: other and leftover isolation layers, alpha 1 streaks, colors between 8-bit steps or outside 0-1. \nRight click to assign shortcut"
+    bl_options = {'REGISTER'}
+
+    def execute(self, context):
+        objects = [obj for obj in context.scene.objects if obj.type == 'MESH']
+        meshes = {}
+        for obj in objects:
+            meshes.setdefault(obj.data.as_pointer(), obj.data)
+        if not meshes:
+            self.report({'ERROR'}, "No mesh objects to validate.")
+            return {'CANCELLED'}
+
+        with profiling.measure(self.bl_label, list(meshes.values())):
+            results = dict(zip(meshes, meshops.validateMeshes(list(meshes.values()))))
+
+        validation_results[:] = [(obj.name, results[obj.data.as_pointer()]['problems']) for obj in objects
+            if results[obj.data.as_pointer()]['problems']]
+        for name, problems in validation_results:
+            for problem in problems:
+                self.report({'WARNING'}, "%s: %s" % (name, problem))
+        if validation_results:
+            self.report({'WARNING'}, "%d of %d objects have COLOR problems" % (len(validation_results), len(objects)))
+        else:
+            self.report({'INFO'}, "COLOR of %d objects is ready for export" % len(objects))
+        return {'FINISHED'}
+
+class ShowObject(bpy.types.Operator):
+    bl_idname = "paint.show_object"
+    bl_label = "Show Object"
+    bl_description = "Select the object and make it the one painted. \nRight click to assign shortcut"
+    bl_options = {'REGISTER','UNDO'}
+
+    name : bpy.props.StringProperty()
+
+    def execute(self, context):
+        obj = context.scene.objects.get(self.name)
+        if obj is None:
+            self.report({'ERROR'}, "%s is no longer in the scene." % self.name)
+            return {'CANCELLED'}
+        painting = context.mode == 'PAINT_VERTEX'
+        if context.active_object is not None and context.active_object.mode != 'OBJECT':
+            bpy.ops.object.mode_set(mode='OBJECT')
+        for other in context.selected_objects:
+            other.select_set(False)
+        obj.select_set(True)
+        context.view_layer.objects.active = obj
+        if painting and obj.type == 'MESH':
+            bpy.ops.object.mode_set(mode='VERTEX_PAINT')
+        return {'FINISHED'}
+
+class ColorLayerDomain(bpy.types.Operator):
+    bl_idname = "paint.color_layer_domain"
+    bl_label = "Store Color Layer"
+    bl_description = "Store the active color layer per vertex, a fraction of the memory when every corner of a vertex has the same color, or per corner again. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER','UNDO'}
+
+    domain : bpy.props.EnumProperty(
+        name="Store",
+        items=[
+            ('POINT', 'Per Vertex', 'One color per vertex'),
+            ('CORNER', 'Per Corner', 'One color per face corner, what exporters read'),
+        ],
+        default='POINT'
+    )
+
+    average : bpy.props.BoolProperty(
+        name="Average",
+        description="Merge the corners of vertices whose corners have different colors into their average color",
+        default=False
+    )
+
+    def execute(self, context):
+        obj = context.active_object.data
+        if meshops.colorLayerApi != 'color_attributes':
+            self.report({'ERROR'}, "Per vertex color layers need a newer Blender version.")
+            return {'CANCELLED'}
+        color_layer = findActiveColorLayer(getColorLayers(obj), obj)
+        name = color_layer.name
+
+        if self.domain == 'POINT' and not self.average:
+            uniform = meshops.pointUniform(obj, color_layer)
+            if uniform < 1:
+                self.report({'WARNING'}, "%.1f%% of the vertices have corners with different colors, enable Average to merge them" % ((1 - uniform)*100))
+                return {'CANCELLED'}
+
+        with history.step(self.bl_label, historyLimit(context)), profiling.measure(self.bl_label, obj):
+            meshops.convertDomain(obj, name, self.domain)
+        self.report({'INFO'}, "%s now has %d colors" % (name, len(getColorLayers(obj)[name].data)))
+        return {'FINISHED'}
+
+class ResetAddonMemory(bpy.types.Operator):
+    bl_idname = "paint.resetaddonmemory"
+    bl_label = "Reset View"
+    bl_description = "Discard current view layer and reset internal isolated channels memory. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER','UNDO'}
+
+    isolated_channels : bpy.props.StringProperty(
+        name="isolated channels",
+        default="")
+
+    def execute(self, context):
+        settings = context.scene.paint_alpha_settings
+        settings.isolated_Channel = self.isolated_channels
+
+        obj = context.active_object
+
+        with profiling.measure(self.bl_label, obj.data):
+            meshops.resetView(obj.data)
+        channelview.hideChannels(context, obj)
+
+        return {'FINISHED'}
+
+class TakeSnapshot(bpy.types.Operator):
+    bl_idname = "paint.take_snapshot"
+    bl_label = "Take Snapshot"
+    bl_description = "Store the active color layer as a compressed snapshot in the mesh, without adding a color layer. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    name : bpy.props.StringProperty(name="Name", default="")
+
+    def execute(self, context):
+        settings = context.scene.paint_alpha_settings
+        obj = context.active_object.data
+        name = self.name or settings.snapshot_name
+        with profiling.measure(self.bl_label, obj):
+            layer_name = snapshots.take(obj, name)
+        self.report({'INFO'}, "Snapshot %s of %s" % (name, layer_name))
+        return {'FINISHED'}
+
+def restoreSnapshot(self, context, name, other=None):
+    # Restores name, or toggles between name and other
+    obj = context.active_object.data
+    try:
+        with history.step(self.bl_label, historyLimit(context)), profiling.measure(self.bl_label, obj):
+            if other is None: snapshots.restore(obj, name)
+            else: name = snapshots.toggle(obj, name, other)
+    except ValueError as e:
+        self.report({'ERROR'}, str(e))
+        return {'CANCELLED'}
+    self.report({'INFO'}, "Showing snapshot " + name)
+    return colorsChanged(context)
+
+class RestoreSnapshot(bpy.types.Operator):
+    bl_idname = "paint.restore_snapshot"
+    bl_label = "Restore Snapshot"
+    bl_description = "Write a snapshot back into the color layer it was taken from. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    name : bpy.props.StringProperty(name="Name", default="")
+
+    def execute(self, context):
+        return restoreSnapshot(self, context, self.name)
+
+class ToggleSnapshots(bpy.types.Operator):
+    bl_idname = "paint.toggle_snapshots"
+    bl_label = "Toggle A/B"
+    bl_description = "Switch between snapshots A and B to compare them. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    def execute(self, context):
+        settings = context.scene.paint_alpha_settings
+        if settings.snapshot_a == 'NONE' or settings.snapshot_b == 'NONE':
+            self.report({'ERROR'}, "Take two snapshots to compare first")
+            return {'CANCELLED'}
+        return restoreSnapshot(self, context, settings.snapshot_a, settings.snapshot_b)
+
+class RemoveSnapshot(bpy.types.Operator):
+    bl_idname = "paint.remove_snapshot"
+    bl_label = "Remove Snapshot"
+    bl_description = "Delete a snapshot from the mesh"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    name : bpy.props.StringProperty(name="Name", default="")
+
+    def execute(self, context):
+        snapshots.remove(context.active_object.data, self.name)
+        return {'FINISHED'}
+
+class GenerateOcclusion(bpy.types.Operator):
+    bl_idname = "paint.generate_occlusion"
+    bl_label = "Ambient Occlusion"
+    bl_description = "Compute ambient occlusion per vertex into the R channel of the masked vertices, lower where the model shades itself. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    mode : bpy.props.EnumProperty(
+        name='Mode',
+        items=[
+            ('RAYS', 'Rays', 'Cast rays into the hemisphere of every vertex and count those that hit the mesh, fewer per vertex on meshes with millions of vertices'),
+            ('CAVITY', 'Cavity', 'Only darken creases from the angles to the neighboring vertices, instant even on huge meshes'),
+        ],
+        default='RAYS'
+    )
+
+    samples : bpy.props.IntProperty(
+        name="Samples",
+        description="Rays per vertex",
+        default=16,
+        min=1,
+        soft_max=64,
+    )
+
+    distance : bpy.props.FloatProperty(
+        name="Distance",
+        description="Length of the rays, relative to the size of the mesh",
+        default=0.1,
+        min=0.001,
+        max=1,
+    )
+
+    strength : bpy.props.FloatProperty(
+        name="Strength",
+        description="How much R is lowered in fully occluded areas",
+        default=1,
+        min=0,
+        soft_max=2,
+    )
+
+    def draw(self, context):
+        layout = self.layout
+        layout.prop(self, "mode")
+        if self.mode == 'RAYS':
+            layout.prop(self, "samples")
+            layout.prop(self, "distance")
+        layout.prop(self, "strength")
+
+    def execute(self, context):
+        settings = context.scene.paint_alpha_settings
+        obj = context.active_object.data
+
+        with history.step(self.bl_label, historyLimit(context)), profiling.measure(self.bl_label, obj):
+            painted = meshops.ambientOcclusion(obj, self.mode, self.samples, self.distance, self.strength,
+                settings.enable_indiscriminate_fill)
+        if not painted:
+            self.report({'ERROR'}, "Cannot paint when no vertices are selected and ALL option is off.")
+            return {'CANCELLED'}
+        if painted < self.samples:
+            self.report({'WARNING'}, "Only %d rays per vertex were cast to stay under %d million rays, Cavity is instant on meshes this size" %
+                (painted, meshops.RAY_BUDGET//1000000))
+        return colorsChanged(context)
+
+# Operators and scenes can't hold a curve, the outline curve lives on a node of a hidden node group
+outline_curve_group = ".LEO Alpha Outline Curve"
+
+def outlineCurveNode(create=False):
+    group = bpy.data.node_groups.get(outline_curve_group)
+    if group is None:
+        if not create: return None
+        group = bpy.data.node_groups.new(outline_curve_group, 'ShaderNodeTree')
+        group.use_fake_user = True
+    node = group.nodes.get("Curve")
+    if node is None and create:
+        node = group.nodes.new('ShaderNodeRGBCurve')
+        node.name = "Curve"
+    return node
+
+def curveTable(node, steps=256):
+    # The combined (C) curve of the node sampled at evenly spaced steps from 0 to 1
+    mapping = node.mapping
+    try: mapping.initialize()
+    except AttributeError: pass
+    return [mapping.evaluate(mapping.curves[3], i/(steps - 1)) for i in range(steps)]
+
+class GenerateOutline(bpy.types.Operator):
+    bl_idname = "paint.generate_outline"
+    bl_label = "Outline Thickness"
+    bl_description = "Estimate the outline thickness of the masked vertices into the A channel: thin parts like spikes and fingers "\
+        "and concave edges get thinner outlines. The curve in the Generate panel reshapes the result. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+    bl_options = {'REGISTER', 'UNDO'}
+
+    thickness : bpy.props.FloatProperty(
+        name="Thickness",
+        description="Parts thinner than this, relative to the size of the mesh, get thinner outlines. 0 only looks at concave edges",
+        default=0.02,
+        min=0,
+        soft_max=0.2,
+        precision=3,
+    )
+
+    concave_angle : bpy.props.FloatProperty(
+        name="Concave Angle",
+        description="Concave edges this sharp or sharper get the thinnest outline",
+        default=math.pi/3,
+        min=0.01,
+        max=math.pi,
+        subtype='ANGLE',
+    )
+
+    min_alpha : bpy.props.FloatProperty(
+        name="Thin",
+        description="Alpha of the thinnest parts and sharpest concave edges",
+        default=0.106,
+        min=0,
+        max=1,
+    )
+
+    max_alpha : bpy.props.FloatProperty(
+        name="Thick",
+        description="Alpha of thick parts without concave edges",
+        default=0.502,
+        min=0,
+        max=1,
+    )
+
+    use_curve : bpy.props.BoolProperty(
+        name="Use Curve",
+        description="Map the estimate through the curve in the Generate panel",
+        default=True,
+    )
+
+    def execute(self, context):
+        settings = context.scene.paint_alpha_settings
+        obj = context.active_object.data
+        curve = curveTable(outlineCurveNode(True)) if self.use_curve else None
+
+        with history.step(self.bl_label, historyLimit(context)), profiling.measure(self.bl_label, obj):
+            painted = meshops.outlineThickness(obj, self.thickness, self.concave_angle, curve,
+                (self.min_alpha, self.max_alpha), settings.enable_indiscriminate_fill)
+        if not painted:
+            self.report({'ERROR'}, "Cannot paint when no vertices are selected and ALL option is off.")
+            return {'CANCELLED'}
+        return colorsChanged(context)
+
+def replayHistory(self, context, entry):
+    if entry is None:
+        self.report({'INFO'}, "Nothing to " + self.bl_label.split()[0].lower())
+        return {'CANCELLED'}
+    step, side = entry
+    with profiling.measure(self.bl_label, context.active_object.data):
+        skipped = meshops.applyHistory(step, side)
+    if skipped:
+        self.report({'WARNING'}, "Part of \"%s\" was skipped, its color layer was removed or the mesh changed" % step['label'])
+    return {'FINISHED'}
+
+class UndoColor(bpy.types.Operator):
+    bl_idname = "paint.undo_color"
+    bl_label = "Undo Color"
+    bl_description = "Undo the last color change recorded in the add-on's color history, only the changed corners are restored. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+
+    def execute(self, context):
+        return replayHistory(self, context, history.undo())
+
+class RedoColor(bpy.types.Operator):
+    bl_idname = "paint.redo_color"
+    bl_label = "Redo Color"
+    bl_description = "Redo the last color change undone with Undo Color. \nRight click to assign shortcut"
+    bl_context = 'vertexpaint'
+
+    def execute(self, context):
+        return replayHistory(self, context, history.redo())
+
+class ExportProfile(bpy.types.Operator):
+    bl_idname = "paint.export_profile"
+    bl_label = "Export Timings"
+    bl_description = "Save the recorded operator timings as JSON or CSV. \nRight click to assign shortcut"
+
+    filepath : bpy.props.StringProperty(subtype='FILE_PATH')
+
+    file_format : bpy.props.EnumProperty(
+        name="Format",
+        items=[
+            ('JSON', 'JSON', 'List of records'),
+            ('CSV', 'CSV', 'One row per operator run'),
+        ],
+        default='CSV'
+    )
+
+    def execute(self, context):
+        extension = "." + self.file_format.lower()
+        path = bpy.path.ensure_ext(bpy.path.abspath(self.filepath), extension)
+        if self.file_format == 'JSON': profiling.exportJson(path)
+        else: profiling.exportCsv(path)
+        self.report({'INFO'}, "Saved %d timings to %s" % (len(profiling.records), path))
+        return {'FINISHED'}
+
+    def invoke(self, context, event):
+        if not self.filepath: self.filepath = "leo_alpha_paint_timings." + self.file_format.lower()
+        context.window_manager.fileselect_add(self)
+        return {'RUNNING_MODAL'}
+
+class ClearProfile(bpy.types.Operator):
+    bl_idname = "paint.clear_profile"
+    bl_label = "Clear Timings"
+    bl_description = "Forget the recorded operator timings. \nRight click to assign shortcut"
+
+    def execute(self, context):
+        profiling.clear()
+        return {'FINISHED'}
+
+class PaintAlphaPanel(bpy.types.Panel):
+    bl_idname = "OBJECT_PT_paint_alpha"
+    bl_label = "LEO Alpha Paint"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Vertex Paint"
+    bl_context = 'vertexpaint'
+    #bpy.data.brushes['Draw'].use_alpha = False
+
+    def draw(self, context):
+        settings = context.scene.paint_alpha_settings
+        obj = context.active_object.data
+        layout = self.layout
+
+        col = layout.column(align=True)
+        col.operator("paint.quickexportvertexcolors")
+        row = col.row(align=True)
+        row.operator("paint.export_color_buffer", text="Export .buf", icon='EXPORT')
+        row.operator("paint.import_color_buffer", text="Import .buf", icon='IMPORT')
+
+        box = col.box()
+        col = box.column()
+        row = col.row(align=True)
+        if settings.past_shading == 'UnInitialized':
+            row.operator("paint.flat_shading", text = "Shade FLAT")
+        else:
+            row.operator("paint.flat_shading", text = "Shade " + settings.past_shading)
+        row.prop(context.tool_settings.vertex_paint.brush, "use_alpha", text = "affect alpha", toggle=True)
+
+        row = col.row(align=True)
+        row.prop(obj, "use_paint_mask_vertex", text='Vertex')
+        row.prop(obj, "use_paint_mask", text='Face')
+        row.prop(settings, "byte_mode", toggle=True)
+
+        if meshops.colorLayerApi == 'color_attributes':
+            color_layer = findActiveColorLayer(getColorLayers(obj), obj)
+            if color_layer is not None and meshops.layerDomain(color_layer) == 'POINT':
+                col.operator("paint.color_layer_domain", text="Store Per Corner").domain = 'CORNER'
+            elif color_layer is not None:
+                col.operator("paint.color_layer_domain", text="Store Per Vertex").domain = 'POINT'
+
+        col = layout.column(align=True)
+        col.label(text="Isolate Channels")
+        row = col.row(align=True)
+        row.prop(settings, "one_layer_isolate", toggle=True, text="Mono")
+        row.prop(settings, "isolate_mode", text="")
+        row.operator("paint.resetaddonmemory")
+
+        row = col.row(align=True)
+
+        backupstring = settings.isolated_Channel
+        row.operator("paint.isolate_vertex_red", depress = "0" in backupstring)
+        row.operator("paint.isolate_vertex_green", depress = "1" in backupstring)
+        row.operator("paint.isolate_vertex_blue", depress = "2" in backupstring)
+        col.operator("paint.isolate_vertex_alpha", depress = "3" in backupstring)
+
+        box = col.box()
+        col = box.column(align=True)
+        
+        col.prop(context.tool_settings.vertex_paint.brush, "color", text="")
+        row = col.row(align=True)
+        row.operator("paint.paint_alpha_operator")
+        row.prop(settings, "enable_indiscriminate_fill", text = "ALL", toggle=True)
+        row = col.row(align=True)
+        if settings.select_color_mode == 'PALETTE':
+            row.operator("paint.selectbypalettecolor", text='Select')
+        elif settings.select_color_mode == 'REGION':
+            row.operator("paint.select_color_region", text='Select')
+        else: row.operator("paint.selectbyisolatedvertexcolor", text='Select')
+        row.prop(settings, "select_color_mode", text='')
+        
+        row = col.row(align=True)
+        row.operator("paint.gradienttool", text='Gradient')
+        row.prop(context.tool_settings.vertex_paint.brush, "secondary_color", text="")
+        col.operator("paint.smooth_channels", text='Smooth')
+
+        col = box.column(align=True)
+        row = col.row(align=True)
+        if settings.color_undo == 'HISTORY':
+            row.operator("paint.undo_color", text="", icon='LOOP_BACK')
+            row.operator("paint.redo_color", text="", icon='LOOP_FORWARDS')
+        row.prop(settings, "color_undo", text="")
+        if settings.color_undo == 'HISTORY':
+            row = col.row(align=True)
+            row.label(text="%d steps, %.1f MB" % (len(history.undoSteps), history.size()/(1024*1024)))
+            row.prop(settings, "history_limit")
+
+        col = layout.column(align=True)
+        col.prop(settings, "enable_transfer_tools", toggle=True)
+        if settings.enable_transfer_tools:
+            box = col.box()
+            col = box.column(align=True)
+            row = col.row(align=True)
+            if settings.blend_mode == 'ALPHAOVER': echannellist = enumerate(channel_list[:3])
+            else: echannellist = enumerate(channel_list)
+            for i,name in echannellist:
+                row.prop(settings, "src_ch", index=i, text=name, toggle=True)
+
+            col.prop(settings, "src_object")
+            from_object = settings.src_object is not None and settings.src_object != context.active_object
+            col.prop(settings, "src_object_vcol" if from_object else "src_vcol")
+            col = box.column(align=True)
+            col.prop(settings, "blend_mode", text='Blend')
+            col.prop(settings, 'factor_vcol')
+            col.prop(settings, 'factor_slider', slider=True)
+            col = box.column(align=True)
+            col.operator("paint.transfer_channels" if from_object else "paint.blendchannels")
+            try: col.prop(obj.vertex_colors, "active", text='Active')
+            except: col.prop(obj.attributes, "active_color", text='Active')
+            
+        box = layout.box()
+        col = box.column()
+        col.operator("paint.sample_vertex", text = "Sample selected colors")
+
+        col = box.column(align=True)
+        col.operator("paint.palettevertexcolors", text='Palette vertex colors')
+        
+        row = col.row(align=True)
+        row.operator("paint.custom_new_color_palette", text="New")
+        row.operator("paint.custom_remove_color_palette", text="Delete")
+        col.prop(context.tool_settings.vertex_paint, "palette", text="")
+        col.template_palette(context.tool_settings.vertex_paint, "palette", color=True)
+
+        layout.separator()
+        
+        layout.label(text="For discord.gg/agmg modding")
+
+class PaintAlphaProfilePanel(bpy.types.Panel):
+    bl_idname = "OBJECT_PT_paint_alpha_profile"
+    bl_label = "Timings"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Vertex Paint"
+    bl_context = 'vertexpaint'
+    bl_parent_id = "OBJECT_PT_paint_alpha"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        settings = context.scene.paint_alpha_settings
+        layout = self.layout
+
+        row = layout.row(align=True)
+        row.prop(settings, "enable_profiling", toggle=True)
+        row.operator("paint.export_profile", text="", icon='EXPORT')
+        row.operator("paint.clear_profile", text="", icon='TRASH')
+
+        col = layout.column(align=True)
+        for record in list(profiling.records)[:-11:-1]:
+            box = col.box()
+            sub = box.column(align=True)
+            sub.label(text="%s  %.1f ms  %d corners" % (record['operator'], record['total']*1000, record['corners']))
+            sub.label(text="read %.1f  compute %.1f  write %.1f  update %.1f" % tuple(record[x]*1000 for x in profiling.phases))
+
+class PaintAlphaSnapshotPanel(bpy.types.Panel):
+    bl_idname = "OBJECT_PT_paint_alpha_snapshots"
+    bl_label = "Snapshots"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Vertex Paint"
+    bl_context = 'vertexpaint'
+    bl_parent_id = "OBJECT_PT_paint_alpha"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        settings = context.scene.paint_alpha_settings
+        obj = context.active_object.data
+        layout = self.layout
+
+        row = layout.row(align=True)
+        row.prop(settings, "snapshot_name", text="")
+        row.operator("paint.take_snapshot", text="Take", icon='IMAGE_DATA')
+
+        names = snapshots.names(obj)
+        if not names: return
+        row = layout.row(align=True)
+        row.prop(settings, "snapshot_a", text="")
+        row.prop(settings, "snapshot_b", text="")
+        row.operator("paint.toggle_snapshots", text="A/B")
+
+        col = layout.column(align=True)
+        shown = obj.get(snapshots.SHOWN_PROPERTY)
+        for name in names:
+            row = col.row(align=True)
+            row.operator("paint.restore_snapshot", text=name, depress=name == shown).name = name
+            row.operator("paint.remove_snapshot", text="", icon='X').name = name
+        col.label(text="%.1f MB in the mesh" % (snapshots.size(obj)/(1024*1024)))
+
+class PaintAlphaGeneratePanel(bpy.types.Panel):
+    bl_idname = "OBJECT_PT_paint_alpha_generate"
+    bl_label = "Generate"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Vertex Paint"
+    bl_context = 'vertexpaint'
+    bl_parent_id = "OBJECT_PT_paint_alpha"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+
+        col = layout.column(align=True)
+        col.operator("paint.generate_occlusion", text="Ambient Occlusion (R)")
+        col.operator("paint.generate_outline", text="Outline Thickness (A)")
+        node = outlineCurveNode()
+        if node is not None:
+            layout.template_curve_mapping(node, "mapping")
+
+class PaintAlphaValidatePanel(bpy.types.Panel):
+    bl_idname = "OBJECT_PT_paint_alpha_validate"
+    bl_label = "Validate"
+    bl_space_type = 'VIEW_3D'
+    bl_region_type = 'UI'
+    bl_category = "Vertex Paint"
+    bl_context = 'vertexpaint'
+    bl_parent_id = "OBJECT_PT_paint_alpha"
+    bl_options = {'DEFAULT_CLOSED'}
+
+    def draw(self, context):
+        layout = self.layout
+        layout.operator("paint.validate_colors", text="Validate Scene", icon='CHECKMARK')
+
+        col = layout.column(align=True)
+        for name, problems in validation_results:
+            box = col.box()
+            sub = box.column(align=True)
+            sub.operator("paint.show_object", text=name, icon='ERROR', emboss=False).name = name
+            for problem in problems:
+                sub.label(text=problem)
+
+classes = (
+    PaintAlphaPropertyGroup,
+    BlendChannels,
+    TransferChannels,
+    PaintAlphaOperator,
+    SmoothChannels,
+    PaintAlphaPanel,
+    FlatShading,
+    IsolateVertexAlpha,
+    IsolateVertexRed,
+    IsolateVertexGreen,
+    IsolateVertexBlue,
+    SampleAverageVertex,
+    SelectByIsolatedVertexColor,
+    SelectByPaletteColor,
+    SelectColorRegion,
+    PaintGradient,
+    CustomNewColorPalette,
+    CustomRemoveColorPalette,
+    PaletteVertexColors,
+    QuickExportVertexColors,
+    ExportColorBuffer,
+    ImportColorBuffer,
+    ValidateColors,
+    ShowObject,
+    ColorLayerDomain,
+    ResetAddonMemory,
+    UndoColor,
+    RedoColor,
+    ExportProfile,
+    ClearProfile,
+    TakeSnapshot,
+    RestoreSnapshot,
+    ToggleSnapshots,
+    RemoveSnapshot,
+    GenerateOcclusion,
+    GenerateOutline,
+    PaintAlphaGeneratePanel,
+    PaintAlphaValidatePanel,
+    PaintAlphaSnapshotPanel,
+    PaintAlphaProfilePanel,
+    )
+
+@persistent
+def meshCacheUpdate(scene, depsgraph):
+    # Drop the cached arrays of meshes changed by anything but the add-on (brush strokes, edit mode, selection)
+    for update in depsgraph.updates:
+        data = update.id.original
+        if isinstance(data, bpy.types.Object):
+            if not update.is_updated_geometry or data.type != 'MESH': continue
+            data = data.data
+        elif not isinstance(data, bpy.types.Mesh): continue
+        meshcache.meshUpdated(data.as_pointer())
+    meshcache.ownWrites.clear()
+
+@persistent
+def meshCacheClear(*args):
+    meshcache.clear()
+
+@persistent
+def colorHistoryClear(*args):
+    # Blender's undo and file loading replace the meshes the history points to
+    history.clear()
+
+@persistent
+def validationClear(*args):
+    validation_results.clear()
+
+@persistent
+def loadSettings(*args):
+    # Apply the loaded scene's settings that live outside the scene
+    settings = bpy.context.scene.paint_alpha_settings
+    updateProfiling(settings, bpy.context)
+    updateByteMode(settings, bpy.context)
+
+cache_handlers = (
+    (bpy.app.handlers.depsgraph_update_post, meshCacheUpdate),
+    (bpy.app.handlers.undo_post, meshCacheClear),
+    (bpy.app.handlers.redo_post, meshCacheClear),
+    (bpy.app.handlers.load_post, meshCacheClear),
+    (bpy.app.handlers.undo_post, colorHistoryClear),
+    (bpy.app.handlers.redo_post, colorHistoryClear),
+    (bpy.app.handlers.load_post, colorHistoryClear),
+    (bpy.app.handlers.load_post, validationClear),
+    (bpy.app.handlers.load_post, loadSettings),
+    )
+
+def register():
+    try: srgb_values = 'color_srgb' in bpy.types.ByteColorAttributeValue.bl_rna.properties
+    except AttributeError: srgb_values = False
+    meshops.resolveColorLayerApi(bpy.types.Mesh, srgb_values)
+    # add operators
+    for c in classes:
+        bpy.utils.register_class(c)
+    bpy.types.Scene.paint_alpha_settings = bpy.props.PointerProperty(type=PaintAlphaPropertyGroup)
+    for handlers, handler in cache_handlers:
+        handlers.append(handler)
+
+def unregister():
+    for handlers, handler in cache_handlers:
+        if handler in handlers: handlers.remove(handler)
+    meshcache.clear()
+    history.clear()
+    profiling.enabled = False
+    profiling.clear()
+    meshops.colorLayerApi = None
+    meshops.byteMode = False
+    layer_items.clear()
+    validation_results.clear()
+
+    # remove operators
+    del bpy.types.Scene.paint_alpha_settings 
+    for c in reversed(classes):
+        bpy.utils.unregister_class(c)
+
+    pal = bpy.data.palettes.get("LEO_Alpha_Palette")
+    if pal:
+        del pal
+
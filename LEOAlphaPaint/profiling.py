@@ -0,0 +1,70 @@
+# Opt-in timing of the add-on's operators. measure() wraps an operator run, phase() the parts of
+# meshops that talk to Blender: reading arrays from the mesh, writing them back and mesh.update().
+# Whatever is left of an operator's time is the NumPy work, reported as compute.
+
+import collections
+import contextlib
+import csv
+import json
+import time
+
+phases = ('read', 'compute', 'write', 'update')
+fields = ('operator', 'time', 'meshes', 'vertices', 'corners', 'total') + phases
+
+enabled = False
+records = collections.deque(maxlen=500)
+# Record of the operator being measured, and the time spent in nested phases of the open ones
+current = None
+phase_stack = []
+
+@contextlib.contextmanager
+def measure(name, meshes=()):
+    # meshes: the mesh or meshes the operator works on, for the size columns
+    global current
+    if not enabled or current is not None:
+        yield
+        return
+    if not isinstance(meshes, (list, tuple)): meshes = [meshes]
+    meshes = [mesh for mesh in meshes if mesh is not None]
+    current = dict.fromkeys(phases, 0.0)
+    current.update(operator=name, time=time.strftime('%Y-%m-%d %H:%M:%S'), meshes=len(meshes),
+        vertices=sum(len(mesh.vertices) for mesh in meshes), corners=sum(len(mesh.loops) for mesh in meshes))
+    start = time.perf_counter()
+    try: yield
+    finally:
+        record, current = current, None
+        phase_stack.clear()
+        record['total'] = time.perf_counter() - start
+        record['compute'] = max(0.0, record['total'] - record['read'] - record['write'] - record['update'])
+        records.append(record)
+
+@contextlib.contextmanager
+def phase(name):
+    # Nested phases are taken out of the enclosing one, e.g. a cached derived array is compute
+    # while the arrays it reads are read. compute itself is only ever the remainder
+    if current is None:
+        yield
+        return
+    record = current
+    entry = [0.0]
+    phase_stack.append(entry)
+    start = time.perf_counter()
+    try: yield
+    finally:
+        elapsed = time.perf_counter() - start
+        phase_stack.pop()
+        if phase_stack: phase_stack[-1][0] += elapsed
+        if name != 'compute': record[name] += elapsed - entry[0]
+
+def clear():
+    records.clear()
+
+def exportJson(path):
+    with open(path, 'w') as f:
+        json.dump(list(records), f, indent=1)
+
+def exportCsv(path):
+    with open(path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(records)
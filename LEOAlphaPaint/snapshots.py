@@ -0,0 +1,76 @@
+# Named snapshots of a color layer, kept in a custom property of the mesh instead of extra color
+# layers. A snapshot holds the layer's colors as bytes, zlib compressed and base64 encoded since
+# ID properties store text, so it costs a fraction of a layer and saves with the .blend file.
+# Restoring writes the colors back with one foreach_set, toggle() flips between two snapshots.
+
+import base64
+import zlib
+
+import numpy as np
+
+from . import core, meshops
+
+PROPERTY = "leo_alpha_snapshots"
+# Name of the snapshot toggle() restored last
+SHOWN_PROPERTY = "leo_alpha_snapshot_shown"
+
+def encode(colors):
+    return base64.b64encode(zlib.compress(core.toBytes(colors).tobytes(), 6)).decode('ascii')
+
+def decode(data):
+    values = np.frombuffer(zlib.decompress(base64.b64decode(data)), dtype=np.uint8)
+    return values.reshape(-1, 4).astype(np.float32)/np.float32(255)
+
+def store(mesh):
+    if mesh.get(PROPERTY) is None: mesh[PROPERTY] = {}
+    return mesh[PROPERTY]
+
+def names(mesh):
+    snapshots = mesh.get(PROPERTY)
+    return sorted(snapshots.keys()) if snapshots is not None else []
+
+def size(mesh):
+    snapshots = mesh.get(PROPERTY)
+    if snapshots is None: return 0
+    return sum(len(snapshots[name]['data']) for name in snapshots.keys())
+
+def take(mesh, name):
+    # Snapshot of the active layer, replaces an older one with the same name
+    layer = meshops.findActiveColorLayer(meshops.getColorLayers(mesh), mesh)
+    store(mesh)[name] = {'layer': layer.name, 'domain': meshops.layerDomain(layer),
+        'data': encode(meshops.readColors(layer, False))}
+    return layer.name
+
+def remove(mesh, name):
+    snapshots = mesh.get(PROPERTY)
+    if snapshots is not None and name in snapshots: del snapshots[name]
+    if mesh.get(SHOWN_PROPERTY) == name: del mesh[SHOWN_PROPERTY]
+
+def restore(mesh, name):
+    # Writes snapshot name into the layer it was taken from, or the active layer when that one is
+    # gone. Snapshots of the other domain are converted like Store Per Vertex/Corner does
+    if name not in names(mesh): raise ValueError("There is no snapshot named " + name)
+    snapshot = mesh[PROPERTY][name]
+    color_data = meshops.getColorLayers(mesh)
+    if snapshot['layer'] in meshops.layerNames(mesh): layer = color_data[snapshot['layer']]
+    else: layer = meshops.findActiveColorLayer(color_data, mesh)
+
+    colors = decode(snapshot['data'])
+    loop_vert = meshops.loopVertexIndex(mesh)
+    domain = meshops.layerDomain(layer)
+    if snapshot['domain'] != domain:
+        if domain == 'CORNER' and len(colors) == len(mesh.vertices): colors = colors[loop_vert]
+        elif domain == 'POINT' and len(colors) == len(loop_vert): colors = core.pointColors(colors, loop_vert, len(mesh.vertices))
+    if len(colors) != len(layer.data):
+        raise ValueError("Snapshot %s was taken with a different topology" % name)
+
+    meshops.writeColors(layer, colors)
+    meshops.updateMesh(mesh)
+    mesh[SHOWN_PROPERTY] = name
+    return layer.name
+
+def toggle(mesh, a, b):
+    # A/B compare: restores b while a is shown and a otherwise, returns the restored name
+    name = b if mesh.get(SHOWN_PROPERTY) == a else a
+    restore(mesh, name)
+    return name
@@ -0,0 +1,153 @@
+# Small in-memory stand-in for the parts of bpy.types.Mesh the add-on uses (element
+# collections with foreach_get/foreach_set, the vertex_colors/color_attributes layer
+# collection, the paint mask flags and custom properties). meshops functions accept it in place of a real mesh, which lets the
+# operator logic run and be timed on a machine without Blender.
+
+import numpy as np
+
+def _uniqueName(name, taken):
+    if name not in taken: return name
+    i = 1
+    while "%s.%03d" % (name, i) in taken: i += 1
+    return "%s.%03d" % (name, i)
+
+class StandInCollection:
+    # Elements are stored as one array per attribute, shaped (count,) or (count, size)
+    def __init__(self, count, **attributes):
+        self._count = count
+        self._attributes = {key: np.asarray(value) for key, value in attributes.items()}
+
+    def __len__(self):
+        return self._count
+
+    def foreach_get(self, attr, seq):
+        values = self._attributes[attr].ravel()
+        if len(seq) != len(values):
+            raise RuntimeError("internal error setting the array")
+        seq[:] = values if isinstance(seq, np.ndarray) else values.tolist()
+
+    def foreach_set(self, attr, seq):
+        values = self._attributes[attr]
+        seq = np.asarray(seq, dtype=values.dtype)
+        if seq.size != values.size:
+            raise RuntimeError("internal error setting the array")
+        values[...] = seq.reshape(values.shape)
+
+class StandInColorData(StandInCollection):
+    def __init__(self, count, data_type):
+        super().__init__(count, color=np.ones((count, 4), dtype=np.float32))
+        self.data_type = data_type
+
+    def foreach_set(self, attr, seq):
+        super().foreach_set(attr, seq)
+        if self.data_type == 'BYTE_COLOR':
+            # Byte layers store unit_float_to_uchar_clamp(f) and read back byte/255
+            colors = self._attributes[attr]
+            colors[...] = np.clip(np.floor(colors*np.float32(255) + np.float32(0.5)), 0, 255) / np.float32(255)
+
+class StandInColorLayer:
+    def __init__(self, name, count, data_type='BYTE_COLOR', id_data=None, domain='CORNER'):
+        self.name = name
+        self.data = StandInColorData(count, data_type)
+        self.data_type = data_type
+        self.domain = domain
+        self.id_data = id_data
+
+class StandInColorLayers:
+    # Mirrors mesh.vertex_colors and mesh.color_attributes, which both are this one collection:
+    # creation order is kept, names are made unique like Blender does
+    def __init__(self, mesh):
+        self._mesh = mesh
+        self._layers = {}
+        self.active = None
+
+    def new(self, name="Col", do_init=True, domain=None):
+        # vertex_colors.new(name, do_init) or color_attributes.new(name, type, domain)
+        data_type = 'BYTE_COLOR'
+        if isinstance(do_init, str): data_type, do_init = do_init, False
+        domain = domain or 'CORNER'
+        name = _uniqueName(name, self._layers)
+        count = len(self._mesh.vertices) if domain == 'POINT' else len(self._mesh.loops)
+        layer = StandInColorLayer(name, count, data_type, self._mesh, domain)
+        if do_init and self.active is not None:
+            layer.data.foreach_set("color", self.active.data._attributes["color"])
+        self._layers[name] = layer
+        if self.active is None: self.active = layer
+        return layer
+
+    def remove(self, layer):
+        del self._layers[layer.name]
+        if self.active is layer:
+            self.active = next(iter(self._layers.values()), None)
+
+    def keys(self):
+        return list(self._layers)
+
+    def __getitem__(self, key):
+        if isinstance(key, int): return list(self._layers.values())[key]
+        return self._layers[key]
+
+    def __contains__(self, name):
+        return name in self._layers
+
+    def __iter__(self):
+        return iter(list(self._layers.values()))
+
+    def __len__(self):
+        return len(self._layers)
+
+class StandInMesh:
+    def __init__(self, co, faces, name="StandInMesh"):
+        # co: (V,3) vertex positions, faces: sequence of vertex index sequences
+        co = np.asarray(co, dtype=np.float32).reshape(-1, 3)
+        totals = np.array([len(f) for f in faces], dtype=np.int32)
+        starts = np.cumsum(totals, dtype=np.int32) - totals
+        loop_vert = np.fromiter((v for f in faces for v in f), dtype=np.int32, count=int(totals.sum()))
+        self._build(co, starts, totals, loop_vert, name)
+
+    @classmethod
+    def fromArrays(cls, co, loop_start, loop_total, loop_vert, name="StandInMesh"):
+        mesh = cls.__new__(cls)
+        mesh._build(np.asarray(co, dtype=np.float32).reshape(-1, 3), np.asarray(loop_start, dtype=np.int32),
+            np.asarray(loop_total, dtype=np.int32), np.asarray(loop_vert, dtype=np.int32), name)
+        return mesh
+
+    def _build(self, co, starts, totals, loop_vert, name):
+        self.name = name
+        # Edges are the unique sorted vertex pairs of every face side
+        nxt = np.arange(len(loop_vert)) + 1
+        ends = starts + totals
+        nxt[ends - 1] = starts
+        pairs = np.sort(np.stack((loop_vert, loop_vert[nxt]), axis=1), axis=1).astype(np.int64)
+        keys = np.unique(pairs[:,0]*len(co) + pairs[:,1])
+        edges = np.stack((keys // max(len(co), 1), keys % max(len(co), 1)), axis=1)
+
+        self.vertices = StandInCollection(len(co), co=co, select=np.zeros(len(co), dtype=bool))
+        self.edges = StandInCollection(len(edges), vertices=edges.astype(np.int32))
+        self.polygons = StandInCollection(len(starts), loop_start=starts, loop_total=totals,
+            select=np.zeros(len(starts), dtype=bool))
+        self.loops = StandInCollection(len(loop_vert), vertex_index=loop_vert)
+        self.vertex_colors = self.color_attributes = StandInColorLayers(self)
+        self.use_paint_mask = False
+        self.use_paint_mask_vertex = False
+        self.update_count = 0
+        self._properties = {}
+
+    def update(self):
+        self.update_count += 1
+
+    # Custom properties, mesh["name"] like on any Blender ID
+    def __getitem__(self, key):
+        return self._properties[key]
+
+    def __setitem__(self, key, value):
+        self._properties[key] = value
+
+    def __delitem__(self, key):
+        del self._properties[key]
+
+    def __contains__(self, key):
+        return key in self._properties
+
+    def get(self, key, default=None):
+        return self._properties.get(key, default)
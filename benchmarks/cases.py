@@ -0,0 +1,322 @@
+# One benchmark case per operator entry point. `run` is the current implementation,
+# `legacy` the original per-loop code from legacy.py, both called as fn(mesh, palette) on a
+# fresh copy of the synthetic mesh after the untimed `setup`.
+
+import numpy as np
+
+from LEOAlphaPaint import core, meshops
+from LEOAlphaPaint.core import blending_modes
+
+from . import legacy
+from .meshgen import PERSPECTIVE_MATRIX, REGION_SIZE, byteColors, projectVertex
+
+BRUSH_COLOR = (0.2, 0.4, 0.6)
+ERROR_MARGIN = 0.001
+LARGE_PALETTE = 2000
+QUICK_COLOR = (1.0, 0.502, 0.502, 0.502)
+
+class Case:
+    def __init__(self, name, run, legacy=None, setup=None, tolerance=0, compare=None):
+        self.name = name
+        self.run = run
+        self.legacy = legacy
+        self.setup = setup
+        # Largest allowed difference between old and new colors, in 1/255 steps
+        self.tolerance = tolerance
+        self.compare = compare or (lambda new, old: new == old)
+
+def useMasks(mesh, palette):
+    mesh.use_paint_mask_vertex = True
+    mesh.use_paint_mask = True
+
+def usePoints(mesh, palette):
+    # "Col" stored per vertex, the seam corners are averaged
+    useMasks(mesh, palette)
+    meshops.convertDomain(mesh, "Col", 'POINT')
+
+def sameColorSet(new, old):
+    return {tuple(round(x*255) for x in c) for c in new} == {tuple(round(x*255) for x in c) for c in old}
+
+def sameAverage(new, old):
+    if new is None or old is None: return new is None and old is None
+    return all(abs(a - b) < 1e-6 for a, b in zip(new, old))
+
+def blendCase(mode):
+    args = ("Src", "Col", mode, (True, True, True, False), "Factor", 0.75)
+    # The old code kept its intermediate results in a temporary byte layer, so it rounded
+    # to 1/255 after every step where the new engine rounds once at the end
+    return Case("blend:" + mode,
+        lambda mesh, palette: meshops.blendChannels(mesh, *args),
+        lambda mesh, palette: legacy.blendChannels(mesh, *args),
+        tolerance=1)
+
+def byteMode(fn):
+    # fn run in 8-bit mode
+    def run(mesh, palette):
+        meshops.byteMode = True
+        try: return fn(mesh, palette)
+        finally: meshops.byteMode = False
+    return run
+
+def byteBlendCase(mode):
+    # The modes that are looked up in 8-bit mode, like the old code they round to bytes on the way
+    args = ("Src", "Col", mode, (True, True, True, False), "Factor", 0.75)
+    return Case("blend:byte:" + mode,
+        byteMode(lambda mesh, palette: meshops.blendChannels(mesh, *args)),
+        lambda mesh, palette: legacy.blendChannels(mesh, *args),
+        tolerance=1)
+
+def transfer(mesh, palette):
+    # From the mesh onto itself, every corner finds itself, so the result is a plain blend
+    return meshops.transferChannels(mesh, mesh, np.eye(4), "Src", "Col", 'MIX', (True, True, True, False), "Factor", 0.75)
+
+# Rotated, scaled and moved so the grid lands partly outside itself
+TRANSFER_MATRIX = np.array([
+    [0.93, -0.41, 0, 0.0537],
+    [0.43, 0.91, 0, -0.0291],
+    [0, 0, 1.1, 0.0023],
+    [0, 0, 0, 1]])
+
+# Scaled up and lifted off the plane, every corner is far from all source corners
+OFFSET_MATRIX = np.array([
+    [1.5, 0, 0, -0.25],
+    [0, 1.5, 0, -0.25],
+    [0, 0, 1, 0.5],
+    [0, 0, 0, 1]])
+
+def scatter(mesh, palette):
+    # The vertices scattered over a plane, unlike the regular grid some of them end up much
+    # closer to each other than to the rest
+    co = np.zeros((len(mesh.vertices), 3), dtype=np.float32)
+    co[:,:2] = np.random.default_rng(2).random((len(co), 2), dtype=np.float32)
+    mesh.vertices.foreach_set("co", co.ravel())
+    meshops.meshcache.discard(mesh, "co")
+
+def transferMatrix(matrix):
+    return lambda mesh, palette: meshops.transferChannels(mesh, mesh, matrix, "Src", "Col", 'MIX', (True, True, True, False), "Factor", 0.75)
+
+def bruteTransfer(matrix, chunk=1024):
+    # Nearest corner of every transformed corner by comparing all pairs
+    def run(mesh, palette):
+        points = meshops.elementPositions(mesh, 'CORNER')
+        queries = core.transformPoints(points, matrix)
+        mapping = np.concatenate([((queries[i:i+chunk,None] - points[None])**2).sum(axis=2).argmin(axis=1)
+            for i in range(0, len(queries), chunk)])
+        source = meshops.readColors(meshops.getColorLayers(mesh)["Src"], False)[mapping]
+        return meshops.blendChannels(mesh, "Src", "Col", 'MIX', (True, True, True, False), "Factor", 0.75, source=source)
+    return run
+
+def naiveSmooth(channels, iterations, seams):
+    # Jacobi smoothing one node at a time: a node is a vertex, or with seams a vertex's corners of
+    # one color, linked to the nodes across every face side
+    def run(mesh, palette):
+        layer = meshops.getColorLayers(mesh)["Col"]
+        colors = meshops.readColors(layer)
+        loop_vert = meshops.loopVertexIndex(mesh).tolist()
+        loop_start = np.empty(len(mesh.polygons), dtype=np.int32)
+        loop_total = np.empty(len(mesh.polygons), dtype=np.int32)
+        mesh.polygons.foreach_get("loop_start", loop_start)
+        mesh.polygons.foreach_get("loop_total", loop_total)
+        keys = [tuple(np.round(color*255).astype(int)) if seams else None for color in colors]
+        node_of = {}
+        corner_node = [node_of.setdefault((v, k), len(node_of)) for v, k in zip(loop_vert, keys)]
+        links = [set() for _ in node_of]
+        for start, total in zip(loop_start.tolist(), loop_total.tolist()):
+            for i in range(total):
+                a, b = corner_node[start + i], corner_node[start + (i + 1) % total]
+                if a != b:
+                    links[a].add(b)
+                    links[b].add(a)
+        sums = np.zeros((len(node_of), len(channels)))
+        counts = np.zeros(len(node_of))
+        for corner, node in enumerate(corner_node):
+            sums[node] += colors[corner,channels]
+            counts[node] += 1
+        values = sums/counts[:,None]
+        elements = meshops.paintElements(mesh, 'CORNER')
+        movable = set(corner_node[corner] for corner in elements.tolist())
+        for _ in range(iterations):
+            previous = values.copy()
+            for node in movable:
+                if links[node]:
+                    mean = sum(previous[other] for other in links[node])/len(links[node])
+                    values[node] = 0.5*previous[node] + 0.5*mean
+        for corner in elements.tolist():
+            colors[corner,channels] = values[corner_node[corner]]
+        meshops.writeColors(layer, colors)
+        return True
+    return run
+
+def isolateCases(ch, label):
+    on = lambda mesh, palette: meshops.isolateChannel(mesh, ch, True)
+    return [
+        Case("isolate:%s:on" % label, on, lambda mesh, palette: legacy.isolateChannel(mesh, ch, True)),
+        Case("isolate:%s:off" % label, on, lambda mesh, palette: legacy.isolateChannel(mesh, ch, True), setup=on),
+    ]
+
+def sample(mesh, palette):
+    average = meshops.sampleAverage(mesh, False)
+    return None if average is None else tuple(average.tolist())
+
+def selectBrush(mesh, palette):
+    meshops.selectByColors(mesh, [palette[0,:3]], ERROR_MARGIN)
+
+def selectPalette(mesh, palette):
+    meshops.selectByColors(mesh, palette[:,:3], ERROR_MARGIN)
+
+def selectFace(mesh, palette):
+    # Only the vertices of the first face selected, the seeds of select:region
+    select = np.zeros(len(mesh.vertices), dtype=bool)
+    select[meshops.loopVertexIndex(mesh)[:4]] = True
+    mesh.vertices.foreach_set("select", select)
+    meshops.meshcache.discard(mesh, "vert_select")
+
+# Random vertices selected as the seeds of select:region:seeds
+REGION_SEEDS = 1000
+
+def colorPatches(mesh, palette):
+    # "Col" in 32x32 square patches of random colors, REGION_SEEDS random vertices selected: each
+    # seed grows over its patch, and most of them start from a color of their own
+    co = meshops.vertexPositions(mesh)
+    patch = np.floor(np.clip(co[:,0], 0, 0.999)*32).astype(np.int64)*32 + np.floor(np.clip(co[:,1], 0, 0.999)*32).astype(np.int64)
+    colors = byteColors(np.random.default_rng(5), 32*32)[patch][meshops.loopVertexIndex(mesh)]
+    meshops.writeColors(meshops.getColorLayers(mesh)["Col"], colors)
+    select = np.zeros(len(co), dtype=bool)
+    select[np.random.default_rng(6).choice(len(co), min(REGION_SEEDS, len(co)), replace=False)] = True
+    mesh.vertices.foreach_set("select", select)
+    meshops.meshcache.discard(mesh, "vert_select")
+
+def naiveRegions(mesh, palette):
+    # One plain breadth first search per distinct seed color, through the vertices with a corner
+    # within ERROR_MARGIN of it
+    colors = meshops.readColors(meshops.getColorLayers(mesh)["Col"], False)[:,:3].astype(np.float64)
+    loop_vert = meshops.loopVertexIndex(mesh)
+    seeds = meshops.vertexSelection(mesh)
+    offsets, neighbors = meshops.vertexAdjacency(mesh)
+    region = seeds.copy()
+    for color in np.unique(colors[seeds[loop_vert]], axis=0):
+        allowed = np.zeros(len(seeds), dtype=bool)
+        allowed[loop_vert[np.all(np.abs(colors - color) <= ERROR_MARGIN, axis=1)]] = True
+        frontier = list(set(loop_vert[seeds[loop_vert] & np.all(colors == color, axis=1)].tolist()))
+        visited = np.zeros(len(seeds), dtype=bool)
+        visited[frontier] = True
+        while frontier:
+            reached = []
+            for v in frontier:
+                for n in neighbors[offsets[v]:offsets[v + 1]].tolist():
+                    if allowed[n] and not visited[n]:
+                        visited[n] = True
+                        reached.append(n)
+            frontier = reached
+        region |= visited
+    return meshops.writeVertexSelection(mesh, region)
+
+def largePalette(palette):
+    # The mesh colors plus random extra ones, like a palette extracted from a detailed mesh
+    extra = byteColors(np.random.default_rng(1), LARGE_PALETTE - len(palette))
+    return np.concatenate((palette, extra))[:,:3]
+
+def selectLargePalette(mesh, palette):
+    meshops.selectByColors(mesh, largePalette(palette), ERROR_MARGIN)
+
+def warm(setup, fn):
+    # Setup that also runs fn once, so the timed run finds meshops' cache filled
+    def run(mesh, palette):
+        if setup: setup(mesh, palette)
+        fn(mesh, palette)
+    return run
+
+GRADIENT_LINE = ((200, 150), (1700, 900))
+
+def gradientCase(name, circular, hue):
+    args = GRADIENT_LINE + ((1, 0, 0), (0, 1, 0), circular, hue)
+    return Case(name,
+        lambda mesh, palette: meshops.paintGradient(mesh, PERSPECTIVE_MATRIX, REGION_SIZE, *args),
+        lambda mesh, palette: legacy.paintVerts(mesh, projectVertex, *args),
+        setup=useMasks, tolerance=1)
+
+def gradientPreviewCase():
+    # One preview update during a drag, the projection and base colors are already set up
+    previews = {}
+    def setup(mesh, palette):
+        useMasks(mesh, palette)
+        previews[id(mesh)] = meshops.gradientPreview(mesh)
+        meshops.projectPreview(mesh, previews[id(mesh)], PERSPECTIVE_MATRIX, REGION_SIZE)
+    def run(mesh, palette):
+        meshops.applyGradient(mesh, previews.pop(id(mesh)), *GRADIENT_LINE, (1, 0, 0), (0, 1, 0))
+    return Case("gradient:preview", run, setup=setup)
+
+def allCases():
+    cases = [blendCase(mode) for mode, name, description in blending_modes if mode]
+    cases += [byteBlendCase(mode) for mode in core.BYTE_LUT_MODES]
+    for ch, label in enumerate('RGBA'):
+        cases += isolateCases(ch, label)
+    cases += [
+        Case("paint",
+            lambda mesh, palette: meshops.paintChannel(mesh, BRUSH_COLOR, "", False),
+            lambda mesh, palette: legacy.paintChannel(mesh, BRUSH_COLOR, "", False),
+            setup=useMasks),
+        # Second fill on the same selection, the corner mask comes from the cache
+        Case("paint:repeat",
+            lambda mesh, palette: meshops.paintChannel(mesh, BRUSH_COLOR, "", False),
+            setup=warm(useMasks, lambda mesh, palette: meshops.paintChannel(mesh, BRUSH_COLOR, "", False))),
+        # VIEW isolate mode, the alpha is written into the base layer and there is nothing to toggle
+        Case("paint:view:A",
+            lambda mesh, palette: meshops.paintChannel(mesh, BRUSH_COLOR, "3", False, base_view=True),
+            setup=useMasks),
+        Case("sample",
+            sample,
+            lambda mesh, palette: legacy.sampleAverageVertex(mesh, False),
+            setup=useMasks, compare=sameAverage),
+        Case("select:brush",
+            selectBrush,
+            lambda mesh, palette: legacy.selectByIsolatedVertexColor(mesh, palette[0,:3].tolist(), ERROR_MARGIN)),
+        Case("select:palette",
+            selectPalette,
+            lambda mesh, palette: legacy.selectByPaletteColor(mesh, palette[:,:3].tolist(), ERROR_MARGIN)),
+        Case("select:palette:%d" % LARGE_PALETTE,
+            selectLargePalette,
+            lambda mesh, palette: legacy.selectByPaletteColor(mesh, largePalette(palette).tolist(), ERROR_MARGIN)),
+        Case("select:region", lambda mesh, palette: meshops.selectRegion(mesh, ERROR_MARGIN), setup=selectFace),
+        Case("select:region:seeds", lambda mesh, palette: meshops.selectRegion(mesh, ERROR_MARGIN), naiveRegions,
+            setup=colorPatches, compare=np.array_equal),
+        Case("sample:cached", sample, setup=warm(useMasks, sample)),
+        Case("select:palette:cached", selectPalette, setup=warm(None, selectPalette)),
+        Case("palette",
+            lambda mesh, palette: meshops.paletteColors(mesh)[0].tolist(),
+            lambda mesh, palette: legacy.paletteVertexColors(mesh),
+            setup=useMasks, compare=sameColorSet),
+        Case("palette:median_cut", lambda mesh, palette: meshops.paletteColors(mesh, 16, 'MEDIAN_CUT')),
+        Case("palette:kmeans", lambda mesh, palette: meshops.paletteColors(mesh, 16, 'KMEANS')),
+        Case("quick_optimize",
+            lambda mesh, palette: meshops.quickOptimize(mesh, QUICK_COLOR),
+            lambda mesh, palette: legacy.quickExportVertexColors(mesh, QUICK_COLOR)),
+        gradientCase("gradient", False, False),
+        gradientCase("gradient:circular", True, False),
+        gradientCase("gradient:hue", False, True),
+        gradientPreviewCase(),
+        Case("transfer",
+            transfer,
+            lambda mesh, palette: legacy.blendChannels(mesh, "Src", "Col", 'MIX', (True, True, True, False), "Factor", 0.75),
+            tolerance=1),
+        # Between two differently placed copies of a plane
+        Case("transfer:matrix", transferMatrix(TRANSFER_MATRIX), bruteTransfer(TRANSFER_MATRIX), setup=scatter),
+        Case("transfer:offset", transferMatrix(OFFSET_MATRIX), bruteTransfer(OFFSET_MATRIX), setup=scatter),
+        # Same object pair again, the corner matching comes from the cache
+        Case("transfer:cached", transfer, setup=warm(None, transfer)),
+        # float32 sums in another order, the results can round to a different byte
+        Case("smooth", lambda mesh, palette: meshops.smoothChannels(mesh, "1", 50), naiveSmooth([1], 50, False),
+            setup=useMasks, tolerance=1),
+        Case("smooth:seams", lambda mesh, palette: meshops.smoothChannels(mesh, "1", 50, seams='COLOR'), naiveSmooth([1], 50, True),
+            setup=useMasks, tolerance=1),
+        Case("occlusion:cavity", lambda mesh, palette: meshops.ambientOcclusion(mesh, 'CAVITY'), setup=useMasks),
+        Case("outline:concave", lambda mesh, palette: meshops.outlineThickness(mesh, 0), setup=useMasks),
+        # Per vertex storage, these touch about a quarter of the elements of the corner layer cases
+        Case("point:store", lambda mesh, palette: meshops.convertDomain(mesh, "Col", 'POINT'), setup=useMasks),
+        Case("point:paint", lambda mesh, palette: meshops.paintChannel(mesh, BRUSH_COLOR, "", False), setup=usePoints),
+        Case("point:select:palette", selectPalette, setup=usePoints),
+        Case("point:gradient",
+            lambda mesh, palette: meshops.paintGradient(mesh, PERSPECTIVE_MATRIX, REGION_SIZE, *GRADIENT_LINE, (1, 0, 0), (0, 1, 0)),
+            setup=usePoints),
+    ]
+    return cases
@@ -0,0 +1,363 @@
+# Behavior checks for the operators that have no original code to compare with: each runs on a
+# small mesh with a known result and returns an error message, None when the result is right.
+# run.py runs them with --parity.
+
+import os
+import tempfile
+import types
+
+import numpy as np
+
+from LEOAlphaPaint import core, history, meshops, migoto, profiling, snapshots
+from LEOAlphaPaint.standin import StandInMesh
+
+from .cases import BRUSH_COLOR, QUICK_COLOR, scatter
+from .meshgen import gridMesh
+
+HISTORY_LIMIT = 1 << 30
+
+def colorBytes(mesh, name):
+    return core.toBytes(meshops.readColors(meshops.getColorLayers(mesh)[name], False))
+
+def differs(name, new, expected):
+    # Error message when the byte colors differ
+    if new.shape != expected.shape: return "%s has shape %s instead of %s" % (name, new.shape, expected.shape)
+    wrong = np.flatnonzero((new != expected).any(axis=-1) if new.ndim > 1 else new != expected)
+    if not len(wrong): return None
+    return "%s differs at %d elements, first %d: %s != %s" % (name, len(wrong), wrong[0], new[wrong[0]].tolist(), expected[wrong[0]].tolist())
+
+def isolateUndo():
+    # Undo Color while the alpha is isolated undoes the fill before it, un-isolating then leaves
+    # the base layer as it was before the fill
+    mesh, palette = gridMesh(2000)
+    expected = colorBytes(mesh, "Col")
+    history.clear()
+    try:
+        with history.step("Fill", HISTORY_LIMIT):
+            meshops.paintChannel(mesh, BRUSH_COLOR, "", True)
+        with history.step("A", HISTORY_LIMIT):
+            meshops.isolateChannel(mesh, 3, False)
+        meshops.applyHistory(*history.undo())
+        with history.step("A", HISTORY_LIMIT):
+            meshops.isolateChannel(mesh, 3, False)
+    finally:
+        history.clear()
+    if meshops.layerNames(mesh) != ("Col", "Src", "Factor"): return "layers left: %s" % (meshops.layerNames(mesh),)
+    return differs("Col", colorBytes(mesh, "Col"), expected)
+
+def historyTrim():
+    # The running size stays the sum of the kept steps through redo clearing and trimming, the
+    # oldest steps go first and the newest is kept even over the limit
+    mesh, palette = gridMesh(2000)
+    history.clear()
+    try:
+        for i in range(4):
+            with history.step("Fill %d" % i, HISTORY_LIMIT):
+                meshops.paintChannel(mesh, (i/8, 0.5, 1 - i/8), "", True)
+        history.undo()
+        with history.step("Fill 4", HISTORY_LIMIT):
+            meshops.paintChannel(mesh, (1, 1, 1), "", True)
+        steps = history.undoSteps + history.redoSteps
+        if history.size() != sum(map(history.stepSize, steps)): return "size %d with %d steps" % (history.size(), len(steps))
+        history.trim(history.stepSize(history.undoSteps[-1]) + 1)
+        labels = [step['label'] for step in history.undoSteps + history.redoSteps]
+        if labels != ["Fill 4"]: return "kept %s after trimming" % labels
+        if history.size() != history.stepSize(history.undoSteps[-1]): return "size %d after trimming" % history.size()
+        history.trim(0)
+        if len(history.undoSteps) != 1: return "the newest step was trimmed"
+    finally:
+        history.clear()
+    if history.size(): return "size %d after clearing" % history.size()
+    return None
+
+def snapshotToggle():
+    # Toggling A/B after painting brings back the exact colors of each snapshot, also on a per
+    # vertex layer, and a per vertex snapshot restored into a per corner layer spreads to its corners
+    for domain in ('CORNER', 'POINT'):
+        mesh, palette = gridMesh(2000)
+        meshops.convertDomain(mesh, "Col", domain)
+        expected = {"A": colorBytes(mesh, "Col")}
+        snapshots.take(mesh, "A")
+        meshops.paintChannel(mesh, BRUSH_COLOR, "", True)
+        expected["B"] = colorBytes(mesh, "Col")
+        snapshots.take(mesh, "B")
+        meshops.paintChannel(mesh, (1, 1, 1), "", True)
+        for shown in ("A", "B", "A"):
+            name = snapshots.toggle(mesh, "A", "B")
+            if name != shown: return "toggle showed %s instead of %s" % (name, shown)
+            error = differs("%s Col after toggling to %s" % (domain, name), colorBytes(mesh, "Col"), expected[name])
+            if error: return error
+    meshops.convertDomain(mesh, "Col", 'CORNER')
+    snapshots.restore(mesh, "B")
+    return differs("POINT snapshot B in a CORNER layer", colorBytes(mesh, "Col"), expected["B"][meshops.loopVertexIndex(mesh)])
+
+def profilingRecords():
+    # Nothing is recorded unless profiling is enabled. A measured fill gets one record with the
+    # mesh's size and phases that add up to its total, a nested measure adds none, and the
+    # records stop growing at their cap with the oldest dropped first
+    mesh, palette = gridMesh(2000)
+    enabled = profiling.enabled
+    profiling.clear()
+    try:
+        profiling.enabled = False
+        with profiling.measure("Off", mesh):
+            meshops.paintChannel(mesh, BRUSH_COLOR, "", True)
+        if profiling.records: return "%d records while profiling is off" % len(profiling.records)
+
+        profiling.enabled = True
+        with profiling.measure("Fill", mesh):
+            with profiling.measure("Nested", mesh):
+                meshops.paintChannel(mesh, BRUSH_COLOR, "", True)
+        if [record['operator'] for record in profiling.records] != ["Fill"]:
+            return "records %s for a nested measure" % [record['operator'] for record in profiling.records]
+        record = profiling.records[0]
+        if (record['vertices'], record['corners']) != (len(mesh.vertices), len(mesh.loops)):
+            return "size %d/%d instead of %d/%d" % (record['vertices'], record['corners'], len(mesh.vertices), len(mesh.loops))
+        if min(record[name] for name in profiling.phases) < 0 or record['write'] <= 0:
+            return "phases %s" % {name: record[name] for name in profiling.phases}
+        if abs(sum(record[name] for name in profiling.phases) - record['total']) > 1e-9:
+            return "phases add up to %g instead of %g" % (sum(record[name] for name in profiling.phases), record['total'])
+
+        cap = profiling.records.maxlen
+        if cap is None: return "the records have no cap"
+        for i in range(cap + 10):
+            with profiling.measure("Step %d" % i): pass
+        if len(profiling.records) != cap: return "%d records, the cap is %d" % (len(profiling.records), cap)
+        if profiling.records[0]['operator'] != "Step 10": return "oldest record is %s" % profiling.records[0]['operator']
+    finally:
+        profiling.enabled = enabled
+        profiling.clear()
+    return None
+
+def sharedMeshes():
+    # Two objects sharing a mesh get it optimized once: a second pass without deleting the old
+    # layers would keep the first COLOR as COLOR.001. Objects in edit mode are left out
+    shared, palette = gridMesh(2000)
+    other, palette = gridMesh(2000)
+    edited, palette = gridMesh(2000)
+    objects = [types.SimpleNamespace(type='MESH', mode='OBJECT', data=shared),
+        types.SimpleNamespace(type='MESH', mode='VERTEX_PAINT', data=other),
+        types.SimpleNamespace(type='MESH', mode='OBJECT', data=shared),
+        types.SimpleNamespace(type='MESH', mode='EDIT', data=edited),
+        None]
+    meshes = meshops.objectMeshes(objects)
+    if len(meshes) != 2 or meshes[0] is not shared or meshes[1] is not other:
+        return "%d meshes for 2 objects sharing one mesh and one with its own" % len(meshes)
+    meshops.quickOptimizeMeshes(meshes, QUICK_COLOR, False)
+    for name, mesh in (("shared", shared), ("other", other)):
+        if meshops.layerNames(mesh) != ("Col", "Src", "Factor", "COLOR"): return "%s mesh has layers %s" % (name, meshops.layerNames(mesh))
+        error = differs("COLOR of the %s mesh" % name, colorBytes(mesh, "COLOR"), np.tile(core.toBytes(np.array([QUICK_COLOR])), (len(mesh.loops), 1)))
+        if error: return error
+    if "COLOR" in meshops.layerNames(edited): return "the mesh in edit mode was optimized"
+    return None
+
+def fanMesh(height):
+    # Four triangles around a center vertex, the ring 45 degrees above (height 1, a pit) or below
+    # it (-1, a peak), with a white "Col" layer
+    co = [(0, 0, 0), (1, 0, height), (0, 1, height), (-1, 0, height), (0, -1, height)]
+    mesh = StandInMesh(co, [(0, 1, 2), (0, 2, 3), (0, 3, 4), (0, 4, 1)])
+    mesh.vertex_colors.new(name="Col")
+    return mesh
+
+def cavityOcclusion():
+    # The neighbors of the center of the pit rise 45 degrees, half the way to straight up, so it is
+    # half occluded. The tip of the peak and a plane aren't occluded at all
+    for height, expected in ((1, 128), (-1, 255)):
+        mesh = fanMesh(height)
+        meshops.ambientOcclusion(mesh, 'CAVITY')
+        red = colorBytes(mesh, "Col")[meshops.loopVertexIndex(mesh) == 0,0]
+        if not (red == expected).all(): return "R of the center is %s instead of %d" % (red.tolist(), expected)
+    mesh, palette = gridMesh(2000)
+    scatter(mesh, palette)
+    meshops.ambientOcclusion(mesh, 'CAVITY')
+    if not (colorBytes(mesh, "Col")[:,0] == 255).all(): return "a plane is occluded"
+    return None
+
+def hemisphereRays():
+    # Unit rays on the normal's side, cosine weighted: their mean lies along the normal at 2/3 of its length
+    normals = np.random.default_rng(3).normal(size=(500, 3))
+    normals = np.concatenate(([(0, 0, 1), (0, 0, -1), (1, 0, 0)], normals/np.sqrt((normals**2).sum(axis=1))[:,None]))
+    rays = core.hemisphereRays(normals, core.hemisphereDirections(256), np.arange(len(normals)))
+    length = np.sqrt((rays**2).sum(axis=2))
+    if np.abs(length - 1).max() > 1e-6: return "rays are %g to %g long" % (length.min(), length.max())
+    if ((rays*normals[:,None]).sum(axis=2) <= 0).any(): return "rays point below the surface"
+    error = np.abs(rays.mean(axis=1) - normals*2/3).max()
+    if error > 0.01: return "mean ray is %g away from 2/3 of the normal" % error
+    if meshops.raySamples(1000, 16) != 16 or meshops.raySamples(10*meshops.RAY_BUDGET, 16) != 1 or \
+            meshops.raySamples(meshops.RAY_BUDGET//4, 16) != 4:
+        return "rays per vertex don't follow the ray budget"
+    return None
+
+def bendMesh(degrees):
+    # A floor quad and a second quad on the other side of their shared edge along y, bent up by
+    # degrees (concave, like the inside of a box) or down for negative degrees (convex, like a cube's
+    # edge), with a white "Col" layer
+    c, s = np.cos(np.radians(degrees)), np.sin(np.radians(degrees))
+    co = [(0, 0, 0), (1, 0, 0), (1, 1, 0), (0, 1, 0), (-c, 1, s), (-c, 0, s)]
+    mesh = StandInMesh(co, [(0, 1, 2, 3), (0, 3, 4, 5)])
+    mesh.vertex_colors.new(name="Col")
+    return mesh
+
+def outlineConcave():
+    # The shared edge's vertices go to 0.106 from a 60 degree bend on, halfway to 0.502 at 30 degrees,
+    # everything else stays at 0.502
+    for degrees, edge in ((90, 27), (30, 78), (0, 128), (-90, 128)):
+        mesh = bendMesh(degrees)
+        meshops.outlineThickness(mesh, 0, np.pi/3)
+        alpha = colorBytes(mesh, "Col")[:,3]
+        expected = np.where(np.isin(meshops.loopVertexIndex(mesh), (0, 3)), edge, 128)
+        error = differs("A at a %d degree bend" % degrees, alpha, expected)
+        if error: return error
+    return None
+
+# A buffer with COLOR between two other elements, 20 bytes per vertex
+STRIDED_FORMAT = """stride: 20
+topology: trianglelist
+element[0]:
+  SemanticName: TEXCOORD
+  SemanticIndex: 0
+  Format: R32G32_FLOAT
+  InputSlot: 0
+  AlignedByteOffset: 0
+element[1]:
+  SemanticName: COLOR
+  SemanticIndex: 0
+  Format: R8G8B8A8_UNORM
+  InputSlot: 0
+  AlignedByteOffset: 8
+element[2]:
+  SemanticName: TEXCOORD
+  SemanticIndex: 1
+  Format: R32_FLOAT
+  InputSlot: 0
+  AlignedByteOffset: 12
+"""
+
+def migotoRoundTrip():
+    # Per corner COLOR written into the column of a strided buffer comes back exactly and leaves the
+    # other bytes of the buffer alone, without its .fmt the buffer is left alone completely. A COLOR
+    # only buffer and its .fmt come back the same way
+    mesh, palette = gridMesh(2000)
+    expected = colorBytes(mesh, "Src")
+    with tempfile.TemporaryDirectory() as folder:
+        buf_path, fmt_path = os.path.join(folder, "strided.buf"), os.path.join(folder, "strided.fmt")
+        with open(fmt_path, 'w') as f:
+            f.write(STRIDED_FORMAT)
+        before = np.random.default_rng(4).integers(0, 256, size=(len(expected), 20), dtype=np.uint8)
+        before.tofile(buf_path)
+        migoto.exportColors(mesh, "Src", buf_path, fmt_path, domain='CORNER')
+        after = np.fromfile(buf_path, dtype=np.uint8).reshape(-1, 20)
+        error = differs("The other bytes of the buffer", np.delete(after, np.s_[8:12], axis=1), np.delete(before, np.s_[8:12], axis=1))
+        if error: return error
+        error = differs("The COLOR column", after[:,8:12], expected)
+        if error: return error
+        migoto.importColors(mesh, buf_path, fmt_path, "Strided")
+        error = differs("COLOR read back from the strided buffer", colorBytes(mesh, "Strided"), expected)
+        if error: return error
+
+        # The same buffer without a .fmt next to it isn't replaced
+        buf_path, fmt_path = os.path.join(folder, "texcoord.buf"), os.path.join(folder, "texcoord.fmt")
+        before.tofile(buf_path)
+        try:
+            migoto.exportColors(mesh, "Src", buf_path, fmt_path, domain='CORNER')
+            return "a buffer without its .fmt was replaced"
+        except ValueError:
+            pass
+        if os.path.exists(fmt_path): return "a .fmt was written for a buffer that wasn't replaced"
+        error = differs("The buffer without its .fmt", np.fromfile(buf_path, dtype=np.uint8).reshape(-1, 20), before)
+        if error: return error
+
+        buf_path, fmt_path = os.path.join(folder, "color.buf"), os.path.join(folder, "color.fmt")
+        migoto.exportColors(mesh, "Src", buf_path, fmt_path, domain='CORNER')
+        if migoto.colorLayout(migoto.readFormat(fmt_path)) != (4, 0): return "the written .fmt isn't a COLOR only buffer"
+        migoto.importColors(mesh, buf_path, fmt_path, "Packed")
+        return differs("COLOR read back from the COLOR only buffer", colorBytes(mesh, "Packed"), expected)
+
+def validation():
+    # The grid has three layers but no COLOR. The second mesh has a float COLOR with known faults and
+    # a leftover isolation layer, the third one is ready for export
+    missing, palette = gridMesh(2000)
+    faulty, palette = gridMesh(2000)
+    colors = np.full((len(faulty.loops), 4), 128/255, dtype=np.float32)
+    colors[:3,3] = 1
+    colors[10:12,0] = 1.5
+    colors[20,1] = -0.25
+    colors[30,2] = np.nan
+    colors[40:44,0] = 0.5
+    meshops.writeColors(meshops.newColorLayer(faulty, "COLOR", data_type='FLOAT_COLOR'), colors)
+    for name in ("Col", "Src", "Factor"):
+        meshops.removeColorLayer(faulty, name)
+    meshops.newColorLayer(faulty, "COLOR" + meshops.keyName + "3")
+    ready, palette = gridMesh(2000)
+    meshops.quickOptimize(ready, (1, 0.502, 0.502, 0.502))
+
+    missing, faulty, ready = meshops.validateMeshes([missing, faulty, ready])
+    if missing['problems'] != ["no COLOR layer", "3 other color layers: Col, Src, Factor"]: return "no COLOR: %s" % missing['problems']
+    counts = {key: faulty.get(key) for key in ('alpha_one', 'off_grid', 'out_of_range')}
+    if counts != {'alpha_one': 3/len(colors), 'off_grid': 8, 'out_of_range': 4}: return "faulty COLOR: %s" % counts
+    if len(faulty['problems']) != 4 or "isolation layers left over" not in faulty['problems'][0]:
+        return "faulty COLOR: %s" % faulty['problems']
+    if ready['problems']: return "optimized COLOR: %s" % ready['problems']
+    return None
+
+def regionSeeds():
+    # A strip of quads whose columns are red, red, blue, blue, green and blue, the first and the last
+    # column selected. The red seed's region stops at the blue columns, the blue seed's at the green
+    # one, for corner and per vertex layers
+    columns = np.array([(1, 0, 0), (1, 0, 0), (0, 0, 1), (0, 0, 1), (0, 1, 0), (0, 0, 1)], dtype=np.float32)
+    co = [(x, y, 0) for x in range(len(columns)) for y in (0, 1)]
+    mesh = StandInMesh(co, [(2*x, 2*x + 2, 2*x + 3, 2*x + 1) for x in range(len(columns) - 1)])
+    colors = np.ones((len(mesh.loops), 4), dtype=np.float32)
+    colors[:,:3] = columns[meshops.loopVertexIndex(mesh)//2]
+    meshops.writeColors(mesh.vertex_colors.new(name="Col"), colors)
+    seeds = np.isin(np.arange(len(co))//2, (0, 5))
+    expected = np.isin(np.arange(len(co))//2, (0, 1, 5))
+    for domain in ('CORNER', 'POINT'):
+        if domain == 'POINT': meshops.convertDomain(mesh, "Col", 'POINT')
+        mesh.vertices.foreach_set("select", seeds)
+        meshops.meshcache.discard(mesh, "vert_select")
+        error = differs("Region selection of a %s layer" % domain, meshops.selectRegion(mesh, 0.01), expected)
+        if error: return error
+    return None
+
+def viewIsolation():
+    # Select and sample in the VIEW isolate mode see the same colors as on the LAYER mode's view
+    # layer, a blend changes the same channels: un-isolated the base layers end up the same
+    for clicks, src_ch in (((1,), (True, True, True, False)), ((0, 2), (True, False, True, False)), ((3,), (False, True, False, False))):
+        layer_mesh, palette = gridMesh(2000)
+        view_mesh, palette = gridMesh(2000)
+        for ch in clicks:
+            isolated = meshops.isolateChannel(layer_mesh, ch, False)
+        view_name = meshops.activeLayerName(layer_mesh)
+        target = meshops.readColors(meshops.getColorLayers(layer_mesh)[view_name], False)[:1,:3]
+        error = differs("Selection of %s" % isolated, meshops.selectByColors(view_mesh, target, 0.01, isolated=isolated, base_view=True),
+            meshops.selectByColors(layer_mesh, target, 0.01))
+        if error: return error
+        layer_average = meshops.sampleAverage(layer_mesh, False)
+        view_average = meshops.sampleAverage(view_mesh, False, isolated, True)
+        if np.abs(layer_average - view_average).max() > 1e-6:
+            return "average of %s is %s instead of %s" % (isolated, view_average.tolist(), layer_average.tolist())
+
+        meshops.blendChannels(layer_mesh, "Src", view_name, 'MIX', src_ch, "Factor", 0.75)
+        meshops.blendChannels(view_mesh, "Src", "Col", 'MIX', src_ch, "Factor", 0.75, isolated=isolated, base_view=True)
+        for ch in clicks[::-1]:
+            meshops.isolateChannel(layer_mesh, ch, False)
+        error = differs("Col after a blend into %s" % isolated, colorBytes(view_mesh, "Col"), colorBytes(layer_mesh, "Col"))
+        if error: return error
+    return None
+
+def allChecks():
+    return [
+        ("isolate:view", viewIsolation),
+        ("select:region_seeds", regionSeeds),
+        ("history:isolate_undo", isolateUndo),
+        ("history:trim", historyTrim),
+        ("snapshot:toggle", snapshotToggle),
+        ("profiling:records", profilingRecords),
+        ("quick_optimize:shared", sharedMeshes),
+        ("occlusion:cavity", cavityOcclusion),
+        ("occlusion:hemisphere", hemisphereRays),
+        ("outline:concave", outlineConcave),
+        ("migoto:round_trip", migotoRoundTrip),
+        ("validate", validation),
+    ]
@@ -0,0 +1,775 @@
+# Reference copies of the original per-loop operator code (pre-NumPy), run against a small
+# pure-Python emulation of the BMesh API so the benchmark can time the old implementation
+# and check the new one for parity without Blender. Byte color layers are emulated like
+# BMesh does it: every channel write is stored as a byte and read back as byte/255.
+
+from math import fmod
+
+import numpy as np
+
+from LEOAlphaPaint.meshops import keyName, findActiveColorLayer, trySetActiveVC, loopVertexIndex, \
+    loopFaceIndex, vertexSelection, faceSelection, readColors, writeColors
+
+FL = [0,1,2]
+
+_MAX = float(np.float32(1) - np.float32(0.5)/np.float32(255))
+_UNPACK = [float(np.float32(b)/np.float32(255)) for b in range(256)]
+
+def _pack(f):
+    # unit_float_to_uchar_clamp in single precision
+    f = np.float32(f)
+    if f <= 0: return 0
+    if f > _MAX: return 255
+    return int(np.float32(255)*f + np.float32(0.5))
+
+class Color:
+    # Enough of mathutils.Color for the old code paths, using the same rgb/hsv formulas
+    def __init__(self, rgb=(0, 0, 0)):
+        self._rgb = [float(x) for x in rgb]
+
+    def _hsv(self):
+        r, g, b = self._rgb
+        k = 0.0
+        if g < b: g, b = b, g; k = -1.0
+        min_gb = b
+        if r < g: r, g = g, r; k = -2.0/6.0 - k; min_gb = min(g, b)
+        chroma = r - min_gb
+        return [abs(k + (g - b)/(6.0*chroma + 1e-20)), chroma/(r + 1e-20), r]
+
+    def _setHsv(self, i, value):
+        hsv = self._hsv()
+        hsv[i] = value
+        h, s, v = hsv
+        nr = min(max(abs(h*6.0 - 3.0) - 1.0, 0.0), 1.0)
+        ng = min(max(2.0 - abs(h*6.0 - 2.0), 0.0), 1.0)
+        nb = min(max(2.0 - abs(h*6.0 - 4.0), 0.0), 1.0)
+        self._rgb = [((nr - 1.0)*s + 1.0)*v, ((ng - 1.0)*s + 1.0)*v, ((nb - 1.0)*s + 1.0)*v]
+
+    h = property(lambda self: self._hsv()[0], lambda self, x: self._setHsv(0, x))
+    s = property(lambda self: self._hsv()[1], lambda self, x: self._setHsv(1, x))
+    v = property(lambda self: self._hsv()[2], lambda self, x: self._setHsv(2, x))
+    r = property(lambda self: self._rgb[0], lambda self, x: self._rgb.__setitem__(0, float(x)))
+    g = property(lambda self: self._rgb[1], lambda self, x: self._rgb.__setitem__(1, float(x)))
+    b = property(lambda self: self._rgb[2], lambda self, x: self._rgb.__setitem__(2, float(x)))
+
+    def __getitem__(self, i):
+        return self._rgb[i]
+
+    def __len__(self):
+        return 3
+
+class LegacyLoopColor:
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, i):
+        if isinstance(i, slice): return [_UNPACK[x] for x in self._data[i]]
+        return _UNPACK[self._data[i]]
+
+    def __setitem__(self, i, value):
+        if isinstance(i, slice): self._data[i] = [_pack(x) for x in value]
+        else: self._data[i] = _pack(value)
+
+    def __len__(self):
+        return 4
+
+class LegacyLayer:
+    def __init__(self, name, count):
+        self.name = name
+        self.data = [[255, 255, 255, 255] for _ in range(count)]
+
+    def copy_from(self, other):
+        self.data = [x[:] for x in other.data]
+
+class LegacyLayers:
+    def __init__(self, count):
+        self._count = count
+        self._layers = {}
+        self.active = None
+
+    def new(self, name="Col"):
+        base, i = name, 0
+        while name in self._layers:
+            i += 1
+            name = "%s.%03d" % (base, i)
+        layer = LegacyLayer(name, self._count)
+        self._layers[name] = layer
+        return layer
+
+    def remove(self, layer):
+        del self._layers[layer.name]
+
+    def keys(self):
+        return list(self._layers)
+
+    def __getitem__(self, name):
+        return self._layers[name]
+
+class LegacyFace:
+    def __init__(self, select):
+        self.select = select
+
+class LegacyLoop:
+    def __init__(self, index, face):
+        self.index = index
+        self.face = face
+
+    def __getitem__(self, layer):
+        return LegacyLoopColor(layer.data[self.index])
+
+    def __setitem__(self, layer, value):
+        layer.data[self.index][:] = [_pack(x) for x in value]
+
+class LegacyVert:
+    def __init__(self, co, select):
+        self.co = co
+        self.select = select
+        self.link_loops = []
+
+    def select_set(self, select):
+        self.select = select
+
+class LegacyBMesh:
+    def from_mesh(self, mesh):
+        loop_vert = loopVertexIndex(mesh)
+        co = np.empty(len(mesh.vertices)*3, dtype=np.float32)
+        mesh.vertices.foreach_get("co", co)
+        faces = [LegacyFace(x) for x in faceSelection(mesh).tolist()]
+        self.verts = [LegacyVert(tuple(c), s) for c, s in zip(co.reshape(-1, 3).tolist(), vertexSelection(mesh).tolist())]
+        for i, (v, f) in enumerate(zip(loop_vert.tolist(), loopFaceIndex(mesh).tolist())):
+            self.verts[v].link_loops.append(LegacyLoop(i, faces[f]))
+
+        color_data = LegacyLayers(len(loop_vert))
+        for layer in mesh.vertex_colors:
+            colors = np.clip(np.floor(readColors(layer)*np.float32(255) + np.float32(0.5)), 0, 255).astype(int)
+            color_data.new(layer.name).data = colors.tolist()
+        if mesh.vertex_colors.active is not None:
+            color_data.active = color_data[mesh.vertex_colors.active.name]
+        self.color_data = color_data
+
+    def to_mesh(self, mesh):
+        active = mesh.vertex_colors.active.name if mesh.vertex_colors.active is not None else None
+        for layer in list(mesh.vertex_colors):
+            mesh.vertex_colors.remove(layer)
+        for name in self.color_data.keys():
+            layer = mesh.vertex_colors.new(name=name, do_init=False)
+            writeColors(layer, np.array(self.color_data[name].data, dtype=np.float32)/np.float32(255))
+        trySetActiveVC(mesh, active)
+        mesh.vertices.foreach_set("select", np.array([v.select for v in self.verts], dtype=bool))
+
+    def free(self):
+        pass
+
+def newBMesh(mesh):
+    bm = LegacyBMesh()
+    bm.from_mesh(mesh)
+    return bm
+
+def refreshMesh(bm, obj):
+    bm.to_mesh(obj)
+    bm.free()
+    obj.update()
+
+def clamp01(inp):
+    return max(0, min(inp, 1))
+
+def blendChannels(mesh, src_vcol, dst_vcol, blend_mode, src_ch, factor_vcol='NONE', factor_slider=1.0):
+    bm = newBMesh(mesh)
+    color_data = bm.color_data
+    obj = mesh
+
+    factor = factor_vcol
+    dstname = dst_vcol
+    dst = color_data[dstname]
+    src = color_data[src_vcol]
+
+    src_ch = [i for i, x in enumerate(src_ch) if x]
+    if not src_ch: src_ch = [0,1,2]
+
+    isolated = dstname.split(keyName)[1] if keyName in dstname else ""
+    isolated_channels = [int(x) for x in isolated if x]
+    alpha_mode = bool(3 in isolated_channels)
+    if not isolated_channels or alpha_mode: isolated_channels = [0,1,2]
+
+    if blend_mode == 'ALPHAOVER':
+        src_ch = [x for x in src_ch if x!=3]
+        isolated_channels = [x for x in isolated_channels if x!=3]
+
+    src_count = len(src_ch)
+    iso_count = len(isolated_channels)
+
+    referenceColor = color_data.new()
+    referenceColor.copy_from(src)
+
+    if src_count == 1 or iso_count==1 or alpha_mode:
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for x in isolated_channels:
+                    loop[referenceColor][x] = 0
+                    for c in src_ch:
+                        loop[referenceColor][x] += loop[src][c]/src_count
+
+    elif set(src_ch) == set(isolated_channels):
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in src_ch:
+                    loop[referenceColor][c] = loop[src][c]
+    else:
+        return None
+
+    if blend_mode == 'MIX':
+        pass
+    elif blend_mode == 'ALPHAOVER':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    a = loop[referenceColor][3]
+                    loop[referenceColor][c] = loop[referenceColor][c]*a + (1-a)*loop[dst][c]
+    elif blend_mode == 'PAINTMIX':
+         for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                dstCol = Color(loop[dst][:3])
+                refCol = Color(loop[referenceColor][:3])
+                referenceColorConv = Color([
+                                            clamp01(clamp01(dstCol[0]*(1-.25*refCol[2])*(1-.25*refCol[1]))+\
+                                            clamp01(refCol[0]*(1-.25*dstCol[2])*(1-.25*dstCol[1]))),\
+
+                                            clamp01(clamp01(dstCol[1]*(1-.7*refCol[0]))+\
+                                            clamp01(refCol[1]*(1-.3*dstCol[0]))),\
+
+                                            clamp01(clamp01(dstCol[2]*(1-.3*refCol[1]))+\
+                                            clamp01(refCol[2]*(1-.7*dstCol[1])))
+                                            ])
+                loop[referenceColor][:3] = referenceColorConv[:3]
+
+    elif blend_mode == 'ADD':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    loop[referenceColor][c] = clamp01(loop[dst][c]+loop[referenceColor][c])
+    elif blend_mode == 'LIGHTEN':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    loop[referenceColor][c] = max(loop[dst][c],loop[referenceColor][c])
+    elif blend_mode == 'COLORDODGE':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    loop[referenceColor][c] = 1 if 1-loop[referenceColor][c]==0 else clamp01(loop[dst][c]/(1-loop[referenceColor][c]))
+    elif blend_mode == 'SCREEN':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    loop[referenceColor][c] = clamp01(1-(1-loop[referenceColor][c])*(1-loop[dst][c]))
+
+    elif blend_mode == 'DARKEN':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    loop[referenceColor][c] = min(loop[referenceColor][c],loop[dst][c])
+    elif blend_mode == 'MUL':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    loop[referenceColor][c] *= loop[dst][c]
+    elif blend_mode == 'LINEARBURN':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    loop[referenceColor][c] = clamp01(loop[referenceColor][c]+loop[dst][c]-1)
+    elif blend_mode == 'COLORBURN':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    loop[referenceColor][c] = 0 if loop[referenceColor][c]==0 else clamp01(1-(1-loop[dst][c])/loop[referenceColor][c])
+
+    elif blend_mode == 'SUB':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    loop[referenceColor][c] = clamp01(loop[dst][c]-loop[referenceColor][c])
+    elif blend_mode == 'DIV':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    loop[referenceColor][c] = 1 if loop[referenceColor][c]==0 else clamp01(loop[dst][c]/loop[referenceColor][c])
+
+    elif blend_mode == 'OVERLAY':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    if loop[referenceColor][c] < 0.5:
+                        loop[referenceColor][c] = clamp01(loop[dst][c]*2*loop[referenceColor][c])
+                    else:
+                        loop[referenceColor][c] = clamp01(1-2*(1-loop[referenceColor][c])*(1-loop[dst][c]))
+    elif blend_mode == 'HARDLIGHT':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    if loop[dst][c] < 0.5:
+                        loop[referenceColor][c] = clamp01(loop[dst][c]*2*loop[referenceColor][c])
+                    else:
+                        loop[referenceColor][c] = clamp01(1-2*(1-loop[referenceColor][c])*(1-loop[dst][c]))
+    elif blend_mode == 'SOFTLIGHT':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    loop[referenceColor][c] = clamp01((1-2*loop[dst][c])*loop[referenceColor][c]**2 + 2*loop[dst][c]*loop[referenceColor][c])
+
+    elif blend_mode == 'HUE':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                dstCol = Color(loop[dst][:3])
+                refCol = Color(loop[referenceColor][:3])
+                dstCol.h = refCol.h
+                loop[referenceColor][:3] = dstCol[:]
+    elif blend_mode == 'SATURATION':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                dstCol = Color(loop[dst][:3])
+                refCol = Color(loop[referenceColor][:3])
+                dstCol.s = refCol.s
+                loop[referenceColor][:3] = dstCol[:]
+    elif blend_mode == 'COLOR':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                dstCol = Color(loop[dst][:3])
+                refCol = Color(loop[referenceColor][:3])
+                dstCol.h = refCol.h
+                dstCol.s = refCol.s
+                loop[referenceColor][:3] = dstCol[:]
+    elif blend_mode == 'VALUE':
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                dstCol = Color(loop[dst][:3])
+                refCol = Color(loop[referenceColor][:3])
+                dstCol.v = refCol.v
+                loop[referenceColor][:3] = dstCol[:]
+
+    if factor != 'NONE':
+        factorvc = color_data[factor]
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    f = loop[factorvc][c]*factor_slider
+                    loop[dst][c] = loop[referenceColor][c]*f + (1-f)*loop[dst][c]
+    else:
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                for c in isolated_channels:
+                    loop[dst][c] = loop[referenceColor][c]*factor_slider + (1-factor_slider)*loop[dst][c]
+
+    color_data.remove(referenceColor)
+    refreshMesh(bm, obj)
+    trySetActiveVC(obj, dstname)
+    return isolated
+
+def sampleAverageVertex(mesh, use_all=True):
+    bm = newBMesh(mesh)
+    obj = mesh
+    color_layer = findActiveColorLayer(bm.color_data, obj)
+
+    if obj.use_paint_mask_vertex:
+        vertex_data = [v for v in bm.verts if v.select]
+    elif use_all:
+        vertex_data = bm.verts
+    else:
+        return None
+
+    face_loops = [0,0,0]
+    i=0
+    for vertex in vertex_data:
+        if obj.use_paint_mask:
+            for loop in vertex.link_loops:
+                if loop.face.select:
+                    face_loops = [face_loops[i]+loop[color_layer][i] for i in FL]
+                    i+=1
+        else:
+            for loop in vertex.link_loops:
+                face_loops = [face_loops[i]+loop[color_layer][i] for i in FL]
+                i+=1
+    if not i: return None
+    return (face_loops[0]/i, face_loops[1]/i, face_loops[2]/i)
+
+def paintChannel(mesh, brushcolor1, isolated, use_all=True):
+    bm = newBMesh(mesh)
+    obj = mesh
+    color_layer = findActiveColorLayer(bm.color_data, obj)
+
+    isolated_channels = [int(x) for x in isolated]
+    if not isolated_channels or any((x==3 for x in isolated_channels)): isolated_channels = FL
+
+    if obj.use_paint_mask_vertex:
+        vertex_data = [v for v in bm.verts if v.select]
+    elif use_all:
+        vertex_data = bm.verts
+    else:
+        return False
+
+    for vertex in vertex_data:
+
+        if obj.use_paint_mask:
+            face_loops = [loop for loop in vertex.link_loops if loop.face.select]
+        else:
+            face_loops = [loop for loop in vertex.link_loops]
+        for loop in face_loops:
+            for x in isolated_channels:
+                loop[color_layer][x] = brushcolor1[x]
+
+    refreshMesh(bm, obj)
+    return True
+
+def isolateChannel(mesh, ch, Mono):
+    subtract_channels = False
+    color_layer = None
+    old_layer_name = None
+    addOld = False
+    channel = str(ch)
+    former_ch = []
+
+    obj = mesh
+    isolated_Channel = ""
+
+    bm = newBMesh(mesh)
+    color_data = bm.color_data
+
+    active_color_layer = findActiveColorLayer(color_data, obj)
+
+    basename = active_color_layer.name
+
+    if keyName in basename:
+        old_ch = basename.split(keyName)[1]
+        former_ch = [int(x) for x in old_ch if x]
+        basename = basename.split(keyName)[0]
+
+        isolated_Channel = old_ch
+
+        try: color_layer = color_data[basename]
+        except:
+            color_layer = color_data.new(basename)
+            color_layer.copy_from(active_color_layer)
+
+        if ch in former_ch:
+            subtract_channels = True
+            isolated_Channel = old_ch
+        else:
+            old_layer = active_color_layer
+            if not Mono: active_color_layer = color_data.new(basename+keyName+old_ch+channel)
+            else: active_color_layer = color_data.new(basename+keyName+channel)
+            addOld = True
+
+    else:
+        old_layer = active_color_layer
+        concisoname = basename+keyName
+        old_layer_name = next((x for x in color_data.keys() if concisoname in x), False)
+
+        if old_layer_name:
+            old_ch = old_layer_name.split(keyName)[1]
+            former_ch = [int(x) for x in old_ch if x]
+            old_layer = color_data[old_layer_name]
+
+            isolated_Channel = old_ch
+
+            try: color_layer = color_data[basename]
+            except:
+                color_layer = color_data.new(basename)
+                color_layer.copy_from(active_color_layer)
+
+            if ch in former_ch:
+                subtract_channels = True
+                isolated_Channel = old_ch
+            else:
+                if not Mono: active_color_layer = color_data.new(concisoname+old_ch+channel)
+                else: active_color_layer = color_data.new(concisoname+channel)
+                addOld = True
+
+        else:
+            color_layer = color_data[basename]
+            active_color_layer = color_data.new(concisoname+channel)
+
+    if subtract_channels:
+        isolated_Channel = isolated_Channel.replace(channel,"")
+        isolated_channels = [int(x) for x in isolated_Channel]
+
+        if 3 in isolated_channels and not ch==3:
+            if not old_layer_name: prev_layer = active_color_layer
+            else: prev_layer = old_layer
+            new_active_name = basename+keyName+isolated_Channel
+            active_color_layer = color_data.new(new_active_name)
+            for vertex in bm.verts:
+                for loop in vertex.link_loops:
+                    a = Color(loop[prev_layer][:3]).v
+                    loop[active_color_layer][:3] = [a,a,a]
+            if not old_layer_name: color_data.remove(prev_layer)
+            else: color_data.remove(old_layer)
+
+        elif ch==3 and not isolated_channels:
+            isolated_Channel = ""
+            if not old_layer_name:
+                for vertex in bm.verts:
+                    for loop in vertex.link_loops:
+                        loop[color_layer][3] = Color(loop[active_color_layer][:3]).v
+                color_data.remove(active_color_layer)
+            else: color_data.remove(old_layer)
+            new_active_name = basename
+
+        elif ch==3:
+            prev_layer = active_color_layer
+            new_active_name = basename+keyName+isolated_Channel
+            active_color_layer = color_data.new(new_active_name)
+            for vertex in bm.verts:
+                for loop in vertex.link_loops:
+                    loop[color_layer][3] = Color(loop[prev_layer][:3]).v
+                    rgb_c = [0,0,0]
+                    for x in isolated_channels:
+                        rgb_c[x] = loop[color_layer][x]
+                    loop[active_color_layer][:3] = rgb_c
+            if not old_layer_name: color_data.remove(prev_layer)
+            else: color_data.remove(old_layer)
+
+        elif isolated_channels:
+            prev_layer = active_color_layer
+            new_active_name = basename+keyName+isolated_Channel
+            active_color_layer = color_data.new(new_active_name)
+            for vertex in bm.verts:
+                for loop in vertex.link_loops:
+                    rgb_c = [0,0,0]
+                    for x in former_ch:
+                        loop[color_layer][x]=loop[prev_layer][x]
+                    for x in isolated_channels:
+                        rgb_c[x] = loop[color_layer][x]
+                    loop[active_color_layer][:3] = rgb_c
+            if not old_layer_name: color_data.remove(prev_layer)
+            else: color_data.remove(old_layer)
+
+        else:
+            isolated_Channel = ""
+            for vertex in bm.verts:
+                for loop in vertex.link_loops:
+                    loop[color_layer][ch] = loop[active_color_layer][ch]
+            if not old_layer_name: color_data.remove(active_color_layer)
+            else: color_data.remove(old_layer)
+            new_active_name = basename
+
+        refreshMesh(bm, obj)
+        trySetActiveVC(obj, new_active_name)
+
+        return isolated_Channel
+
+    if Mono: isolated_Channel = channel
+
+    old_channels = [int(x) for x in isolated_Channel]
+
+    if channel not in isolated_Channel:
+        isolated_Channel += channel
+    isolated_channels = [int(x) for x in isolated_Channel]
+
+    if ch==3:
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                a = loop[color_layer][3]
+                loop[active_color_layer][:3] = (a,a,a)
+        if addOld:
+            for vertex in bm.verts:
+                for loop in vertex.link_loops:
+                    for x in former_ch:
+                        loop[old_layer][x] = loop[color_layer][x]
+
+    elif 3 in isolated_channels:
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                a = Color(loop[old_layer][:3]).v
+                loop[active_color_layer][:3] = (a,a,a)
+
+    else:
+        old_channels = [x for x in old_channels if x!=ch]
+        if 3 in former_ch and not old_layer_name:
+            former_ch = [x for x in former_ch if x!=3]
+            for vertex in bm.verts:
+                for loop in vertex.link_loops:
+                    for x in former_ch:
+                        loop[color_layer][x]=loop[old_layer][x]
+                    loop[color_layer][3]=Color(loop[old_layer][:3]).v
+
+        for vertex in bm.verts:
+            for loop in vertex.link_loops:
+                rgb_c = [0,0,0]
+                for x in old_channels:
+                    rgb_c[x]=loop[old_layer][x]
+                rgb_c[ch]=loop[color_layer][ch]
+                loop[active_color_layer][:3] = rgb_c[:3]
+
+    if addOld: color_data.remove(old_layer)
+    refreshMesh(bm, obj)
+    trySetActiveVC(obj, basename+keyName+isolated_Channel)
+
+    return isolated_Channel
+
+def mapsum(error_margin, x):
+    e = error_margin
+    errorlist = [x[0]+e, x[1]+e, x[2]+e]
+    errorlist_ = [x[0]-e, x[1]-e, x[2]-e]
+
+    return (errorlist_,errorlist)
+
+def selectByIsolatedVertexColor(mesh, brush_color, error_margin, restrict_loops=False):
+    obj = mesh
+    obj.use_paint_mask_vertex = True
+
+    bm = newBMesh(mesh)
+    color_layer = findActiveColorLayer(bm.color_data, obj)
+
+    brushError_, brushError = mapsum(error_margin, brush_color)
+
+    for vertex in bm.verts:
+        for loop in vertex.link_loops:
+            x = loop[color_layer]
+            if all((brushError_[i] <= x[i] <= brushError[i] for i in FL)):
+                vertex.select_set(True)
+            elif restrict_loops:
+                vertex.select_set(False)
+                break
+
+    refreshMesh(bm, obj)
+
+def selectByPaletteColor(mesh, palette_colors, error_margin, restrict_loops=False):
+    obj = mesh
+    obj.use_paint_mask_vertex = True
+
+    bm = newBMesh(mesh)
+    color_layer = findActiveColorLayer(bm.color_data, obj)
+
+    paletteError = [mapsum(error_margin, x) for x in palette_colors]
+
+    for vertex in bm.verts:
+        for loop in vertex.link_loops:
+            x = loop[color_layer]
+            for a, b in paletteError:
+                if all((a[i] <= x[i] <= b[i] for i in FL)):
+                    vertex.select_set(True)
+                    break
+            if restrict_loops and vertex.select == False:
+                vertex.select_set(False)
+                break
+
+    refreshMesh(bm, obj)
+
+def paletteVertexColors(mesh):
+    bm = newBMesh(mesh)
+    obj = mesh
+    color_layer = findActiveColorLayer(bm.color_data, obj)
+    setColors = set()
+    palette = []
+
+    if obj.use_paint_mask_vertex:
+        vertex_data = [v for v in bm.verts if v.select]
+    else:
+        vertex_data = bm.verts
+
+    for vertex in vertex_data:
+        if obj.use_paint_mask:
+            face_loops = [loop for loop in vertex.link_loops if loop.face.select]
+        else:
+            face_loops = [loop for loop in vertex.link_loops]
+        for loop in face_loops:
+            loopcolor = loop[color_layer][:3]
+            t = tuple(loopcolor)
+            if t not in setColors:
+                setColors.add(t)
+                palette.append(loopcolor)
+
+    return palette
+
+def quickExportVertexColors(mesh, default_4COLOR, delete_old_vc=True):
+    bm = newBMesh(mesh)
+    obj = mesh
+    color_data = bm.color_data
+    new = True
+
+    if delete_old_vc:
+        deletelist = []
+        for layer in color_data.keys():
+            if layer != 'COLOR':
+                deletelist.append(layer)
+            else: new = False
+        for deletelayer in deletelist:
+            color_data.remove(color_data[deletelayer])
+
+    if new: color_L = color_data.new("COLOR")
+
+    color_layer = color_data["COLOR"]
+
+    if new:
+        if color_layer != color_L:
+            color_L.copy_from(color_layer)
+
+    for vertex in bm.verts:
+        for loop in vertex.link_loops:
+            loop[color_layer] = default_4COLOR
+
+    refreshMesh(bm, obj)
+    trySetActiveVC(obj, 'COLOR')
+
+def paintVerts(mesh, project, start_point, end_point, start_color, end_color, circular_gradient=False, use_hue_blend=False):
+    # project(co) stands in for view3d_utils.location_3d_to_region_2d with obj.matrix_world applied.
+    # The mathutils rotate-onto-the-down-axis transform of the original reduces to the
+    # projection onto the gradient line done here, per vertex like before.
+    bm = newBMesh(mesh)
+
+    if mesh.use_paint_mask_vertex:
+        vertex_data = [(v, project(v.co)) for v in bm.verts if v.select]
+    else:
+        vertex_data = [(v, project(v.co)) for v in bm.verts]
+
+    dx = end_point[0] - start_point[0]
+    dy = end_point[1] - start_point[1]
+    transLen = (dx*dx + dy*dy) ** 0.5
+
+    if use_hue_blend:
+        start_color = Color(start_color[:3])
+        end_color = Color(end_color[:3])
+        c1_hue = start_color.h
+        c2_hue = end_color.h
+        hue_separation = c2_hue - c1_hue
+        if hue_separation > 0.5:
+            hue_separation = hue_separation - 1
+        elif hue_separation < -0.5:
+            hue_separation = hue_separation + 1
+        c1_sat = start_color.s
+        sat_separation = end_color.s - c1_sat
+        c1_val = start_color.v
+        val_separation = end_color.v - c1_val
+
+    color_layer = findActiveColorLayer(bm.color_data, mesh)
+
+    for data in vertex_data:
+        vertex = data[0]
+        px = data[1][0] - start_point[0]
+        py = data[1][1] - start_point[1]
+
+        if circular_gradient:
+            t = abs(max(min((px*px + py*py) ** 0.5 / transLen, 1), 0))
+        else:
+            t = abs(max(min((px*dx + py*dy) / (transLen*transLen), 1), 0))
+
+        color = Color((1, 0, 0))
+        if use_hue_blend:
+            color.h = fmod(1.0 + c1_hue + hue_separation * t, 1.0)
+            color.s = c1_sat + sat_separation * t
+            color.v = c1_val + val_separation * t
+        else:
+            color.r = start_color[0] + (end_color[0] - start_color[0]) * t
+            color.g = start_color[1] + (end_color[1] - start_color[1]) * t
+            color.b = start_color[2] + (end_color[2] - start_color[2]) * t
+
+        if mesh.use_paint_mask:
+            face_loops = [loop for loop in vertex.link_loops if loop.face.select]
+        else:
+            face_loops = [loop for loop in vertex.link_loops]
+
+        for loop in face_loops:
+            new_color = loop[color_layer]
+            new_color[:3] = color[:3]
+
+    refreshMesh(bm, mesh)
@@ -0,0 +1,62 @@
+# Synthetic quad grid meshes for the benchmarks, built straight from arrays so even the
+# 5M corner sizes generate in a few seconds.
+
+import numpy as np
+
+from LEOAlphaPaint.standin import StandInMesh
+
+# Region and view used to "project" the grid for the gradient benchmark: the grid spans
+# 0..1 in x/y, the matrix maps that onto clip space of a 1920x1080 region.
+REGION_SIZE = (1920, 1080)
+PERSPECTIVE_MATRIX = np.array([
+    [2, 0, 0, -1],
+    [0, 2, 0, -1],
+    [0, 0, 1, 0],
+    [0, 0, 0, 1]], dtype=np.float32)
+
+def byteColors(rng, count):
+    return rng.integers(0, 256, size=(count, 4)).astype(np.float32)/np.float32(255)
+
+def gridMesh(corners, seams=0.1, selection=0.3, palette_size=64, seed=0):
+    # Quad grid with about `corners` face corners and three color layers:
+    # "Col" (active) uses `palette_size` colors, one per vertex except for the `seams` fraction
+    # of vertices whose corners each get their own palette color, "Src" and "Factor" are noise.
+    # `selection` is the fraction of selected vertices and faces.
+    rng = np.random.default_rng(seed)
+    quads = max(1, corners//4)
+    nx = max(1, int(np.sqrt(quads)))
+    ny = max(1, quads//nx)
+    vx = nx + 1
+
+    xs, ys = np.meshgrid(np.linspace(0, 1, nx + 1, dtype=np.float32), np.linspace(0, 1, ny + 1, dtype=np.float32))
+    co = np.stack((xs.ravel(), ys.ravel(), rng.random(xs.size, dtype=np.float32)*np.float32(0.01)), axis=1)
+    first = (np.arange(ny)[:,None]*vx + np.arange(nx)[None,:]).ravel().astype(np.int32)
+    loop_vert = np.stack((first, first + 1, first + 1 + vx, first + vx), axis=1).ravel()
+    loop_total = np.full(len(first), 4, dtype=np.int32)
+    loop_start = np.arange(len(first), dtype=np.int32)*4
+
+    mesh = StandInMesh.fromArrays(co, loop_start, loop_total, loop_vert, name="Grid%d" % len(loop_vert))
+    palette = byteColors(rng, palette_size)
+    palette[:,3] = np.float32(128)/np.float32(255)
+
+    pick = rng.integers(0, palette_size, size=len(co))[loop_vert]
+    seam_corners = (rng.random(len(co)) < seams)[loop_vert]
+    pick[seam_corners] = rng.integers(0, palette_size, size=int(seam_corners.sum()))
+
+    mesh.vertex_colors.new(name="Col").data.foreach_set("color", palette[pick].ravel())
+    mesh.vertex_colors.new(name="Src").data.foreach_set("color", byteColors(rng, len(loop_vert)).ravel())
+    mesh.vertex_colors.new(name="Factor").data.foreach_set("color", byteColors(rng, len(loop_vert)).ravel())
+
+    mesh.vertices.foreach_set("select", rng.random(len(co)) < selection)
+    mesh.polygons.foreach_set("select", rng.random(len(first)) < selection)
+    return mesh, palette
+
+def projectVertex(co):
+    # Per-vertex equivalent of view3d_utils.location_3d_to_region_2d for the fixed benchmark view
+    m = PERSPECTIVE_MATRIX
+    x, y, z = co
+    w = m[3,0]*x + m[3,1]*y + m[3,2]*z + m[3,3]
+    if w <= 0: return None
+    half_w, half_h = REGION_SIZE[0]/2, REGION_SIZE[1]/2
+    return (half_w + half_w*(m[0,0]*x + m[0,1]*y + m[0,2]*z + m[0,3])/w,
+            half_h + half_h*(m[1,0]*x + m[1,1]*y + m[1,2]*z + m[1,3])/w)
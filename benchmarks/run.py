@@ -0,0 +1,156 @@
+# Benchmark runner: times every case on synthetic meshes, compares throughput against a
+# stored JSON baseline and checks the current implementation against the original code and,
+# for the operators without original code, against the known results of checks.py.
+#
+#   python -m benchmarks.run --sizes 10k,100k,1m,5m --save benchmarks/baseline.json
+#   python -m benchmarks.run --baseline benchmarks/baseline.json --parity
+#
+# Exits with status 1 when a case regressed or failed the parity check or a behavior check.
+
+import argparse
+import copy
+import fnmatch
+import json
+import platform
+import sys
+import time
+
+import numpy as np
+
+
+from .cases import allCases
+from .checks import allChecks
+from .meshgen import gridMesh
+
+def parseSize(text):
+    text = text.strip().lower()
+    scale = {'k': 1000, 'm': 1000000}.get(text[-1], 1)
+    return int(float(text.rstrip('km'))*scale)
+
+def timeCase(fn, case, mesh, palette, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        work = copy.deepcopy(mesh)
+        if case.setup: case.setup(work, palette)
+        start = time.perf_counter()
+        fn(work, palette)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def meshState(mesh):
+    # Read straight from the mesh, the legacy code writes behind the back of meshops' cache
+    layers = {}
+    for layer in mesh.vertex_colors:
+        colors = np.empty(len(layer.data)*4, dtype=np.float32)
+        layer.data.foreach_get("color", colors)
+        layers[layer.name] = np.round(colors*255).astype(np.int16)
+    select = np.empty(len(mesh.vertices), dtype=bool)
+    mesh.vertices.foreach_get("select", select)
+    active = mesh.vertex_colors.active.name if mesh.vertex_colors.active is not None else None
+    return layers, active, select
+
+def checkParity(case, mesh, palette):
+    # Returns an error message, or None when old and new agree
+    results, states = [], []
+    for fn in (case.run, case.legacy):
+        work = copy.deepcopy(mesh)
+        if case.setup: case.setup(work, palette)
+        results.append(fn(work, palette))
+        states.append(meshState(work))
+    (new_layers, new_active, new_select), (old_layers, old_active, old_select) = states
+
+    if list(new_layers) != list(old_layers): return "layers %s != %s" % (list(new_layers), list(old_layers))
+    if new_active != old_active: return "active layer %s != %s" % (new_active, old_active)
+    if not np.array_equal(new_select, old_select): return "%d vertices selected differently" % (new_select != old_select).sum()
+    if not case.compare(*results): return "results differ: %r != %r" % tuple(str(x)[:80] for x in results)
+    for name in new_layers:
+        steps = int(np.abs(new_layers[name] - old_layers[name]).max(initial=0))
+        if steps > case.tolerance: return "layer %s differs by %d/255" % (name, steps)
+    return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark LEO Alpha Paint operators on synthetic meshes")
+    parser.add_argument('--sizes', default='10k,100k,1m,5m', help="Face corner counts, e.g. 10k,100k,1m,5m")
+    parser.add_argument('--cases', default='*', help="Comma separated case name patterns, e.g. blend:*,isolate:A:*")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per case, the best time is kept")
+    parser.add_argument('--seams', type=float, default=0.1, help="Fraction of vertices with differently colored corners")
+    parser.add_argument('--selection', type=float, default=0.3, help="Fraction of selected vertices and faces")
+    parser.add_argument('--palette', type=int, default=64, help="Number of colors in the mesh and the select palette")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--baseline', help="JSON file from an earlier --save to compare against")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="Allowed throughput drop against the baseline")
+    parser.add_argument('--save', help="Write results to this JSON file")
+    parser.add_argument('--legacy', action='store_true', help="Also time the original code (slow)")
+    parser.add_argument('--legacy-max', default='20k', help="Largest size the original code is timed on")
+    parser.add_argument('--parity', action='store_true', help="Check the current code against the original code and known results")
+    parser.add_argument('--parity-size', default='2k', help="Mesh size for the parity check")
+    args = parser.parse_args(argv)
+
+    patterns = args.cases.split(',')
+    cases = [c for c in allCases() if any(fnmatch.fnmatch(c.name, p) for p in patterns)]
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)['results']
+
+    failures = []
+    if args.parity:
+        mesh, palette = gridMesh(parseSize(args.parity_size), args.seams, args.selection, args.palette, args.seed)
+        for case in cases:
+            if case.run is None or case.legacy is None: continue
+            error = checkParity(case, mesh, palette)
+            print("parity %-24s %s" % (case.name, error or "ok"))
+            if error: failures.append("parity " + case.name)
+        for name, check in allChecks():
+            if not any(fnmatch.fnmatch(name, p) for p in patterns): continue
+            error = check()
+            print("check  %-24s %s" % (name, error or "ok"))
+            if error: failures.append("check " + name)
+
+    results = {}
+    legacy_max = parseSize(args.legacy_max)
+    print("%-24s %8s %12s %14s %s" % ("case", "corners", "time", "throughput", ""))
+    for label in args.sizes.split(','):
+        mesh, palette = gridMesh(parseSize(label), args.seams, args.selection, args.palette, args.seed)
+        corners = len(mesh.loops)
+        for case in cases:
+            timings = [('', case.run)]
+            if case.legacy and (args.legacy or case.run is None) and corners <= legacy_max:
+                timings.append((':legacy', case.legacy))
+            for suffix, fn in timings:
+                if fn is None: continue
+                key = "%s%s@%s" % (case.name, suffix, label)
+                seconds = timeCase(fn, case, mesh, palette, args.repeat)
+                throughput = corners/seconds if seconds > 0 else float('inf')
+                results[key] = {'corners': corners, 'seconds': seconds, 'throughput': throughput}
+
+                status = ""
+                if key in baseline:
+                    ratio = throughput/baseline[key]['throughput']
+                    status = "%+.0f%%" % ((ratio - 1)*100)
+                    if ratio < 1 - args.tolerance:
+                        status += " REGRESSION"
+                        failures.append(key)
+                print("%-24s %8d %10.2fms %10.2fMc/s %s" % (case.name + suffix, corners, seconds*1000, throughput/1e6, status))
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'meta': {
+                    'python': platform.python_version(),
+                    'numpy': np.__version__,
+                    'machine': platform.machine(),
+                    'processor': platform.processor(),
+                    'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+                },
+                'settings': {k: v for k, v in vars(args).items() if k not in ('baseline', 'save')},
+                'results': results,
+            }, f, indent=1)
+
+    if failures:
+        print("FAILED: " + ", ".join(failures))
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())